@@ -1,4 +1,4 @@
-from flask import Flask, render_template
+from flask import Flask, render_template, request
 from flask_socketio import SocketIO, emit
 import logging
 import os
@@ -56,12 +56,36 @@ def create_app(config_name=None):
 
     # Import GPIO controller
     from .gpio_controller import GPIOController
-    from .demos import SG90Servo
+    from .hardware_executor import HardwareExecutor
+    from .scheduler import get_scheduler
+    from .demos import SG90Servo, ServoGroup, ServoStatusPublisher
 
-    gpio_controller = GPIOController(socketio)
+    # Blocking hardware calls run off the event loop
+    hardware = HardwareExecutor(config.HARDWARE_EXECUTOR)
 
-    # Initialize demo components
-    servo = SG90Servo(pin=18)  # GPIO 18 supports hardware PWM
+    gpio_controller = GPIOController(
+        socketio,
+        backend=config.GPIO_BACKEND,
+        broadcast_window_ms=config.BROADCAST_WINDOW_MS,
+    )
+    gpio_controller.broadcaster.start()
+
+    # Initialize demo components: every configured servo joins one group so
+    # multi-servo arms move in sync; the SG90 demo page drives the first one
+    servos = ServoGroup()
+    for name, pin in config.SERVO_PINS.items():
+        servos.add(
+            name,
+            SG90Servo(pin=pin, calibration=config.SERVO_CALIBRATION.get(name)),
+        )
+    servo_name = servos.names()[0]
+    servo = servos.get(servo_name)
+
+    # Servo status is pushed as deltas when it changes instead of polled
+    servo_status = ServoStatusPublisher(socketio, config.SERVO_STATUS_INTERVAL_MS)
+    for name in servos.names():
+        servo_status.watch(name, servos.get(name))
+    servo_status.start()
 
     # Routes
     @app.route("/")
@@ -76,7 +100,10 @@ def create_app(config_name=None):
     def debug():
         """Debug endpoint to check GPIO system status"""
         try:
-            system_status = gpio_controller.get_system_status()
+            system_status = hardware.call("gpio", gpio_controller.get_system_status)
+            system_status["executor"] = hardware.get_status()
+            system_status["scheduler"] = get_scheduler().get_status()
+            system_status["servo_status"] = servo_status.get_status()
             return {"status": "ok", "debug_info": system_status}
         except Exception as e:
             return {"status": "error", "error": str(e)}
@@ -91,11 +118,13 @@ def create_app(config_name=None):
     @socketio.on("connect")
     def handle_connect():
         logger.info("Client connected")
+        gpio_controller.broadcaster.add_client(request.sid)
         emit("status", {"connected": True})
 
     @socketio.on("disconnect")
     def handle_disconnect():
         logger.info("Client disconnected")
+        gpio_controller.broadcaster.remove_client(request.sid)
 
     @socketio.on("gpio_set_mode")
     @socketio_error_handler
@@ -106,7 +135,7 @@ def create_app(config_name=None):
         logger.info(f"Received gpio_set_mode request: pin={pin}, mode={mode}")
         if pin is not None and mode:
             logger.info(f"Calling set_pin_mode...")
-            result = gpio_controller.set_pin_mode(pin, mode)
+            result = hardware.call("gpio", gpio_controller.set_pin_mode, pin, mode)
             logger.info(f"set_pin_mode returned: {result}")
             logger.info(f"About to emit response...")
             try:
@@ -128,7 +157,7 @@ def create_app(config_name=None):
         pin = data.get("pin")
         value = data.get("value")
         if pin is not None and value is not None:
-            result = gpio_controller.write_pin(pin, int(value))
+            result = hardware.call("gpio", gpio_controller.write_pin, pin, int(value))
             emit("gpio_response", result)
         else:
             emit(
@@ -142,7 +171,7 @@ def create_app(config_name=None):
         """Toggle GPIO pin output"""
         pin = data.get("pin")
         if pin:
-            result = gpio_controller.toggle_pin(pin)
+            result = hardware.call("gpio", gpio_controller.toggle_pin, pin)
             emit("gpio_response", result)
 
     @socketio.on("gpio_read")
@@ -151,14 +180,122 @@ def create_app(config_name=None):
         """Read GPIO pin state"""
         pin = data.get("pin")
         if pin:
-            result = gpio_controller.read_pin(pin)
+            result = hardware.call("gpio", gpio_controller.read_pin, pin)
             emit("gpio_response", result)
 
     @socketio.on("gpio_read_all")
     @socketio_error_handler
     def handle_gpio_read_all():
         """Read all configured GPIO pins"""
-        result = gpio_controller.read_all_pins()
+        result = hardware.call("gpio", gpio_controller.read_all_pins)
+        if result["success"]:
+            # The requester gets the full table, others only receive deltas
+            emit("all_pins_state", result["states"])
+        emit("gpio_response", result)
+
+    @socketio.on("gpio_batch")
+    @socketio_error_handler
+    def handle_gpio_batch(data):
+        """Apply an ordered list of pin operations in one round trip"""
+        operations = data.get("operations")
+        if isinstance(operations, list):
+            result = hardware.call("gpio", gpio_controller.apply_batch, operations)
+            emit("gpio_response", result)
+        else:
+            emit(
+                "gpio_response",
+                {"success": False, "error": "Missing operations parameter"},
+            )
+
+    @socketio.on("gpio_read_bank")
+    @socketio_error_handler
+    def handle_gpio_read_bank():
+        """Read all bank 1 pin levels in one command"""
+        result = hardware.call("gpio", gpio_controller.read_bank)
+        emit("gpio_response", result)
+
+    @socketio.on("gpio_write_mask")
+    @socketio_error_handler
+    def handle_gpio_write_mask(data):
+        """Set and clear several outputs at once using bit masks"""
+        set_mask = data.get("set_mask", 0)
+        clear_mask = data.get("clear_mask", 0)
+        result = hardware.call("gpio", gpio_controller.write_mask, set_mask, clear_mask)
+        emit("gpio_response", result)
+
+    @socketio.on("gpio_watch")
+    @socketio_error_handler
+    def handle_gpio_watch(data):
+        """Push pins_changed deltas when an input pin changes"""
+        pin = data.get("pin")
+        if pin is not None:
+            result = hardware.call(
+                "gpio", gpio_controller.watch_pin, pin, data.get("debounce_ms")
+            )
+            emit("gpio_response", result)
+        else:
+            emit("gpio_response", {"success": False, "error": "Missing pin parameter"})
+
+    @socketio.on("gpio_unwatch")
+    @socketio_error_handler
+    def handle_gpio_unwatch(data):
+        """Stop pushing change events for an input pin"""
+        pin = data.get("pin")
+        if pin is not None:
+            result = hardware.call("gpio", gpio_controller.unwatch_pin, pin)
+            emit("gpio_response", result)
+        else:
+            emit("gpio_response", {"success": False, "error": "Missing pin parameter"})
+
+    @socketio.on("gpio_capture")
+    @socketio_error_handler
+    def handle_gpio_capture(data):
+        """Record pin edges for a while and answer with the edge list"""
+        pins = data.get("pins")
+        duration = data.get("duration")
+        if pins is None or duration is None:
+            emit(
+                "capture_result",
+                {"success": False, "error": "Missing pins or duration parameter"},
+            )
+            return
+        result = hardware.call(
+            "gpio",
+            gpio_controller.start_capture,
+            pins,
+            duration,
+            data.get("trigger"),
+            data.get("max_edges"),
+            data.get("timeout"),
+        )
+        if result["success"]:
+            try:
+                # Wait on a lane of its own so pin operations keep running
+                hardware.call(
+                    "capture", gpio_controller.wait_for_capture, data.get("timeout")
+                )
+            finally:
+                # Always release the pins, or every later capture is refused
+                result = hardware.call("gpio", gpio_controller.stop_capture)
+        emit("capture_result", result)
+
+    @socketio.on("subscribe_pins")
+    @socketio_error_handler
+    def handle_subscribe_pins(data):
+        """Only receive pins_changed updates for the given pins"""
+        pins = data.get("pins")
+        if pins is not None:
+            result = gpio_controller.subscribe_pins(request.sid, pins)
+            emit("gpio_response", result)
+        else:
+            emit("gpio_response", {"success": False, "error": "Missing pins parameter"})
+
+    @socketio.on("unsubscribe_pins")
+    @socketio_error_handler
+    def handle_unsubscribe_pins(data=None):
+        """Drop pin subscriptions; without pins, receive updates for all pins"""
+        pins = (data or {}).get("pins")
+        result = gpio_controller.unsubscribe_pins(request.sid, pins)
         emit("gpio_response", result)
 
     @socketio.on("pwm_start")
@@ -170,7 +307,63 @@ def create_app(config_name=None):
         duty_cycle = data.get("duty_cycle", 50)
 
         if pin is not None:
-            result = gpio_controller.start_pwm(pin, frequency, duty_cycle)
+            result = hardware.call(
+                "gpio", gpio_controller.start_pwm, pin, frequency, duty_cycle
+            )
+            emit("gpio_response", result)
+        else:
+            emit("gpio_response", {"success": False, "error": "Missing pin parameter"})
+
+    @socketio.on("pwm_update")
+    @socketio_error_handler
+    def handle_pwm_update(data):
+        """Change duty cycle/frequency of running PWM (e.g. from a slider)"""
+        pin = data.get("pin")
+        if pin is None:
+            emit("gpio_response", {"success": False, "error": "Missing pin parameter"})
+            return
+        gpio_controller.request_pwm_update(
+            pin, data.get("duty_cycle"), data.get("frequency")
+        )
+        result = hardware.call("gpio", gpio_controller.apply_pwm_update, pin)
+        # None: merged into an update that was already applied and answered
+        if result is not None:
+            emit("gpio_response", result)
+
+    @socketio.on("pwm_ramp_start")
+    @socketio_error_handler
+    def handle_pwm_ramp_start(data):
+        """Fade a pin's duty cycle on the server"""
+        pin = data.get("pin")
+        end_duty = data.get("end_duty")
+        duration = data.get("duration")
+        if pin is None or end_duty is None or duration is None:
+            emit(
+                "gpio_response",
+                {"success": False, "error": "Missing pin, end_duty or duration"},
+            )
+            return
+        result = hardware.call(
+            "gpio",
+            gpio_controller.start_pwm_ramp,
+            pin,
+            end_duty,
+            duration,
+            start_duty=data.get("start_duty"),
+            easing=data.get("easing", "linear"),
+            repeat=data.get("repeat", 0),
+            alternate=data.get("alternate", False),
+            frequency=data.get("frequency"),
+        )
+        emit("gpio_response", result)
+
+    @socketio.on("pwm_ramp_stop")
+    @socketio_error_handler
+    def handle_pwm_ramp_stop(data):
+        """Stop a ramp, keeping the current duty cycle"""
+        pin = data.get("pin")
+        if pin is not None:
+            result = hardware.call("gpio", gpio_controller.stop_pwm_ramp, pin)
             emit("gpio_response", result)
         else:
             emit("gpio_response", {"success": False, "error": "Missing pin parameter"})
@@ -181,23 +374,72 @@ def create_app(config_name=None):
         """Stop PWM on a pin"""
         pin = data.get("pin")
         if pin is not None:
-            result = gpio_controller.stop_pwm(pin)
+            result = hardware.call("gpio", gpio_controller.stop_pwm, pin)
             emit("gpio_response", result)
         else:
             emit("gpio_response", {"success": False, "error": "Missing pin parameter"})
 
+    @socketio.on("pwm_group_start")
+    @socketio_error_handler
+    def handle_pwm_group_start(data):
+        """Start phase-locked PWM on several pins"""
+        name = data.get("name")
+        channels = data.get("channels")
+        if name is None or channels is None:
+            emit(
+                "gpio_response",
+                {"success": False, "error": "Missing name or channels parameter"},
+            )
+            return
+        result = hardware.call(
+            "gpio",
+            gpio_controller.start_pwm_group,
+            name,
+            data.get("frequency", 1000),
+            channels,
+        )
+        emit("gpio_response", result)
+
+    @socketio.on("pwm_group_update")
+    @socketio_error_handler
+    def handle_pwm_group_update(data):
+        """Change a PWM group's frequency or channel duty/phase together"""
+        name = data.get("name")
+        if name is None:
+            emit("gpio_response", {"success": False, "error": "Missing name parameter"})
+            return
+        result = hardware.call(
+            "gpio",
+            gpio_controller.update_pwm_group,
+            name,
+            data.get("frequency"),
+            data.get("channels"),
+        )
+        emit("gpio_response", result)
+
+    @socketio.on("pwm_group_stop")
+    @socketio_error_handler
+    def handle_pwm_group_stop(data):
+        """Stop every pin of a PWM group"""
+        name = data.get("name")
+        if name is None:
+            emit("gpio_response", {"success": False, "error": "Missing name parameter"})
+            return
+        result = hardware.call("gpio", gpio_controller.stop_pwm_group, name)
+        emit("gpio_response", result)
+
     @socketio.on("gpio_reset_all")
     @socketio_error_handler
     def handle_gpio_reset_all():
         """Reset all GPIO pins"""
-        result = gpio_controller.reset_all_pins()
+        result = hardware.call("gpio", gpio_controller.reset_all_pins)
         emit("gpio_response", result)
 
     @socketio.on("gpio_cleanup")
     @socketio_error_handler
     def handle_gpio_cleanup():
         """Clean up all GPIO resources"""
-        gpio_controller.cleanup()
+        hardware.call("gpio", gpio_controller.cleanup)
         emit("gpio_response", {"success": True, "message": "GPIO cleanup completed"})
 
     @socketio.on("get_pin_info")
@@ -218,26 +460,30 @@ def create_app(config_name=None):
     # Servo Demo SocketIO Events
     # ========================
 
+    def respond_servo(result):
+        """Reply to a servo command with its result and the servo status
+
+        Status changes also reach every subscribed page as pushed
+        servo_status deltas, so commands need no separate status message.
+        """
+        emit(
+            "servo_response",
+            {**result, "status": servo_status.snapshot(servo_name, servo)},
+        )
+
     @socketio.on("servo_enable")
     @socketio_error_handler
     def handle_servo_enable():
         """Enable servo motor"""
-        result = servo.enable()
-        emit("servo_response", result)
-        if result["success"]:
-            # Emit initial status
-            status = servo.get_status()
-            emit("servo_status", status)
+        result = hardware.call("servo", servo.enable)
+        respond_servo(result)
 
     @socketio.on("servo_disable")
     @socketio_error_handler
     def handle_servo_disable():
         """Disable servo motor"""
-        result = servo.disable()
-        emit("servo_response", result)
-        if result["success"]:
-            status = servo.get_status()
-            emit("servo_status", status)
+        result = hardware.call("servo", servo.disable)
+        respond_servo(result)
 
     @socketio.on("servo_set_angle")
     @socketio_error_handler
@@ -247,11 +493,8 @@ def create_app(config_name=None):
         smooth = data.get("smooth", False)
 
         if angle is not None:
-            result = servo.set_angle(angle, smooth)
-            emit("servo_response", result)
-            if result["success"]:
-                status = servo.get_status()
-                emit("servo_status", status)
+            result = hardware.call("servo", servo.set_angle, angle, smooth)
+            respond_servo(result)
         else:
             emit(
                 "servo_response", {"success": False, "error": "Missing angle parameter"}
@@ -264,11 +507,8 @@ def create_app(config_name=None):
         step = data.get("step")
 
         if step is not None:
-            result = servo.step_move(step)
-            emit("servo_response", result)
-            if result["success"]:
-                status = servo.get_status()
-                emit("servo_status", status)
+            result = hardware.call("servo", servo.step_move, step)
+            respond_servo(result)
         else:
             emit(
                 "servo_response", {"success": False, "error": "Missing step parameter"}
@@ -281,38 +521,83 @@ def create_app(config_name=None):
         start_angle = data.get("start_angle", 0)
         end_angle = data.get("end_angle", 180)
         speed = data.get("speed", "medium")
+        waveform = data.get("waveform")
 
-        result = servo.start_scan(start_angle, end_angle, speed)
-        emit("servo_response", result)
-        if result["success"]:
-            status = servo.get_status()
-            emit("servo_status", status)
+        result = hardware.call(
+            "servo", servo.start_scan, start_angle, end_angle, speed, waveform
+        )
+        respond_servo(result)
 
     @socketio.on("servo_scan_stop")
     @socketio_error_handler
     def handle_servo_scan_stop():
         """Stop servo scan mode"""
-        result = servo.stop_scan()
-        emit("servo_response", result)
-        if result["success"]:
-            status = servo.get_status()
-            emit("servo_status", status)
+        result = hardware.call("servo", servo.stop_scan)
+        respond_servo(result)
 
     @socketio.on("servo_emergency_stop")
     @socketio_error_handler
     def handle_servo_emergency_stop():
         """Emergency stop servo"""
-        result = servo.emergency_stop()
-        emit("servo_response", result)
-        status = servo.get_status()
-        emit("servo_status", status)
+        # Own lane: an emergency stop must never wait behind a running move
+        result = hardware.call("servo_stop", servo.emergency_stop)
+        respond_servo(result)
 
     @socketio.on("servo_get_status")
     @socketio_error_handler
     def handle_servo_get_status():
-        """Get servo status"""
-        status = servo.get_status()
-        emit("servo_status", status)
+        """Get servo status and subscribe to pushed status changes"""
+        servo_status.add_client(request.sid)
+        emit("servo_status", servo_status.snapshot(servo_name, servo))
+
+    def respond_group(result):
+        """Reply to a servo group command with its result and the group status"""
+        emit(
+            "servo_group_response",
+            {**result, "status": servo_status.stamp(servos.get_status())},
+        )
+
+    @socketio.on("servo_group_enable")
+    @socketio_error_handler
+    def handle_servo_group_enable():
+        """Enable every servo in the group"""
+        result = hardware.call("servo", servos.enable)
+        respond_group(result)
+
+    @socketio.on("servo_group_disable")
+    @socketio_error_handler
+    def handle_servo_group_disable():
+        """Disable every servo in the group"""
+        result = hardware.call("servo", servos.disable)
+        respond_group(result)
+
+    @socketio.on("servo_group_pose")
+    @socketio_error_handler
+    def handle_servo_group_pose(data):
+        """Move several servos to a pose so they all arrive together"""
+        pose = data.get("pose")
+        if not isinstance(pose, dict):
+            emit(
+                "servo_group_response",
+                {"success": False, "error": "Missing pose parameter"},
+            )
+            return
+        result = hardware.call("servo", servos.move_to_pose, pose, data.get("duration"))
+        respond_group(result)
+
+    @socketio.on("servo_group_stop")
+    @socketio_error_handler
+    def handle_servo_group_stop():
+        """Stop a group move where it is"""
+        result = hardware.call("servo_stop", servos.stop)
+        respond_group(result)
+
+    @socketio.on("servo_group_get_status")
+    @socketio_error_handler
+    def handle_servo_group_get_status():
+        """Get the state of every servo and subscribe to pushed changes"""
+        servo_status.add_client(request.sid)
+        emit("servo_group_status", servo_status.stamp(servos.get_status()))
 
     # Note: GPIO cleanup is handled via:
     # 1. User clicking "清理GPIO" button (socketio event: gpio_cleanup)
@@ -5,5 +5,7 @@
 """
 
 from .sg90_servo import SG90Servo
+from .servo_group import ServoGroup
+from .servo_status import ServoStatusPublisher
 
-__all__ = ["SG90Servo"]
+__all__ = ["SG90Servo", "ServoGroup", "ServoStatusPublisher"]
@@ -0,0 +1,115 @@
+"""
+舵机角度-脉宽标定
+
+SG90 各个个体的脉宽和角度并不完全是 500~2500us 的线性关系。标定表用若干
+实测点 (角度, 脉宽) 描述一个舵机，点之间按分段线性插值。构造时按固定角度
+分辨率（默认0.1°）把整张表预先算成整数脉宽数组，运行时换算只是一次查表。
+"""
+
+import bisect
+from array import array
+from typing import Iterable, List, Sequence, Tuple
+
+# pigpio set_servo_pulsewidth 接受的脉宽范围（微秒）
+PULSE_LIMITS = (500, 2500)
+
+# 未标定舵机使用的默认线性映射: 0° -> 500us, 180° -> 2500us
+DEFAULT_POINTS = ((0.0, 500.0), (180.0, 2500.0))
+
+
+class ServoCalibration:
+    """分段线性的角度-脉宽标定表"""
+
+    RESOLUTION = 0.1  # 查表的角度分辨率（°）
+
+    def __init__(
+        self,
+        points: Iterable[Sequence[float]] = DEFAULT_POINTS,
+        angle_min: float = 0,
+        angle_max: float = 180,
+    ):
+        """
+        初始化标定表
+
+        Args:
+            points: 标定点 [(角度, 脉宽us), ...]，至少两个，角度严格递增，
+                脉宽严格单调（舵机反装时可以递减）
+            angle_min: 查表覆盖的最小角度
+            angle_max: 查表覆盖的最大角度
+        """
+        self.points: List[Tuple[float, float]] = [
+            (float(angle), float(pulse)) for angle, pulse in points
+        ]
+        self._validate()
+        self.angle_min = angle_min
+        self.angle_max = angle_max
+
+        self._angles = [angle for angle, _ in self.points]
+        pulses = [pulse for _, pulse in self.points]
+        # 反向查找（脉宽 -> 角度）用递增序列二分
+        self._descending = pulses[-1] < pulses[0]
+        self._pulses = pulses[::-1] if self._descending else pulses
+
+        # 预先计算 angle_min..angle_max 每个分辨率步长的整数脉宽
+        self._scale = 1 / self.RESOLUTION
+        steps = int(round((angle_max - angle_min) * self._scale))
+        self._table = array(
+            "H",
+            (
+                self._clamp_pulse(
+                    round(self._interpolate(angle_min + i * self.RESOLUTION))
+                )
+                for i in range(steps + 1)
+            ),
+        )
+
+    def _validate(self):
+        if len(self.points) < 2:
+            raise ValueError("Calibration needs at least two points")
+        angles = [angle for angle, _ in self.points]
+        pulses = [pulse for _, pulse in self.points]
+        if any(b <= a for a, b in zip(angles, angles[1:])):
+            raise ValueError("Calibration angles must be strictly increasing")
+        steps = [b - a for a, b in zip(pulses, pulses[1:])]
+        if not (all(d > 0 for d in steps) or all(d < 0 for d in steps)):
+            raise ValueError("Calibration pulse widths must be strictly monotonic")
+        low, high = PULSE_LIMITS
+        if any(not low <= pulse <= high for pulse in pulses):
+            raise ValueError(
+                f"Calibration pulse widths must be within {low}-{high}us"
+            )
+
+    @staticmethod
+    def _clamp_pulse(pulse: float) -> int:
+        low, high = PULSE_LIMITS
+        return int(max(low, min(high, pulse)))
+
+    def _interpolate(self, angle: float) -> float:
+        """按标定点分段线性插值（两端沿首尾线段外推）"""
+        index = bisect.bisect_right(self._angles, angle)
+        index = max(1, min(len(self.points) - 1, index))
+        (a0, p0), (a1, p1) = self.points[index - 1], self.points[index]
+        return p0 + (angle - a0) * (p1 - p0) / (a1 - a0)
+
+    def pulse_width(self, angle: float) -> int:
+        """角度 -> 脉宽（微秒），查表"""
+        angle = max(self.angle_min, min(self.angle_max, angle))
+        return self._table[int((angle - self.angle_min) * self._scale + 0.5)]
+
+    def angle(self, pulse_width: float) -> float:
+        """脉宽 -> 角度，按标定点反向插值"""
+        pulses = self._pulses
+        index = bisect.bisect_right(pulses, pulse_width)
+        index = max(1, min(len(pulses) - 1, index))
+        p0, p1 = pulses[index - 1], pulses[index]
+        if self._descending:
+            a0 = self._angles[len(pulses) - index]
+            a1 = self._angles[len(pulses) - 1 - index]
+        else:
+            a0, a1 = self._angles[index - 1], self._angles[index]
+        angle = a0 + (pulse_width - p0) * (a1 - a0) / (p1 - p0)
+        return round(max(self.angle_min, min(self.angle_max, angle)), 1)
+
+    def to_list(self) -> List[List[float]]:
+        """标定点，用于状态输出和配置保存"""
+        return [[angle, pulse] for angle, pulse in self.points]
@@ -0,0 +1,234 @@
+"""
+多舵机组控制模块
+
+机械臂等场景需要4~6个舵机协同运动。ServoGroup 按名称注册舵机，接受一个
+姿态（每个舵机的目标角度），为每个舵机按各自的速度/加速度限制规划轨迹，
+再统一拉伸到最慢那条的时长，使所有舵机同时出发、同时到达。
+
+整组轨迹由调度器上的一个周期任务回放：每个周期把所有舵机的脉宽放进一条
+pigpio 命令流水线一次发出，而不是每个舵机各自一条命令流。
+"""
+
+import logging
+import math
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from ..pigpio_pipeline import CommandPipeline
+from ..scheduler import PeriodicScheduler, get_scheduler
+from .servo_trajectory import Trajectory
+from .sg90_servo import SG90Servo
+
+
+class ServoGroup:
+    """按名称管理多个舵机，整组同步移动到指定姿态"""
+
+    TICK_INTERVAL = 0.02  # 20ms，与50Hz PWM周期一致
+
+    def __init__(self, scheduler: PeriodicScheduler = None):
+        """
+        初始化舵机组
+
+        Args:
+            scheduler: 回放同步轨迹的周期调度器（默认进程共享的调度器）
+        """
+        self.servos: Dict[str, SG90Servo] = {}
+        self.scheduler = scheduler or get_scheduler()
+        self._lock = threading.RLock()
+        self._task = None
+        # 正在回放的同步移动: 名称 -> 轨迹
+        self._moves: Dict[str, Trajectory] = {}
+        self._move_started = 0.0
+        self._move_duration = 0.0
+        self.logger = logging.getLogger(__name__)
+
+    def add(self, name: str, servo: SG90Servo) -> SG90Servo:
+        """注册舵机"""
+        if name in self.servos:
+            raise ValueError(f"Servo {name} already registered")
+        if any(other.pin == servo.pin for other in self.servos.values()):
+            raise ValueError(f"GPIO {servo.pin} already used by another servo")
+        self.servos[name] = servo
+        return servo
+
+    def get(self, name: str) -> Optional[SG90Servo]:
+        """按名称获取舵机"""
+        return self.servos.get(name)
+
+    def names(self) -> List[str]:
+        """已注册舵机的名称（注册顺序）"""
+        return list(self.servos)
+
+    def enable(self) -> Dict[str, Any]:
+        """启用组内所有舵机"""
+        return self._for_each(lambda servo: servo.enable())
+
+    def disable(self) -> Dict[str, Any]:
+        """停止同步移动并禁用组内所有舵机"""
+        self.stop()
+        return self._for_each(lambda servo: servo.disable())
+
+    def move_to_pose(
+        self, pose: Dict[str, float], duration: float = None
+    ) -> Dict[str, Any]:
+        """
+        同步移动到指定姿态
+
+        Args:
+            pose: 舵机名称 -> 目标角度，未列出的舵机保持不动
+            duration: 期望的移动时长（秒）；比限制允许的最短时长还短时按最短时长
+
+        Returns:
+            操作结果
+        """
+        if not pose:
+            return {"success": False, "error": "Empty pose"}
+
+        if duration is not None and (
+            not isinstance(duration, (int, float))
+            or isinstance(duration, bool)
+            or not 0 < duration < math.inf
+        ):
+            return {
+                "success": False,
+                "error": f"Invalid duration: {duration}. "
+                "Must be a positive number of seconds.",
+            }
+
+        unknown = [name for name in pose if name not in self.servos]
+        if unknown:
+            return {"success": False, "error": f"Unknown servos: {unknown}"}
+
+        disabled = [name for name in pose if not self.servos[name].enabled]
+        if disabled:
+            return {"success": False, "error": f"Servos not enabled: {disabled}"}
+
+        try:
+            angles = {name: float(angle) for name, angle in pose.items()}
+        except (TypeError, ValueError):
+            return {"success": False, "error": "Pose angles must be numbers"}
+
+        # 扫描会和同步移动抢同一个引脚，先停下
+        for name in pose:
+            if self.servos[name].scanning:
+                self.servos[name].stop_scan()
+
+        with self._lock:
+            self._cancel_moves()
+
+            trajectories = {
+                name: self.servos[name].plan_group_move(angle)
+                for name, angle in angles.items()
+            }
+
+            # 所有舵机拉伸到最慢那条轨迹（或指定时长），同时到达
+            total = max(
+                [trajectory.duration for trajectory in trajectories.values()]
+                + [duration or 0.0]
+            )
+            started = time.monotonic()
+            for name, trajectory in trajectories.items():
+                trajectory = trajectory.stretched(total)
+                self.servos[name].begin_group_move(
+                    trajectory, started, self.TICK_INTERVAL
+                )
+                self._moves[name] = trajectory
+
+            self._move_started = started
+            self._move_duration = total
+            if self._task is None:
+                # 立即执行第一个周期，之后按绝对截止时间推进
+                self._task = self.scheduler.schedule(
+                    self.TICK_INTERVAL, self._tick, name="servo-group", delay=0
+                )
+
+        self.logger.info(f"Servo group moving to {angles} in {total:.3f}s")
+
+        return {
+            "success": True,
+            "pose": {name: trajectory.end for name, trajectory in trajectories.items()},
+            "duration": round(total, 3),
+            "moving": total > 0,
+        }
+
+    def _tick(self) -> bool:
+        """同步移动周期任务：所有舵机的下一个角度一次发出
+
+        Returns:
+            整组移动结束时返回False，任务随之停止，直到下一个姿态
+        """
+        with self._lock:
+            elapsed = time.monotonic() - self._move_started
+            index = int(elapsed / self.TICK_INTERVAL)
+            pipeline = None
+            for name, trajectory in list(self._moves.items()):
+                servo = self.servos[name]
+                step = servo.group_move_step(trajectory, index)
+                if step is None:
+                    # 单独的命令已经覆盖了这个舵机的同步轨迹
+                    del self._moves[name]
+                    continue
+
+                pulse_width, finished = step
+                if pulse_width is not None:
+                    if pipeline is None:
+                        pipeline = CommandPipeline(servo.pi)
+                    pipeline.set_servo_pulsewidth(servo.pin, pulse_width, tag=name)
+                if finished:
+                    del self._moves[name]
+
+            if pipeline is not None:
+                for result in pipeline.flush():
+                    if result["error"]:
+                        self.servos[result["tag"]].pulse_write_failed()
+                        self.logger.error(
+                            f"Servo {result['tag']} write failed: {result['error']}"
+                        )
+
+            if not self._moves:
+                self._task = None
+                return False
+            return True
+
+    def stop(self) -> Dict[str, Any]:
+        """停止同步移动，所有舵机停在当前位置"""
+        with self._lock:
+            self._cancel_moves()
+            task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+        return {"success": True, "message": "Servo group stopped"}
+
+    def _cancel_moves(self):
+        """中止尚未完成的同步轨迹（调用方持有组锁）"""
+        for name, trajectory in self._moves.items():
+            self.servos[name].cancel_group_move(trajectory)
+        self._moves = {}
+
+    def get_status(self) -> Dict[str, Any]:
+        """获取舵机组状态"""
+        with self._lock:
+            moving = bool(self._moves)
+        return {
+            "success": True,
+            "servos": {name: servo.get_status() for name, servo in self.servos.items()},
+            "pose": {name: servo.current_angle for name, servo in self.servos.items()},
+            "moving": moving,
+            "move_duration": round(self._move_duration, 3),
+        }
+
+    def cleanup(self):
+        """清理所有舵机"""
+        self.stop()
+        for servo in self.servos.values():
+            servo.cleanup()
+
+    def _for_each(self, action) -> Dict[str, Any]:
+        """对每个舵机执行操作并汇总结果"""
+        results = {name: action(servo) for name, servo in self.servos.items()}
+        failed = [name for name, result in results.items() if not result["success"]]
+        result = {"success": not failed, "results": results}
+        if failed:
+            result["error"] = f"Failed servos: {failed}"
+        return result
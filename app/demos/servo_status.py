@@ -0,0 +1,166 @@
+"""
+舵机状态推送
+
+演示页面原来每2秒轮询一次 servo_get_status，而且每个舵机命令都在
+servo_response 之后再发一条完整的 servo_status。ServoStatusPublisher 改为
+由服务器推送：舵机状态变化时只标记为"脏"，事件循环上的后台任务每个周期
+（默认100ms）把脏舵机的状态与上次推送的比较，只发送变化的字段。扫描时
+角度每个周期都在变，推送频率也不会超过这个周期。
+
+状态推送到 servo:status 房间，客户端请求一次状态后加入。
+"""
+
+import logging
+import threading
+import time
+from typing import Any, Dict, Iterable, Set
+
+from .sg90_servo import SG90Servo
+
+
+class ServoStatusPublisher:
+    """合并舵机状态变化，按周期推送增量 servo_status"""
+
+    EVENT = "servo_status"
+    NAMESPACE = "/"
+    ROOM = "servo:status"
+    DEFAULT_INTERVAL_MS = 100
+    # 不参与比较的字段：计数器每次写入都变，版本号随增量一起发送
+    VOLATILE_FIELDS = ("success", "timestamp", "pulse_writes", "version")
+
+    def __init__(self, socketio, interval_ms: float = None):
+        """
+        Args:
+            socketio: 用于推送和启动后台任务的 Flask-SocketIO 实例
+            interval_ms: 推送周期（毫秒）；0 表示每次变化立即推送
+        """
+        self.socketio = socketio
+        self.interval_ms = (
+            self.DEFAULT_INTERVAL_MS if interval_ms is None else interval_ms
+        )
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        self._servos: Dict[str, SG90Servo] = {}
+        self._dirty: Set[str] = set()
+        # 每个舵机上次推送的状态
+        self._sent: Dict[str, Dict[str, Any]] = {}
+        self._running = False
+        self._stats = {"notified": 0, "messages": 0}
+
+    def watch(self, name: str, servo: SG90Servo):
+        """推送这个舵机的状态变化"""
+        with self._lock:
+            self._servos[name] = servo
+        servo.status_listener = lambda: self.notify(name)
+
+    def notify(self, name: str):
+        """标记舵机状态已变化（任意线程可调用，只做标记）"""
+        with self._lock:
+            self._dirty.add(name)
+            self._stats["notified"] += 1
+
+        if self.interval_ms <= 0:
+            # 只推送这个舵机，避免在持有它的运动锁时去锁别的舵机
+            self.flush(names=[name])
+        elif not self._running:
+            self.start()
+
+    def start(self):
+        """启动按周期推送的后台任务"""
+        if self.interval_ms <= 0 or self._running:
+            return
+        self._running = True
+        try:
+            self.socketio.start_background_task(self._run)
+        except Exception as e:
+            self._running = False
+            self.logger.debug(f"Could not start servo status task, sending now: {e}")
+            self.flush()
+
+    def stop(self):
+        """当前周期结束后停止后台任务"""
+        self._running = False
+
+    def _run(self):
+        interval = self.interval_ms / 1000
+        while self._running:
+            self.socketio.sleep(interval)
+            try:
+                self.flush()
+            except Exception as e:
+                self.logger.error(f"Servo status push failed: {e}")
+
+    def flush(self, names: Iterable[str] = None) -> Dict[str, Dict[str, Any]]:
+        """推送脏舵机（或只推送 names 中的）的状态增量，返回已发送的增量"""
+        with self._lock:
+            if names is None:
+                dirty, self._dirty = self._dirty, set()
+            else:
+                dirty = self._dirty & set(names)
+                self._dirty -= dirty
+            servos = {
+                name: self._servos[name] for name in dirty if name in self._servos
+            }
+
+        sent = {}
+        for name, servo in servos.items():
+            if servo.scanning:
+                # 波形扫描的角度按时间推算，扫描期间每个周期都重新检查
+                with self._lock:
+                    self._dirty.add(name)
+
+            last_version, last = self._sent.get(name, (None, {}))
+            if servo.status_version == last_version and not servo.scanning:
+                continue
+            full = servo.get_status()
+            status = self._public(full)
+            delta = {
+                key: value for key, value in status.items() if last.get(key) != value
+            }
+            self._sent[name] = (full["version"], status)
+            if not delta:
+                continue
+            delta["version"] = full["version"]
+            self._send({"name": name, **delta})
+            sent[name] = delta
+        return sent
+
+    def snapshot(self, name: str, servo: SG90Servo) -> Dict[str, Any]:
+        """完整状态（带舵机名称和时间戳），用于首次请求和命令响应"""
+        return self.stamp({**servo.get_status(), "name": name})
+
+    @staticmethod
+    def stamp(payload: Dict[str, Any]) -> Dict[str, Any]:
+        """发送时附加时间戳（单调时钟秒数，只用于比较先后和计算间隔）"""
+        payload["timestamp"] = round(time.monotonic(), 3)
+        return payload
+
+    def add_client(self, sid: str):
+        """客户端加入状态推送房间"""
+        try:
+            self.socketio.server.enter_room(sid, self.ROOM, namespace=self.NAMESPACE)
+        except Exception as e:
+            self.logger.debug(f"Could not add {sid} to servo status room: {e}")
+
+    def get_status(self) -> Dict[str, Any]:
+        """推送统计，用于调试"""
+        return {
+            "interval_ms": self.interval_ms,
+            "servos": sorted(self._servos),
+            "pending": len(self._dirty),
+            **self._stats,
+        }
+
+    def _public(self, status: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            key: value
+            for key, value in status.items()
+            if key not in self.VOLATILE_FIELDS
+        }
+
+    def _send(self, payload: Dict[str, Any]):
+        try:
+            self.socketio.emit(self.EVENT, self.stamp(payload), to=self.ROOM)
+            self._stats["messages"] += 1
+        except Exception as e:
+            self.logger.debug(f"Servo status emit failed: {e}")
@@ -0,0 +1,146 @@
+"""
+舵机轨迹规划
+
+根据最大速度和最大加速度，为一次角度移动预先计算随时间变化的位置曲线：
+
+- trapezoid: 梯形速度曲线（匀加速 - 匀速 - 匀减速），在限制内最快
+- scurve:    S形曲线，加减速段的加速度按正弦平滑变化，起停无冲击
+
+短距离移动达不到最大速度时自动退化为三角形（无匀速段）。轨迹可以按
+固定周期采样成角度序列，由运动引擎逐周期回放或编译成 pigpio 波形。
+"""
+
+import math
+from typing import List, NamedTuple
+
+PROFILES = ("trapezoid", "scurve")
+
+
+class MotionLimits(NamedTuple):
+    """舵机的运动限制"""
+
+    max_velocity: float  # 最大角速度（°/s）
+    max_acceleration: float  # 最大角加速度（°/s²）
+
+
+class Trajectory:
+    """一次从 start 到 end 的移动，position(t) 给出 t 秒时的角度"""
+
+    def __init__(
+        self,
+        start: float,
+        end: float,
+        peak_velocity: float,
+        accel_time: float,
+        cruise_time: float,
+        profile: str = "trapezoid",
+        time_scale: float = 1.0,
+    ):
+        self.start = start
+        self.end = end
+        self.profile = profile
+        self.peak_velocity = peak_velocity
+        self.accel_time = accel_time
+        self.cruise_time = cruise_time
+        # >1 表示整体放慢（用于多个舵机同步到达）
+        self.time_scale = time_scale
+
+    @property
+    def distance(self) -> float:
+        return abs(self.end - self.start)
+
+    @property
+    def duration(self) -> float:
+        """移动总时长（秒）"""
+        return (2 * self.accel_time + self.cruise_time) * self.time_scale
+
+    def stretched(self, duration: float) -> "Trajectory":
+        """返回形状相同、总时长为 duration 的轨迹（只能放慢不能加快）"""
+        base = 2 * self.accel_time + self.cruise_time
+        if base <= 0 or duration <= base:
+            return self
+        return Trajectory(
+            self.start,
+            self.end,
+            self.peak_velocity,
+            self.accel_time,
+            self.cruise_time,
+            self.profile,
+            duration / base,
+        )
+
+    def position(self, t: float) -> float:
+        """t 秒时的角度"""
+        if self.distance == 0 or t >= self.duration:
+            return self.end
+        if t <= 0:
+            return self.start
+
+        t /= self.time_scale
+        ta, tc, vp = self.accel_time, self.cruise_time, self.peak_velocity
+        accel_distance = vp * ta / 2
+
+        if t < ta:
+            travelled = self._ramp(t)
+        elif t < ta + tc:
+            travelled = accel_distance + vp * (t - ta)
+        else:
+            travelled = self.distance - self._ramp(2 * ta + tc - t)
+
+        direction = 1 if self.end >= self.start else -1
+        return self.start + direction * travelled
+
+    def sample(self, interval: float) -> List[float]:
+        """按固定周期采样，返回第 1..N 个周期末的角度（最后一个等于终点）"""
+        steps = max(1, math.ceil(self.duration / interval - 1e-9))
+        return [round(self.position(i * interval), 2) for i in range(1, steps + 1)]
+
+    def _ramp(self, t: float) -> float:
+        """加速段开始后 t 秒走过的距离"""
+        ta, vp = self.accel_time, self.peak_velocity
+        if self.profile == "scurve":
+            # v(t) = vp·(1 - cos(πt/ta))/2
+            return vp / 2 * (t - ta / math.pi * math.sin(math.pi * t / ta))
+        # 匀加速 a = vp/ta
+        return vp * t * t / (2 * ta)
+
+
+def plan_move(
+    start: float, end: float, limits: MotionLimits, profile: str = "trapezoid"
+) -> Trajectory:
+    """
+    规划在限制内最快的移动
+
+    Args:
+        start: 起始角度
+        end: 目标角度
+        limits: 最大速度和加速度
+        profile: "trapezoid" 或 "scurve"
+
+    Returns:
+        从静止到静止的轨迹
+    """
+    if profile not in PROFILES:
+        raise ValueError(f"Invalid profile: {profile}. Must be one of {PROFILES}")
+    if limits.max_velocity <= 0 or limits.max_acceleration <= 0:
+        raise ValueError("Motion limits must be positive")
+
+    distance = abs(end - start)
+    v_max, a_max = limits.max_velocity, limits.max_acceleration
+    if distance == 0:
+        return Trajectory(start, end, 0.0, 0.0, 0.0, profile)
+
+    # 加速到 v 所需时间：梯形 v/a；S形峰值加速度 π·v/(2·ta) ≤ a
+    ramp_factor = math.pi / 2 if profile == "scurve" else 1.0
+    # 加速+减速两段共走 v·ta = ramp_factor·v²/a
+    if ramp_factor * v_max * v_max / a_max <= distance:
+        peak = v_max
+        accel_time = ramp_factor * peak / a_max
+        cruise_time = (distance - peak * accel_time) / peak
+    else:
+        # 三角形：到不了最大速度
+        peak = math.sqrt(distance * a_max / ramp_factor)
+        accel_time = ramp_factor * peak / a_max
+        cruise_time = 0.0
+
+    return Trajectory(start, end, peak, accel_time, cruise_time, profile)
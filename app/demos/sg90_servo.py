@@ -6,12 +6,23 @@ SG90参数:
 - 控制信号: PWM 50Hz
 - 脉冲宽度: 0.5ms(0°) ~ 2.5ms(180°)
 - 转动角度: 0-180°
+
+平滑移动由每个舵机的后台运动引擎完成：set_angle 按最大速度/加速度规划
+一条轨迹（梯形或S形）后立即返回，引擎按固定周期（TICK_INTERVAL）回放
+预先采样好的角度，或把整条轨迹编译成 pigpio 波形交给守护进程播放。拖动
+滑块时堆积的旧目标会被新目标覆盖，响应延迟不超过一个周期。
 """
 
+import itertools
 import logging
 import time
 import threading
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Tuple
+
+from .. import pigpio_connection
+from ..scheduler import PeriodicScheduler, get_scheduler
+from .servo_calibration import ServoCalibration
+from .servo_trajectory import MotionLimits, Trajectory, plan_move
 
 # 尝试导入pigpio（硬件PWM）
 try:
@@ -28,40 +39,100 @@ class SG90Servo:
 
     # PWM参数
     PWM_FREQUENCY = 50  # 50Hz
-    PULSE_MIN = 500  # 0.5ms = 500us
+    PULSE_MIN = 500  # 0.5ms = 500us（未标定时的默认映射）
     PULSE_MAX = 2500  # 2.5ms = 2500us
     ANGLE_MIN = 0  # 最小角度
     ANGLE_MAX = 180  # 最大角度
 
-    def __init__(self, pin: int = 18):
+    # 运动引擎参数
+    TICK_INTERVAL = 0.02  # 20ms，与50Hz PWM周期一致
+    MAX_VELOCITY = 200.0  # 默认最大角速度（°/s）
+    MAX_ACCELERATION = 800.0  # 默认最大角加速度（°/s²）
+    MOTION_PROFILE = "trapezoid"  # 默认轨迹类型: trapezoid / scurve
+
+    def __init__(
+        self,
+        pin: int = 18,
+        max_velocity: float = None,
+        max_acceleration: float = None,
+        profile: str = None,
+        use_waveform: bool = False,
+        scheduler: PeriodicScheduler = None,
+        calibration=None,
+    ):
         """
         初始化SG90舵机
 
         Args:
             pin: GPIO引脚号（推荐使用GPIO 18，支持硬件PWM）
+            max_velocity: 平滑移动的最大角速度（°/s）
+            max_acceleration: 平滑移动的最大角加速度（°/s²）
+            profile: 轨迹类型 "trapezoid" 或 "scurve"
+            use_waveform: 是否把平滑移动编译成pigpio波形播放
+                （pigpio同一时刻只能发送一个波形，适合单个舵机使用）
+            scheduler: 运行运动引擎和扫描的周期调度器（默认进程共享的调度器）
+            calibration: 角度-脉宽标定，ServoCalibration 或标定点
+                [(角度, 脉宽us), ...]；默认 0°->500us、180°->2500us 线性映射
         """
         self.pin = pin
         self.current_angle = 90  # 当前角度
         self.target_angle = 90  # 目标角度
         self.enabled = False  # 舵机启用状态
+        # 角度-脉宽标定表，换算只查表
+        if calibration is None:
+            calibration = [
+                (self.ANGLE_MIN, self.PULSE_MIN),
+                (self.ANGLE_MAX, self.PULSE_MAX),
+            ]
+        if not isinstance(calibration, ServoCalibration):
+            calibration = ServoCalibration(calibration, self.ANGLE_MIN, self.ANGLE_MAX)
+        self.calibration = calibration
         self.scanning = False  # 扫描状态
-        self.scan_thread = None  # 扫描线程
+
+        # 运动引擎和扫描都是共享调度器上的周期任务，不再各占一个线程
+        self.scheduler = scheduler or get_scheduler()
+        self._motion_task = None
+        self._scan_task = None
+        self._scan_position = None  # 扫描进度: [当前角度, 方向, 起点, 终点]
+        self._scan_frames = None  # 波形扫描一个往返周期的逐帧角度
+        self._scan_started = 0.0
+
+        # 运动引擎：目标角度由锁保护，新目标总是覆盖旧目标
+        self._motion_lock = threading.RLock()
+        self.limits = MotionLimits(
+            max_velocity or self.MAX_VELOCITY,
+            max_acceleration or self.MAX_ACCELERATION,
+        )
+        self.profile = profile or self.MOTION_PROFILE
+        self.use_waveform = use_waveform
+        self._trajectory: Optional[Trajectory] = None
+        self._samples = []  # 轨迹按周期采样的角度
+        self._sample_pulses = []  # 采样角度对应的脉宽，回放时不再换算
+        self._move_started = 0.0
+        self._group_driven = False  # 当前轨迹由舵机组回放，自身引擎不推进
+        self._wave_id = None
+
+        # 上一次写入的脉宽，相同的脉宽不再重复发给pigpio
+        self._last_pulse = None
+        self._pulse_writes = {"issued": 0, "suppressed": 0}
+
+        # 状态变化时调用（由状态推送设置），只做标记不阻塞
+        self.status_listener = None
+        # 状态版本号和按版本缓存的状态，状态不变时 get_status 不重新生成
+        self._versions = itertools.count(1)
+        self._status_version = 0
+        self._status_cache = (-1, None)
 
         self.logger = logging.getLogger(__name__)
 
-        # 初始化pigpio
+        # 使用进程共享的pigpio连接
         self.pi = None
         if PIGPIO_AVAILABLE:
-            try:
-                self.pi = pigpio.pi()
-                if not self.pi.connected:
-                    self.logger.warning("pigpio daemon not running")
-                    self.pi = None
-                else:
-                    self.logger.info(f"pigpio connected for servo on GPIO {self.pin}")
-            except Exception as e:
-                self.logger.error(f"Failed to connect to pigpio: {e}")
-                self.pi = None
+            self.pi = pigpio_connection.acquire()
+            if self.pi is None:
+                self.logger.warning("pigpio daemon not running")
+            else:
+                self.logger.info(f"pigpio connected for servo on GPIO {self.pin}")
         else:
             self.logger.warning("pigpio not available, servo control disabled")
 
@@ -73,16 +144,9 @@ class SG90Servo:
             angle: 角度 (0-180)
 
         Returns:
-            脉冲宽度（微秒）
+            脉冲宽度（微秒），按标定表查表
         """
-        # 限制角度范围
-        angle = max(self.ANGLE_MIN, min(self.ANGLE_MAX, angle))
-
-        # 线性映射: 0° -> 500us, 180° -> 2500us
-        pulse_width = self.PULSE_MIN + (angle / self.ANGLE_MAX) * (
-            self.PULSE_MAX - self.PULSE_MIN
-        )
-        return int(pulse_width)
+        return self.calibration.pulse_width(angle)
 
     def _pulse_width_to_angle(self, pulse_width: int) -> float:
         """
@@ -94,12 +158,38 @@ class SG90Servo:
         Returns:
             角度 (0-180)
         """
-        angle = (
-            (pulse_width - self.PULSE_MIN)
-            * self.ANGLE_MAX
-            / (self.PULSE_MAX - self.PULSE_MIN)
-        )
-        return round(angle, 1)
+        return self.calibration.angle(pulse_width)
+
+    def _record_pulse(self, pulse_width: int) -> bool:
+        """
+        记录即将写入的脉宽
+
+        Returns:
+            与上一次写入的脉宽相同时返回False，调用方跳过这次写入
+        """
+        if pulse_width == self._last_pulse:
+            self._pulse_writes["suppressed"] += 1
+            return False
+        self._last_pulse = pulse_width
+        self._pulse_writes["issued"] += 1
+        return True
+
+    def _write_pulse(self, pulse_width: int):
+        """写入脉宽，跳过与上一次相同的写入"""
+        if not self._record_pulse(pulse_width):
+            return
+        try:
+            self.pi.set_servo_pulsewidth(self.pin, pulse_width)
+        except Exception:
+            # 写入结果未知，下一次必须真正写入
+            self._last_pulse = None
+            raise
+
+    def _notify_status(self):
+        """状态变了（角度、目标、启用/扫描等）：递增版本号并通知状态推送"""
+        self._status_version = next(self._versions)
+        if self.status_listener is not None:
+            self.status_listener()
 
     def _calculate_duty_cycle(self, pulse_width: int) -> float:
         """
@@ -129,6 +219,7 @@ class SG90Servo:
             self.set_angle(self.current_angle)
 
             self.enabled = True
+            self._notify_status()
             self.logger.info(f"Servo enabled on GPIO {self.pin}")
 
             return {
@@ -146,13 +237,16 @@ class SG90Servo:
             return {"success": False, "error": "pigpio not available"}
 
         try:
-            # 停止扫描
+            # 停止扫描和运动引擎
             self.stop_scan()
+            self._stop_motion_engine()
 
             # 停止PWM输出
             self.pi.set_PWM_dutycycle(self.pin, 0)
+            self._last_pulse = None
 
             self.enabled = False
+            self._notify_status()
             self.logger.info(f"Servo disabled on GPIO {self.pin}")
 
             return {"success": True, "message": "Servo disabled"}
@@ -180,18 +274,25 @@ class SG90Servo:
         try:
             # 限制角度范围
             angle = max(self.ANGLE_MIN, min(self.ANGLE_MAX, angle))
-            self.target_angle = angle
 
             # 计算脉冲宽度
             pulse_width = self._angle_to_pulse_width(angle)
 
-            # 如果启用平滑移动
-            if smooth and abs(angle - self.current_angle) > 5:
-                self._smooth_move(angle)
-            else:
-                # 直接设置
-                self.pi.set_servo_pulsewidth(self.pin, pulse_width)
-                self.current_angle = angle
+            with self._motion_lock:
+                # 最新目标覆盖尚未完成的旧目标
+                self._halt()
+                self.target_angle = angle
+                moving = smooth and abs(angle - self.current_angle) > 5
+                if moving:
+                    # 交给运动引擎按规划好的轨迹推进，不阻塞调用方
+                    self._begin_move(
+                        plan_move(self.current_angle, angle, self.limits, self.profile)
+                    )
+                else:
+                    # 直接设置
+                    self._write_pulse(pulse_width)
+                    self.current_angle = angle
+                self._notify_status()
 
             # 计算参数
             duty_cycle = self._calculate_duty_cycle(pulse_width)
@@ -202,8 +303,10 @@ class SG90Servo:
 
             return {
                 "success": True,
-                "angle": self.current_angle,
+                "angle": self.target_angle,
+                "current_angle": self.current_angle,
                 "target_angle": self.target_angle,
+                "moving": moving,
                 "pulse_width": pulse_width / 1000,  # 转换为ms
                 "duty_cycle": duty_cycle,
             }
@@ -211,29 +314,227 @@ class SG90Servo:
             self.logger.error(f"Failed to set servo angle: {e}")
             return {"success": False, "error": str(e)}
 
-    def _smooth_move(self, target_angle: float, step: float = 2.0, delay: float = 0.02):
+    def _stop_motion_engine(self):
+        """停止运动引擎，舵机停在当前位置"""
+        with self._motion_lock:
+            self._halt()
+            task, self._motion_task = self._motion_task, None
+        if task is not None:
+            task.cancel()
+
+    def _begin_move(self, trajectory: Trajectory):
+        """开始回放一条轨迹（调用方持有运动锁）"""
+        self._trajectory = trajectory
+        self._set_samples(trajectory.sample(self.TICK_INTERVAL))
+        self._move_started = time.monotonic()
+        self._group_driven = False
+        self.target_angle = trajectory.end
+
+        if self.use_waveform and not self._send_waveform(self._samples):
+            self.logger.warning("pigpio waveform unavailable, using timed updates")
+
+        if self._motion_task is None:
+            # 立即执行第一个周期，之后按绝对截止时间推进
+            self._motion_task = self.scheduler.schedule(
+                self.TICK_INTERVAL,
+                self._motion_tick,
+                name=f"servo-{self.pin}-motion",
+                delay=0,
+            )
+
+    def _set_samples(self, samples):
+        """记录轨迹采样并预先换算成脉宽（调用方持有运动锁）"""
+        self._samples = samples
+        self._sample_pulses = [self._angle_to_pulse_width(angle) for angle in samples]
+
+    def _halt(self):
+        """中止当前轨迹，停在当前位置（调用方持有运动锁）"""
+        if self._trajectory is not None and self._wave_id is not None:
+            elapsed = time.monotonic() - self._move_started
+            self.current_angle = round(self._trajectory.position(elapsed), 2)
+            self._end_waveform(self.current_angle)
+        self._trajectory = None
+        self._group_driven = False
+        self.target_angle = self.current_angle
+        self._notify_status()
+
+    # ---- 舵机组接口：ServoGroup 只通过这些方法驱动舵机 ----
+
+    def plan_group_move(self, angle: float) -> Trajectory:
+        """中止当前运动，规划从当前位置到目标角度的轨迹（不开始执行）"""
+        angle = max(self.ANGLE_MIN, min(self.ANGLE_MAX, angle))
+        with self._motion_lock:
+            self._halt()
+            return plan_move(self.current_angle, angle, self.limits, self.profile)
+
+    def begin_group_move(
+        self, trajectory: Trajectory, started: float, interval: float
+    ):
+        """接受舵机组规划的同步轨迹
+
+        轨迹由舵机组在同一个周期任务中与其他舵机一起回放（见
+        group_move_step），这里只记录状态；之后的 set_angle 等命令会照常覆盖它。
+
+        Args:
+            trajectory: 已拉伸到整组时长的轨迹
+            started: 整组开始时间（time.monotonic）
+            interval: 舵机组的回放周期（秒）
         """
-        平滑移动到目标角度
+        with self._motion_lock:
+            self._halt()
+            self._trajectory = trajectory
+            self._set_samples(trajectory.sample(interval))
+            self._move_started = started
+            self._group_driven = True
+            self.target_angle = trajectory.end
+            self._notify_status()
+
+    def group_move_step(
+        self, trajectory: Trajectory, index: int
+    ) -> Optional[Tuple[Optional[int], bool]]:
+        """推进同步轨迹到第 index 个采样点
 
         Args:
-            target_angle: 目标角度
-            step: 每步移动的角度
-            delay: 每步之间的延迟（秒）
+            trajectory: begin_group_move 接受的轨迹
+            index: 采样序号，超出时取最后一个
+
+        Returns:
+            (需要写入的脉宽, 是否到达终点)，脉宽与上一次相同时为None；
+            轨迹已被单独的命令覆盖或没有pigpio连接时返回None
         """
-        while abs(self.current_angle - target_angle) > step:
-            if self.current_angle < target_angle:
-                self.current_angle += step
-            else:
-                self.current_angle -= step
+        with self._motion_lock:
+            if self._trajectory is not trajectory or self.pi is None:
+                return None
+            last = len(self._samples) - 1
+            index = min(index, last)
+            pulse_width = self._sample_pulses[index]
+            if not self._record_pulse(pulse_width):
+                pulse_width = None
+            self.current_angle = self._samples[index]
+            finished = index == last
+            if finished:
+                self._trajectory = None
+                self._group_driven = False
+            self._notify_status()
+            return pulse_width, finished
+
+    def cancel_group_move(self, trajectory: Trajectory):
+        """中止同步轨迹，停在当前位置；轨迹已被覆盖时不做任何事"""
+        with self._motion_lock:
+            if self._trajectory is trajectory:
+                self._halt()
+
+    def pulse_write_failed(self):
+        """舵机组的脉宽写入失败：结果未知，下一次必须真正写入"""
+        self._last_pulse = None
+
+    def _motion_tick(self) -> bool:
+        """运动引擎周期任务：按已用时间取出轨迹上的下一个角度
 
-            pulse_width = self._angle_to_pulse_width(self.current_angle)
-            self.pi.set_servo_pulsewidth(self.pin, pulse_width)
-            time.sleep(delay)
+        Returns:
+            轨迹结束时返回False，任务随之停止，直到下一次移动
+        """
+        with self._motion_lock:
+            try:
+                if not self._engine_idle():
+                    self._advance_trajectory()
+            except Exception as e:
+                self.logger.error(f"Servo motion error: {e}")
+                self._halt()
+            if self._engine_idle():
+                self._motion_task = None
+                return False
+            return True
+
+    def _engine_idle(self) -> bool:
+        """没有需要自身引擎回放的轨迹（调用方持有运动锁）"""
+        return self._trajectory is None or self.scanning or self._group_driven
+
+    def _advance_trajectory(self):
+        """回放轨迹的一个周期（调用方持有运动锁）"""
+        trajectory = self._trajectory
+        elapsed = time.monotonic() - self._move_started
+        last = len(self._samples) - 1
+        index = min(int(elapsed / self.TICK_INTERVAL), last)
+
+        if self._wave_id is not None:
+            # 波形由守护进程播放，这里只跟踪位置
+            if elapsed < trajectory.duration:
+                self.current_angle = round(trajectory.position(elapsed), 2)
+                self._notify_status()
+                return
+            self._end_waveform(trajectory.end)
+            index = last
+        else:
+            self._write_pulse(self._sample_pulses[index])
+
+        self.current_angle = self._samples[index]
+        if index == last:
+            self._trajectory = None
+        self._notify_status()
+
+    def _send_waveform(self, samples) -> bool:
+        """把采样角度编译成波形并发送一次，失败返回False"""
+        wave_id = self._create_waveform(samples)
+        if wave_id is None:
+            return False
+        self._wave_id = wave_id
+        try:
+            self.pi.wave_send_once(wave_id)
+        except Exception as e:
+            self.logger.debug(f"Waveform send failed: {e}")
+            self._end_waveform(self.current_angle)
+            return False
+        return True
+
+    def _create_waveform(self, angles) -> Optional[int]:
+        """把角度序列编译成每个PWM帧一个脉冲的波形，失败返回None
+
+        守护进程只有一个波形发送器，先占用它；被PWM组或其他舵机占用时
+        返回None，调用方退回定时更新。
+        """
+        manager = pigpio_connection.get_manager()
+        if not manager.claim_wave(self._wave_owner):
+            self.logger.debug(f"Wave transmitter in use by {manager.wave_owner()}")
+            return None
+        try:
+            frame = int(1000000 / self.PWM_FREQUENCY)
+            mask = 1 << self.pin
+            pulses = []
+            for angle in angles:
+                pulse_width = self._angle_to_pulse_width(angle)
+                pulses.append(pigpio.pulse(mask, 0, pulse_width))
+                pulses.append(pigpio.pulse(0, mask, frame - pulse_width))
+
+            # 释放舵机PWM，改由波形驱动引脚
+            self._write_pulse(0)
+            self.pi.set_mode(self.pin, pigpio.OUTPUT)
+            self.pi.wave_add_new()
+            self.pi.wave_add_generic(pulses)
+            wave_id = self.pi.wave_create()
+            if wave_id >= 0:
+                return wave_id
+        except Exception as e:
+            self.logger.debug(f"Waveform create failed: {e}")
+        manager.release_wave(self._wave_owner)
+        return None
 
-        # 最后精确到达目标
-        self.current_angle = target_angle
-        pulse_width = self._angle_to_pulse_width(target_angle)
-        self.pi.set_servo_pulsewidth(self.pin, pulse_width)
+    @property
+    def _wave_owner(self) -> str:
+        return f"servo-{self.pin}"
+
+    def _end_waveform(self, hold_angle: float):
+        """停止并删除波形，恢复舵机PWM保持在 hold_angle"""
+        wave_id, self._wave_id = self._wave_id, None
+        try:
+            if self.pi.wave_tx_busy():
+                self.pi.wave_tx_stop()
+            self.pi.wave_delete(wave_id)
+        except Exception as e:
+            self.logger.debug(f"Waveform cleanup warning: {e}")
+        finally:
+            pigpio_connection.get_manager().release_wave(self._wave_owner)
+        self._write_pulse(self._angle_to_pulse_width(hold_angle))
 
     def step_move(self, step: float) -> Dict[str, Any]:
         """
@@ -245,11 +546,16 @@ class SG90Servo:
         Returns:
             操作结果
         """
-        new_angle = self.current_angle + step
+        # 以目标角度为基准，连续步进不会因运动未完成而丢步
+        new_angle = self.target_angle + step
         return self.set_angle(new_angle)
 
     def start_scan(
-        self, start_angle: float = 0, end_angle: float = 180, speed: str = "medium"
+        self,
+        start_angle: float = 0,
+        end_angle: float = 180,
+        speed: str = "medium",
+        use_waveform: bool = None,
     ) -> Dict[str, Any]:
         """
         开始扫描模式
@@ -258,6 +564,8 @@ class SG90Servo:
             start_angle: 起始角度
             end_angle: 结束角度
             speed: 扫描速度 (slow/medium/fast)
+            use_waveform: 是否把扫描编译成循环播放的pigpio波形
+                （默认跟随 self.use_waveform）
 
         Returns:
             操作结果
@@ -272,14 +580,34 @@ class SG90Servo:
         speed_map = {"slow": 0.05, "medium": 0.03, "fast": 0.01}
         delay = speed_map.get(speed, 0.03)
 
-        self.scanning = True
-        self.scan_thread = threading.Thread(
-            target=self._scan_worker, args=(start_angle, end_angle, delay), daemon=True
-        )
-        self.scan_thread.start()
+        if use_waveform is None:
+            use_waveform = self.use_waveform
+
+        with self._motion_lock:
+            self._halt()
+            self._scan_position = [start_angle, 1, start_angle, end_angle]
+            self.scanning = True
+            try:
+                waveform = use_waveform and self._start_scan_waveform(
+                    start_angle, end_angle, delay
+                )
+            except Exception as e:
+                # 没有周期任务的扫描状态会让之后的 start_scan 一直被拒绝
+                self.scanning = False
+                self.logger.error(f"Failed to start scan: {e}")
+                return {"success": False, "error": str(e)}
+            finally:
+                self._notify_status()
+
+        if not waveform:
+            # 按绝对截止时间运行，周期不受pigpio延迟影响
+            self._scan_task = self.scheduler.schedule(
+                delay, self._scan_tick, name=f"servo-{self.pin}-scan", delay=0
+            )
 
         self.logger.info(
             f"Scan started: {start_angle}° to {end_angle}° at {speed} speed"
+            + (" (waveform)" if waveform else "")
         )
 
         return {
@@ -288,19 +616,64 @@ class SG90Servo:
             "start_angle": start_angle,
             "end_angle": end_angle,
             "speed": speed,
+            "waveform": bool(waveform),
         }
 
-    def _scan_worker(self, start_angle: float, end_angle: float, delay: float):
-        """扫描工作线程"""
-        direction = 1  # 1: 前进, -1: 后退
-        current = start_angle
+    def _start_scan_waveform(
+        self, start_angle: float, end_angle: float, delay: float
+    ) -> bool:
+        """编译一个往返扫描周期的波形并循环播放（调用方持有运动锁）"""
+        # 波形按标准20ms帧输出，每帧步长按原来的 2°/delay 速度换算
+        frame_time = 1.0 / self.PWM_FREQUENCY
+        frame_step = 2.0 * frame_time / delay
+        forward = [start_angle]
+        while forward[-1] + frame_step < end_angle:
+            forward.append(round(forward[-1] + frame_step, 2))
+        forward.append(end_angle)
+        frames = forward + forward[-2:0:-1]
+
+        wave_id = self._create_waveform(frames)
+        if wave_id is None:
+            self.logger.warning("pigpio waveform unavailable, using timed scan")
+            return False
+
+        # 255 0 ... 255 3: 循环播放直到 wave_tx_stop
+        self._wave_id = wave_id
+        try:
+            self.pi.wave_chain([255, 0, wave_id, 255, 3])
+        except Exception as e:
+            # 删除波形并释放发送器，否则PWM组和之后的波形都无法使用
+            self.logger.warning(f"pigpio waveform scan failed, using timed scan: {e}")
+            self._end_waveform(self.current_angle)
+            return False
+        self._scan_frames = frames
+        self._scan_started = time.monotonic()
+        return True
+
+    def _sync_scan_angle(self):
+        """波形扫描时根据已播放时间推算当前角度（调用方持有运动锁）"""
+        if not self.scanning or self._wave_id is None or not self._scan_frames:
+            return
+        frame_time = 1.0 / self.PWM_FREQUENCY
+        elapsed = time.monotonic() - self._scan_started
+        index = int(elapsed / frame_time) % len(self._scan_frames)
+        if self._scan_frames[index] != self.current_angle:
+            self.current_angle = self._scan_frames[index]
+            self._notify_status()
+
+    def _scan_tick(self) -> bool:
+        """扫描周期任务：输出当前角度并前进一步"""
         step = 2.0  # 每步2度
 
-        while self.scanning:
+        with self._motion_lock:
+            if not self.scanning:
+                return False
+            current, direction, start_angle, end_angle = self._scan_position
+
             # 设置角度
-            pulse_width = self._angle_to_pulse_width(current)
-            self.pi.set_servo_pulsewidth(self.pin, pulse_width)
+            self._write_pulse(self._angle_to_pulse_width(current))
             self.current_angle = current
+            self._notify_status()
 
             # 移动到下一个位置
             current += step * direction
@@ -313,18 +686,30 @@ class SG90Servo:
                 current = start_angle
                 direction = 1
 
-            time.sleep(delay)
+            self._scan_position = [current, direction, start_angle, end_angle]
+            return True
 
     def stop_scan(self) -> Dict[str, Any]:
         """停止扫描"""
         if not self.scanning:
             return {"success": True, "message": "Not scanning"}
 
-        self.scanning = False
+        with self._motion_lock:
+            self._sync_scan_angle()
+            self.scanning = False
+            if self._scan_frames:
+                # 停止循环波形，舵机PWM保持在当前角度
+                self._end_waveform(self.current_angle)
+                self._scan_frames = None
+
+        # 取消周期任务并等待正在执行的一步结束
+        task, self._scan_task = self._scan_task, None
+        if task is not None:
+            task.cancel()
 
-        # 等待线程结束
-        if self.scan_thread and self.scan_thread.is_alive():
-            self.scan_thread.join(timeout=1.0)
+        # 停在扫描结束的位置，运动引擎不再拉回旧目标
+        with self._motion_lock:
+            self._halt()
 
         self.logger.info("Scan stopped")
 
@@ -339,8 +724,32 @@ class SG90Servo:
         self.stop_scan()
         return self.disable()
 
+    @property
+    def status_version(self) -> int:
+        """状态版本号，每次状态变化递增"""
+        return self._status_version
+
     def get_status(self) -> Dict[str, Any]:
-        """获取舵机状态"""
+        """
+        获取舵机状态
+
+        状态只在版本号变化后重新生成，不带时间戳（发送时再附加）。
+        """
+        with self._motion_lock:
+            self._sync_scan_angle()
+            version, status = self._status_cache
+            if version != self._status_version:
+                version, status = self._status_version, self._build_status()
+                self._status_cache = (version, status)
+
+        return {
+            **status,
+            "version": version,
+            "pulse_writes": dict(self._pulse_writes),
+        }
+
+    def _build_status(self) -> Dict[str, Any]:
+        """重新生成状态（调用方持有运动锁）"""
         pulse_width = self._angle_to_pulse_width(self.current_angle)
         duty_cycle = self._calculate_duty_cycle(pulse_width)
 
@@ -354,19 +763,27 @@ class SG90Servo:
             "duty_cycle": duty_cycle,
             "frequency": self.PWM_FREQUENCY,
             "scanning": self.scanning,
+            "scan_waveform": self.scanning and self._scan_frames is not None,
+            "moving": self._trajectory is not None,
+            "motion_profile": self.profile,
+            "max_velocity": self.limits.max_velocity,
+            "max_acceleration": self.limits.max_acceleration,
+            "calibration": self.calibration.to_list(),
             "pigpio_available": self.pi is not None,
-            "timestamp": time.strftime("%H:%M:%S"),
         }
 
     def cleanup(self):
         """清理资源"""
         self.stop_scan()
+        self._stop_motion_engine()
         if self.pi:
             try:
                 self.pi.set_PWM_dutycycle(self.pin, 0)
-                self.pi.stop()
+                self._last_pulse = None
+                self.pi.stop()  # 释放共享连接的引用
                 self.logger.info("Servo cleanup completed")
             except Exception as e:
                 self.logger.warning(f"Servo cleanup warning: {e}")
             finally:
                 self.pi = None
+                self._notify_status()
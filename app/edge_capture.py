@@ -0,0 +1,166 @@
+"""
+Logic-analyzer style edge capture
+
+read_pin is a one-shot read, so fast signals (sensor pulses, bus timing)
+could not be observed without a separate logic analyzer. EdgeCapture
+records the edges of a set of pins, with the microsecond tick the backend
+reports for each one (pigpio ticks on a Pi), into a ring buffer that is
+allocated once when the capture starts. Recording starts at once or when
+a trigger edge is seen, and stops a given time after that. Edges before
+the trigger are kept while they fit in the buffer.
+
+The result is compressed for a single response instead of one socket
+message per sample: each edge is ``[dt_us, pin, level]``, where dt is the
+time since the previous edge. The first edge's dt is relative to the
+trigger, or to the capture start, and is negative for edges before the
+trigger.
+"""
+
+import time
+from array import array
+from typing import Any, Dict, Iterable, List, Optional
+
+TICK_MASK = 0xFFFFFFFF  # ticks are unsigned 32-bit microseconds and wrap
+TRIGGER_EDGES = ("rising", "falling", "either")
+
+
+class EdgeCapture:
+    """Record pin edges into a preallocated ring buffer"""
+
+    DEFAULT_MAX_EDGES = 65536
+
+    def __init__(
+        self,
+        pins: Iterable[int],
+        duration: float,
+        levels: Dict[int, int],
+        start_tick: int,
+        trigger: Dict[str, Any] = None,
+        max_edges: int = None,
+    ):
+        """
+        Args:
+            pins: pins being captured
+            duration: seconds to record after the trigger (or the start)
+            levels: level of each pin when the capture starts
+            start_tick: backend tick when the capture starts
+            trigger: ``{"pin", "edge"}`` with edge one of TRIGGER_EDGES;
+                None starts recording immediately
+            max_edges: ring buffer size; older edges are overwritten
+        """
+        self.pins = sorted(pins)
+        self.duration = float(duration)
+        self.trigger = trigger
+        self.size = max_edges or self.DEFAULT_MAX_EDGES
+        self.start_tick = start_tick & TICK_MASK
+        self.recording = True
+
+        # Latest level of every pin, including edges that were overwritten
+        self.levels = {pin: int(levels.get(pin, 0)) for pin in self.pins}
+        self._pin_set = frozenset(self.pins)
+        self._duration_us = int(self.duration * 1_000_000)
+        self._ticks = array("I", [0]) * self.size
+        self._edge_pins = bytearray(self.size)
+        self._edge_levels = bytearray(self.size)
+        self._count = 0
+
+        self.trigger_tick: Optional[int] = None
+        self.triggered_at: Optional[float] = None
+        if trigger is None:
+            self.trigger_tick = self.start_tick
+            self.triggered_at = time.monotonic()
+
+    @staticmethod
+    def validate_trigger(trigger: Any, pins: Iterable[int]) -> Optional[str]:
+        """Return an error message for an invalid trigger, or None"""
+        if trigger is None:
+            return None
+        if not isinstance(trigger, dict):
+            return "Trigger must be an object"
+        if trigger.get("pin") not in set(pins):
+            return f"Trigger pin must be one of the captured pins: {trigger.get('pin')}"
+        if trigger.get("edge", "either") not in TRIGGER_EDGES:
+            return f"Invalid trigger edge: {trigger.get('edge')}"
+        return None
+
+    @property
+    def triggered(self) -> bool:
+        return self.trigger_tick is not None
+
+    def on_edge(self, pin: int, level: int, tick: int):
+        """Edge callback (runs on the backend's callback thread)"""
+        if not self.recording or pin not in self._pin_set:
+            return
+        tick &= TICK_MASK
+
+        if self.trigger_tick is None:
+            if self._is_trigger(pin, level):
+                self.trigger_tick = tick
+                self.triggered_at = time.monotonic()
+        elif (tick - self.trigger_tick) & TICK_MASK > self._duration_us:
+            self.recording = False
+            return
+
+        index = self._count % self.size
+        self._ticks[index] = tick
+        self._edge_pins[index] = pin
+        self._edge_levels[index] = level
+        self.levels[pin] = level
+        self._count += 1
+
+    def _is_trigger(self, pin: int, level: int) -> bool:
+        if pin != self.trigger["pin"]:
+            return False
+        edge = self.trigger.get("edge", "either")
+        return edge == "either" or (level == 1) == (edge == "rising")
+
+    def done(self, now: float = None) -> bool:
+        """Whether the recording window after the trigger has passed"""
+        if not self.recording:
+            return True
+        if self.triggered_at is None:
+            return False
+        now = time.monotonic() if now is None else now
+        return now - self.triggered_at >= self.duration
+
+    def stop(self):
+        self.recording = False
+
+    def result(self) -> Dict[str, Any]:
+        """Compressed edge list of everything recorded"""
+        self.recording = False
+        count = min(self._count, self.size)
+        first = self._count - count
+        reference = self.start_tick if self.trigger_tick is None else self.trigger_tick
+
+        edges: List[List[int]] = []
+        initial = dict(self.levels)
+        seen = set()
+        previous = reference
+        for n in range(first, self._count):
+            index = n % self.size
+            tick = self._ticks[index]
+            pin = self._edge_pins[index]
+            level = self._edge_levels[index]
+            if edges:
+                dt = (tick - previous) & TICK_MASK
+            else:
+                # Signed: edges before the trigger come out negative
+                dt = ((tick - previous + 0x80000000) & TICK_MASK) - 0x80000000
+            edges.append([dt, pin, level])
+            previous = tick
+            if pin not in seen:
+                # Level before the first retained edge of the pin
+                seen.add(pin)
+                initial[pin] = 1 - level
+
+        return {
+            "pins": self.pins,
+            "initial": initial,
+            "trigger": self.trigger,
+            "triggered": self.triggered,
+            "duration": self.duration,
+            "edges": edges,
+            "count": len(edges),
+            "dropped": self._count - count,
+        }
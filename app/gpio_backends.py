@@ -0,0 +1,798 @@
+"""
+GPIO hardware backends
+
+GPIOController talks to hardware through one of these backends, chosen once
+at startup, instead of checking GPIO_AVAILABLE/PIGPIO_AVAILABLE in every
+method:
+
+- PigpioBackend:   pigpio daemon (bank access, pipelining, hardware and
+  DMA PWM, phase-locked PWM groups as waveforms)
+- RPiGPIOBackend:  RPi.GPIO (software PWM, event detect)
+- SimulatorBackend: in-memory model with a virtual clock, for development
+  and load testing on machines without a Pi
+
+The library modules are passed in by the caller, so this module has no
+hard dependency on RPi.GPIO or pigpio.
+"""
+
+import logging
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from . import pigpio_connection
+from .pigpio_pipeline import CommandPipeline
+from .pwm_allocator import (
+    ENGINE_DMA,
+    ENGINE_HARDWARE,
+    ENGINE_SOFTWARE,
+    PWMAllocator,
+)
+
+# Edge callback signature: callback(pin, level, tick_us)
+EdgeCallback = Callable[[int, int, int], None]
+
+
+class GPIOBackend:
+    """Hardware access interface used by GPIOController"""
+
+    name = "base"
+    # PWM engines the backend can drive (see pwm_allocator)
+    pwm_engines: Tuple[str, ...] = ()
+
+    def __init__(self):
+        self.logger = logging.getLogger(__name__)
+        self.initialized = True
+        self.pwm_allocator = PWMAllocator(self.pwm_engines)
+
+    def ensure_initialized(self) -> bool:
+        """Make sure the backend is usable; cheap on the hot path"""
+        return True
+
+    def check_health(self) -> bool:
+        """Explicit health probe, used by the debug endpoint"""
+        return self.initialized
+
+    def setup(self, pin: int, mode: str, pull: Optional[str] = None):
+        """Configure a pin as "input" (with optional pullup/pulldown) or "output\""""
+        raise NotImplementedError
+
+    def read(self, pin: int) -> int:
+        raise NotImplementedError
+
+    def write(self, pin: int, value: int, pipeline: CommandPipeline = None):
+        raise NotImplementedError
+
+    def read_bank(self, pins: Iterable[int]) -> int:
+        """Return bank 1 levels as a bitmask; only ``pins`` are guaranteed valid"""
+        levels = 0
+        for pin in pins:
+            if self.read(pin):
+                levels |= 1 << pin
+        return levels
+
+    def write_bank(
+        self, set_mask: int, clear_mask: int, pipeline: CommandPipeline = None
+    ):
+        """Drive the pins in ``set_mask`` HIGH and those in ``clear_mask`` LOW"""
+        for pin in range(32):
+            if (set_mask >> pin) & 1:
+                self.write(pin, 1)
+            elif (clear_mask >> pin) & 1:
+                self.write(pin, 0)
+
+    def pipeline(self) -> Optional[CommandPipeline]:
+        """Return a command pipeline if the backend supports one"""
+        return None
+
+    def start_pwm(
+        self,
+        pin: int,
+        frequency: int,
+        duty_cycle: float,
+        pipeline: CommandPipeline = None,
+    ) -> Dict[str, Any]:
+        """Start PWM and return the info dict stored in pwm_instances"""
+        raise NotImplementedError
+
+    def stop_pwm(self, pin: int, info: Dict[str, Any]):
+        """Stop PWM described by ``info``"""
+        instance = info.get("instance")
+        if instance is not None:
+            instance.stop()
+        self.pwm_allocator.release(pin)
+
+    def update_pwm(
+        self, pin: int, info: Dict[str, Any], frequency: int, duty_cycle: float
+    ) -> Dict[str, Any]:
+        """Change frequency/duty cycle of running PWM and return the new info
+
+        This default restarts the PWM; backends that can change it in place
+        override it.
+        """
+        self.stop_pwm(pin, info)
+        return self.start_pwm(pin, frequency, duty_cycle)
+
+    def pwm_group_error(self, previous: Dict[str, Any] = None) -> Optional[str]:
+        """Why a PWM group cannot start now (None if it can)
+
+        ``previous`` is the info of the group being replaced, if any.
+        """
+        return None
+
+    def start_pwm_group(
+        self,
+        frequency: int,
+        channels: Dict[int, Tuple[float, float]],
+        previous: Dict[str, Any] = None,
+    ) -> Dict[str, Any]:
+        """Start PWM on several pins at a common frequency
+
+        ``channels`` maps pin -> (duty cycle %, phase offset as a fraction
+        of the period). When ``previous`` is the info of a running group on
+        the same pins, it is replaced. Returns the group info.
+
+        This default starts the pins one after another, so it has no phase
+        control; backends that can do better override it.
+        """
+        if previous is not None:
+            self.stop_pwm_group(previous)
+        pipeline = self.pipeline()
+        started = {
+            pin: self.start_pwm(pin, frequency, duty_cycle, pipeline)
+            for pin, (duty_cycle, _) in channels.items()
+        }
+        if pipeline is not None:
+            pipeline.flush()
+        return {"type": "sequential", "frequency": frequency, "channels": started}
+
+    def stop_pwm_group(self, info: Dict[str, Any]):
+        """Stop a PWM group started by start_pwm_group()"""
+        for pin, channel in info["channels"].items():
+            self.stop_pwm(pin, channel)
+
+    def watch(self, pin: int, debounce_ms: int, callback: EdgeCallback) -> Any:
+        """Register an edge callback; returns a handle for unwatch()"""
+        raise NotImplementedError
+
+    def unwatch(self, pin: int, handle: Any):
+        raise NotImplementedError
+
+    def tick(self) -> int:
+        """Current microsecond tick, on the same clock as edge callbacks"""
+        return _tick()
+
+    def reset(self, pins: Iterable[int]):
+        """Return the given pins to their power-on state"""
+
+    def close(self):
+        """Release hardware resources; ensure_initialized() may reopen them"""
+
+    def get_status(self) -> Dict[str, Any]:
+        return {
+            "backend": self.name,
+            "initialized": bool(self.initialized),
+            "pwm": self.pwm_allocator.get_status(),
+        }
+
+
+class PigpioBackend(GPIOBackend):
+    """Backend using the shared pigpio daemon connection"""
+
+    name = "pigpio"
+    pwm_engines = (ENGINE_HARDWARE, ENGINE_DMA)
+    # DMA PWM duty range: duty cycle % in steps of 0.01
+    DMA_PWM_RANGE = 10000
+    # Name under which PWM groups hold the daemon's wave transmitter
+    WAVE_OWNER = "pwm_group"
+
+    def __init__(self, pigpio_module, pi=None):
+        super().__init__()
+        self.pigpio = pigpio_module
+        self.pi = pi if pi is not None else pigpio_connection.acquire()
+        self.initialized = self.pi is not None
+        # Info of the PWM group currently playing as a waveform
+        self._wave_group: Optional[Dict[str, Any]] = None
+
+    def ensure_initialized(self) -> bool:
+        if self.pi is None:
+            # Reopen after close(), e.g. following a gpio_cleanup request
+            self.pi = pigpio_connection.acquire()
+            self.initialized = self.pi is not None
+        return self.initialized
+
+    def check_health(self) -> bool:
+        if self.pi is None:
+            return False
+        try:
+            return bool(self.pi.connected)
+        except Exception:
+            return False
+
+    def setup(self, pin: int, mode: str, pull: Optional[str] = None):
+        if mode == "input":
+            self.pi.set_mode(pin, self.pigpio.INPUT)
+            if pull == "pullup":
+                self.pi.set_pull_up_down(pin, self.pigpio.PUD_UP)
+            elif pull == "pulldown":
+                self.pi.set_pull_up_down(pin, self.pigpio.PUD_DOWN)
+            else:
+                self.pi.set_pull_up_down(pin, self.pigpio.PUD_OFF)
+        elif mode == "output":
+            self.pi.set_mode(pin, self.pigpio.OUTPUT)
+
+    def read(self, pin: int) -> int:
+        return int(self.pi.read(pin))
+
+    def write(self, pin: int, value: int, pipeline: CommandPipeline = None):
+        (pipeline if pipeline is not None else self.pi).write(pin, value)
+
+    def read_bank(self, pins: Iterable[int]) -> int:
+        # One command for all 32 levels
+        return int(self.pi.read_bank_1())
+
+    def write_bank(
+        self, set_mask: int, clear_mask: int, pipeline: CommandPipeline = None
+    ):
+        target = pipeline if pipeline is not None else self.pi
+        if set_mask:
+            target.set_bank_1(set_mask)
+        if clear_mask:
+            target.clear_bank_1(clear_mask)
+
+    def pipeline(self) -> Optional[CommandPipeline]:
+        return CommandPipeline(self.pi)
+
+    def start_pwm(
+        self,
+        pin: int,
+        frequency: int,
+        duty_cycle: float,
+        pipeline: CommandPipeline = None,
+    ) -> Dict[str, Any]:
+        engine = self.pwm_allocator.allocate(pin)
+        target = pipeline if pipeline is not None else self.pi
+        try:
+            if engine == ENGINE_HARDWARE:
+                # PWM peripheral, duty in millionths
+                target.hardware_PWM(pin, frequency, int(duty_cycle * 10000))
+            else:
+                # Not pipelined: the daemon answers with the frequency it
+                # actually uses (the nearest sample rate step)
+                frequency = self.pi.set_PWM_frequency(pin, frequency)
+                target.set_PWM_range(pin, self.DMA_PWM_RANGE)
+                target.set_PWM_dutycycle(pin, self._dma_duty(duty_cycle))
+        except Exception:
+            # Give the hardware channel back so a retry can use it
+            self.pwm_allocator.release(pin)
+            raise
+        return {
+            "type": "pigpio",
+            "engine": engine,
+            "frequency": frequency,
+            "duty_cycle": duty_cycle,
+        }
+
+    def stop_pwm(self, pin: int, info: Dict[str, Any]):
+        if info.get("type") != "pigpio":
+            super().stop_pwm(pin, info)
+            return
+        if info.get("engine") == ENGINE_DMA:
+            self.pi.set_PWM_dutycycle(pin, 0)
+        else:
+            self.pi.hardware_PWM(pin, 0, 0)
+        self.pwm_allocator.release(pin)
+
+    def update_pwm(
+        self, pin: int, info: Dict[str, Any], frequency: int, duty_cycle: float
+    ) -> Dict[str, Any]:
+        if info.get("type") != "pigpio":
+            return super().update_pwm(pin, info, frequency, duty_cycle)
+        # Both engines reprogram the running output without stopping it
+        if info.get("engine") == ENGINE_DMA:
+            if frequency != info["frequency"]:
+                frequency = self.pi.set_PWM_frequency(pin, frequency)
+            if duty_cycle != info["duty_cycle"]:
+                self.pi.set_PWM_dutycycle(pin, self._dma_duty(duty_cycle))
+        else:
+            self.pi.hardware_PWM(pin, frequency, int(duty_cycle * 10000))
+        return {**info, "frequency": frequency, "duty_cycle": duty_cycle}
+
+    def _dma_duty(self, duty_cycle: float) -> int:
+        return int(round(duty_cycle * self.DMA_PWM_RANGE / 100))
+
+    def pwm_group_error(self, previous: Dict[str, Any] = None) -> Optional[str]:
+        # The daemon has one wave transmitter: one group at a time, and none
+        # while a servo waveform is playing
+        if self._wave_group is not None and self._wave_group is not previous:
+            return "Only one PWM group can run at a time on pigpio"
+        owner = pigpio_connection.get_manager().wave_owner()
+        if owner not in (None, self.WAVE_OWNER):
+            return f"pigpio wave transmitter is in use by {owner}"
+        return None
+
+    def start_pwm_group(
+        self,
+        frequency: int,
+        channels: Dict[int, Tuple[float, float]],
+        previous: Dict[str, Any] = None,
+    ) -> Dict[str, Any]:
+        error = self.pwm_group_error(previous)
+        if error is None and not pigpio_connection.get_manager().claim_wave(
+            self.WAVE_OWNER
+        ):
+            error = "pigpio wave transmitter is in use"
+        if error:
+            raise RuntimeError(error)
+
+        # One repeating waveform drives every pin from the same DMA timeline,
+        # so all edges keep their relative phase
+        try:
+            wave_id = self._create_pwm_wave(frequency, channels)
+            if previous is not None and previous.get("type") == "pigpio_wave":
+                # Switch at the end of the current cycle, then free the old wave
+                self.pi.wave_send_using_mode(
+                    wave_id, self.pigpio.WAVE_MODE_REPEAT_SYNC
+                )
+                self._wait_for_wave(wave_id, previous["frequency"])
+                self.pi.wave_delete(previous["wave_id"])
+            else:
+                if previous is not None:
+                    super().stop_pwm_group(previous)
+                self.pi.wave_send_using_mode(wave_id, self.pigpio.WAVE_MODE_REPEAT)
+        except Exception:
+            if self._wave_group is None:
+                pigpio_connection.get_manager().release_wave(self.WAVE_OWNER)
+            raise
+        self._wave_group = {
+            "type": "pigpio_wave",
+            "frequency": frequency,
+            "wave_id": wave_id,
+            "channels": {
+                pin: {"type": "pigpio_wave", "engine": "wave"} for pin in channels
+            },
+        }
+        return self._wave_group
+
+    def stop_pwm_group(self, info: Dict[str, Any]):
+        if info.get("type") != "pigpio_wave":
+            super().stop_pwm_group(info)
+            return
+        try:
+            self.pi.wave_tx_stop()
+            self.pi.wave_delete(info["wave_id"])
+            mask = 0
+            for pin in info["channels"]:
+                mask |= 1 << pin
+            self.pi.clear_bank_1(mask)
+        finally:
+            if self._wave_group is info:
+                self._wave_group = None
+                pigpio_connection.get_manager().release_wave(self.WAVE_OWNER)
+
+    def _create_pwm_wave(
+        self, frequency: int, channels: Dict[int, Tuple[float, float]]
+    ) -> int:
+        """Build one PWM period for all channels as a pigpio waveform"""
+        pulses = [
+            self.pigpio.pulse(on, off, delay)
+            for on, off, delay in pwm_wave_edges(frequency, channels)
+        ]
+        self.pi.wave_add_new()
+        self.pi.wave_add_generic(pulses)
+        wave_id = self.pi.wave_create()
+        if wave_id < 0:
+            raise RuntimeError(f"pigpio could not create PWM waveform ({wave_id})")
+        return wave_id
+
+    def _wait_for_wave(self, wave_id: int, frequency: float):
+        """Wait (at most two periods) until the daemon transmits ``wave_id``"""
+        deadline = time.monotonic() + 2.0 / frequency
+        while time.monotonic() < deadline:
+            if self.pi.wave_tx_at() == wave_id:
+                return
+            time.sleep(min(0.001, 1.0 / frequency))
+
+    def watch(self, pin: int, debounce_ms: int, callback: EdgeCallback) -> Any:
+        self.pi.set_glitch_filter(pin, debounce_ms * 1000)
+
+        def on_edge(gpio, level, tick):
+            # Level 2 is a watchdog timeout, not an edge
+            if level in (0, 1):
+                callback(gpio, level, tick)
+
+        return self.pi.callback(pin, self.pigpio.EITHER_EDGE, on_edge)
+
+    def unwatch(self, pin: int, handle: Any):
+        handle.cancel()
+        self.pi.set_glitch_filter(pin, 0)
+
+    def tick(self) -> int:
+        return int(self.pi.get_current_tick())
+
+    def reset(self, pins: Iterable[int]):
+        for pin in pins:
+            self.pi.set_mode(pin, self.pigpio.INPUT)
+            self.pi.set_pull_up_down(pin, self.pigpio.PUD_OFF)
+
+    def close(self):
+        if self.pi is not None:
+            try:
+                self.pi.stop()  # Releases our handle on the shared connection
+                self.logger.info("pigpio cleanup completed")
+            except Exception as e:
+                self.logger.warning(f"pigpio cleanup warning: {e}")
+            finally:
+                self.pi = None
+                self.initialized = False
+
+    def get_status(self) -> Dict[str, Any]:
+        status = super().get_status()
+        status["connection"] = pigpio_connection.get_manager().get_status()
+        return status
+
+
+class RPiGPIOBackend(GPIOBackend):
+    """Backend using RPi.GPIO"""
+
+    name = "rpi_gpio"
+    pwm_engines = (ENGINE_SOFTWARE,)
+
+    # Seconds between checks that RPi.GPIO was not cleaned up externally
+    HEALTH_CHECK_INTERVAL = 5.0
+
+    def __init__(self, gpio_module):
+        super().__init__()
+        self.GPIO = gpio_module
+        self.initialized = False
+        self._next_health_check = 0.0
+        try:
+            self.GPIO.setmode(self.GPIO.BCM)
+            self.GPIO.setwarnings(False)
+            self._mark_initialized()
+            self.logger.info("GPIO initialized with BCM mode")
+        except Exception as e:
+            self.logger.error(f"Failed to initialize GPIO: {e}")
+
+    def ensure_initialized(self) -> bool:
+        """Ensure GPIO is properly initialized
+
+        Our own reset/close paths clear ``initialized``, so the common case
+        costs no library call. An external ``GPIO.cleanup()`` is caught by a
+        health check at most every HEALTH_CHECK_INTERVAL seconds, or earlier
+        by the RuntimeError recovery in setup() and write().
+        """
+        if self.initialized:
+            if time.monotonic() < self._next_health_check:
+                return True
+            if self.check_health():
+                return True
+
+        return self._initialize_with_retry()
+
+    def check_health(self) -> bool:
+        """Verify the BCM numbering mode is still set; clears the flag if not"""
+        try:
+            if self.GPIO.getmode() == self.GPIO.BCM:
+                self._next_health_check = (
+                    time.monotonic() + self.HEALTH_CHECK_INTERVAL
+                )
+                return True
+            self.logger.warning("GPIO state lost (numbering mode reset)")
+        except Exception as e:
+            self.logger.warning(f"GPIO health check failed: {e}")
+        self.initialized = False
+        return False
+
+    def _mark_initialized(self):
+        """Record a successful (re)initialization and schedule the next check"""
+        self.initialized = True
+        self._next_health_check = time.monotonic() + self.HEALTH_CHECK_INTERVAL
+
+    def _initialize_with_retry(self, retry_with_cleanup=True) -> bool:
+        """Initialize GPIO with optional cleanup retry"""
+        try:
+            self.GPIO.setmode(self.GPIO.BCM)
+            self.GPIO.setwarnings(False)
+            self._mark_initialized()
+            self.logger.info("GPIO initialized with BCM mode")
+            return True
+        except Exception as e:
+            if retry_with_cleanup:
+                self.logger.warning(f"GPIO init failed ({e}), retrying with cleanup...")
+                try:
+                    self.GPIO.cleanup()
+                    return self._initialize_with_retry(retry_with_cleanup=False)
+                except Exception as e2:
+                    self.logger.error(f"GPIO init failed after cleanup: {e2}")
+            else:
+                self.logger.error(f"GPIO initialization failed: {e}")
+
+            self.initialized = False
+            return False
+
+    def _recover(self, error: Exception) -> bool:
+        """Reinitialize GPIO after a call failed because it was reset externally"""
+        self.logger.warning(f"GPIO state lost, reinitializing: {error}")
+        self.initialized = False
+        return self._initialize_with_retry()
+
+    def _setup(self, pin: int, mode: str, pull: Optional[str]):
+        GPIO = self.GPIO
+        if mode == "input":
+            if pull == "pullup":
+                GPIO.setup(pin, GPIO.IN, pull_up_down=GPIO.PUD_UP)
+            elif pull == "pulldown":
+                GPIO.setup(pin, GPIO.IN, pull_up_down=GPIO.PUD_DOWN)
+            else:
+                GPIO.setup(pin, GPIO.IN)
+        elif mode == "output":
+            GPIO.setup(pin, GPIO.OUT)
+
+    def setup(self, pin: int, mode: str, pull: Optional[str] = None):
+        try:
+            self._setup(pin, mode, pull)
+        except RuntimeError as e:
+            # If GPIO mode was not set, try to reinitialize
+            if "pin numbering mode" not in str(e).lower():
+                raise
+            if not self._recover(e):
+                raise RuntimeError(f"Failed to reinitialize GPIO: {e}")
+            # Retry the setup after reinitialization
+            self._setup(pin, mode, pull)
+
+    def read(self, pin: int) -> int:
+        return int(self.GPIO.input(pin))
+
+    def write(self, pin: int, value: int, pipeline: CommandPipeline = None):
+        try:
+            self.GPIO.output(pin, value)
+        except RuntimeError as e:
+            # GPIO was cleaned up externally since the last health check
+            if not self._recover(e):
+                raise
+            self._setup(pin, "output", None)
+            self.GPIO.output(pin, value)
+
+    def write_bank(
+        self, set_mask: int, clear_mask: int, pipeline: CommandPipeline = None
+    ):
+        # RPi.GPIO accepts channel/value lists in a single call
+        pins = [pin for pin in range(32) if ((set_mask | clear_mask) >> pin) & 1]
+        self.GPIO.output(pins, [(set_mask >> pin) & 1 for pin in pins])
+
+    def start_pwm(
+        self,
+        pin: int,
+        frequency: int,
+        duty_cycle: float,
+        pipeline: CommandPipeline = None,
+    ) -> Dict[str, Any]:
+        # Use software PWM
+        engine = self.pwm_allocator.allocate(pin)
+        pwm = self.GPIO.PWM(pin, frequency)
+        pwm.start(duty_cycle)
+        return {
+            "type": "rpi_gpio",
+            "engine": engine,
+            "instance": pwm,
+            "frequency": frequency,
+            "duty_cycle": duty_cycle,
+        }
+
+    def update_pwm(
+        self, pin: int, info: Dict[str, Any], frequency: int, duty_cycle: float
+    ) -> Dict[str, Any]:
+        pwm = info.get("instance")
+        if pwm is None:
+            return super().update_pwm(pin, info, frequency, duty_cycle)
+        # Reuse the running PWM object instead of allocating a new one
+        if frequency != info.get("frequency"):
+            pwm.ChangeFrequency(frequency)
+        if duty_cycle != info.get("duty_cycle"):
+            pwm.ChangeDutyCycle(duty_cycle)
+        return {**info, "frequency": frequency, "duty_cycle": duty_cycle}
+
+    def watch(self, pin: int, debounce_ms: int, callback: EdgeCallback) -> Any:
+        def on_edge(channel):
+            callback(channel, self.read(channel), _tick())
+
+        kwargs = {"callback": on_edge}
+        if debounce_ms > 0:
+            kwargs["bouncetime"] = debounce_ms
+        self.GPIO.add_event_detect(pin, self.GPIO.BOTH, **kwargs)
+        return None
+
+    def unwatch(self, pin: int, handle: Any):
+        self.GPIO.remove_event_detect(pin)
+
+    def reset(self, pins: Iterable[int]):
+        self.close()
+
+    def close(self):
+        try:
+            self.GPIO.cleanup()
+            self.logger.info("GPIO cleanup completed")
+        except Exception as e:
+            self.logger.warning(f"GPIO cleanup warning: {e}")
+        finally:
+            # Mark as uninitialized so it will be re-initialized on next use
+            self.initialized = False
+
+
+class VirtualClock:
+    """Manually advanced microsecond clock for the simulator"""
+
+    def __init__(self, start_us: int = 0):
+        self.now_us = start_us
+
+    def advance(self, seconds: float):
+        self.now_us += int(seconds * 1_000_000)
+
+    def tick(self) -> int:
+        """pigpio-style 32-bit wrapping tick"""
+        return self.now_us & 0xFFFFFFFF
+
+
+class SimulatorBackend(GPIOBackend):
+    """In-memory GPIO model driven by a virtual clock
+
+    Models pin modes, pull resistors, output levels, PWM waveforms and edge
+    callbacks with debounce. External signals are injected with
+    ``set_input()``; time moves only when ``clock.advance()`` is called,
+    which keeps load tests deterministic.
+    """
+
+    name = "simulator"
+    # Modelled on pigpio so development reports the engines a Pi would use
+    pwm_engines = (ENGINE_HARDWARE, ENGINE_DMA)
+
+    def __init__(self, clock: VirtualClock = None):
+        super().__init__()
+        self.clock = clock or VirtualClock()
+        self.modes = {}
+        self.levels = {}
+        self.pulls = {}
+        self.pwm = {}
+        self._watchers = {}
+
+    def setup(self, pin: int, mode: str, pull: Optional[str] = None):
+        self.modes[pin] = mode
+        self.pulls[pin] = pull
+        if mode == "input":
+            # Floating inputs read LOW in the model
+            self._set_level(pin, 1 if pull == "pullup" else 0)
+        else:
+            self.levels.setdefault(pin, 0)
+
+    def read(self, pin: int) -> int:
+        pwm = self.pwm.get(pin)
+        if pwm is not None:
+            period_us = 1_000_000 / pwm["frequency"]
+            phase = (self.clock.now_us % period_us) / period_us
+            phase = (phase - pwm.get("phase", 0.0)) % 1.0
+            return 1 if phase < pwm["duty_cycle"] / 100 else 0
+        return self.levels.get(pin, 0)
+
+    def write(self, pin: int, value: int, pipeline: CommandPipeline = None):
+        self._set_level(pin, int(value))
+
+    def set_input(self, pin: int, level: int):
+        """Drive an input pin from outside, as a connected device would"""
+        self._set_level(pin, int(level))
+
+    def start_pwm(
+        self,
+        pin: int,
+        frequency: int,
+        duty_cycle: float,
+        pipeline: CommandPipeline = None,
+    ) -> Dict[str, Any]:
+        engine = self.pwm_allocator.allocate(pin)
+        self.pwm[pin] = {"frequency": frequency, "duty_cycle": duty_cycle}
+        return {
+            "type": "simulator",
+            "engine": engine,
+            "frequency": frequency,
+            "duty_cycle": duty_cycle,
+        }
+
+    def update_pwm(
+        self, pin: int, info: Dict[str, Any], frequency: int, duty_cycle: float
+    ) -> Dict[str, Any]:
+        if pin not in self.pwm:
+            return super().update_pwm(pin, info, frequency, duty_cycle)
+        self.pwm[pin].update(frequency=frequency, duty_cycle=duty_cycle)
+        return {**info, "frequency": frequency, "duty_cycle": duty_cycle}
+
+    def stop_pwm(self, pin: int, info: Dict[str, Any]):
+        if self.pwm.pop(pin, None) is not None:
+            self.levels[pin] = 0
+            self.pwm_allocator.release(pin)
+        else:
+            super().stop_pwm(pin, info)
+
+    def start_pwm_group(
+        self,
+        frequency: int,
+        channels: Dict[int, Tuple[float, float]],
+        previous: Dict[str, Any] = None,
+    ) -> Dict[str, Any]:
+        if previous is not None:
+            self.stop_pwm_group(previous)
+        for pin, (duty_cycle, phase) in channels.items():
+            self.pwm[pin] = {
+                "frequency": frequency,
+                "duty_cycle": duty_cycle,
+                "phase": phase,
+            }
+        return {
+            "type": "simulator",
+            "frequency": frequency,
+            "channels": {
+                pin: {"type": "simulator", "engine": "wave"} for pin in channels
+            },
+        }
+
+    def watch(self, pin: int, debounce_ms: int, callback: EdgeCallback) -> Any:
+        handle = {"callback": callback, "debounce_us": debounce_ms * 1000, "last": None}
+        self._watchers[pin] = handle
+        return handle
+
+    def unwatch(self, pin: int, handle: Any):
+        self._watchers.pop(pin, None)
+
+    def tick(self) -> int:
+        return self.clock.tick()
+
+    def reset(self, pins: Iterable[int]):
+        for pin in list(pins):
+            self.modes.pop(pin, None)
+            self.levels.pop(pin, None)
+            self.pulls.pop(pin, None)
+            self.pwm.pop(pin, None)
+            self.pwm_allocator.release(pin)
+
+    def _set_level(self, pin: int, level: int):
+        previous = self.levels.get(pin)
+        self.levels[pin] = level
+        watch = self._watchers.get(pin)
+        if watch is None or previous == level:
+            return
+        now = self.clock.now_us
+        if watch["last"] is not None and now - watch["last"] < watch["debounce_us"]:
+            return
+        watch["last"] = now
+        watch["callback"](pin, level, self.clock.tick())
+
+
+def _tick() -> int:
+    """Microsecond timestamp comparable to pigpio ticks"""
+    return int(time.monotonic() * 1_000_000) & 0xFFFFFFFF
+
+
+def pwm_wave_edges(
+    frequency: float, channels: Dict[int, Tuple[float, float]]
+) -> List[Tuple[int, int, int]]:
+    """One PWM period as ``(on_mask, off_mask, delay_us)`` steps
+
+    ``channels`` maps pin -> (duty cycle %, phase as a fraction of the
+    period). Each channel rises at its phase offset and falls ``duty``
+    later, wrapping around the period; the delays add up to one period.
+    """
+    period = max(1, int(round(1_000_000 / frequency)))
+    edges: Dict[int, List[int]] = {0: [0, 0]}
+    for pin, (duty_cycle, phase) in channels.items():
+        bit = 1 << pin
+        width = int(round(duty_cycle / 100 * period))
+        rise = int(round(phase * period)) % period
+        if width <= 0:
+            edges[0][1] |= bit
+        elif width >= period:
+            edges[0][0] |= bit
+        else:
+            edges.setdefault(rise, [0, 0])[0] |= bit
+            edges.setdefault((rise + width) % period, [0, 0])[1] |= bit
+
+    times = sorted(edges)
+    ends = times[1:] + [period]
+    return [(edges[t][0], edges[t][1], end - t) for t, end in zip(times, ends)]
@@ -1,5 +1,21 @@
 import logging
-from typing import Dict, Any
+import threading
+import time
+from typing import Dict, Any, List, Optional, Tuple, Union
+
+from . import pigpio_connection
+from .edge_capture import EdgeCapture
+from .gpio_backends import (
+    GPIOBackend,
+    PigpioBackend,
+    RPiGPIOBackend,
+    SimulatorBackend,
+)
+from .pigpio_pipeline import CommandPipeline
+from .pin_table import PinTable
+from .pwm_ramp import PwmRamp
+from .scheduler import PeriodicScheduler, get_scheduler
+from .state_broadcaster import StateBroadcaster
 
 try:
     import RPi.GPIO as GPIO
@@ -19,100 +35,104 @@ except ImportError:
 
 
 class GPIOController:
-    def __init__(self, socketio):
+    # Operations accepted by apply_batch
+    BATCH_OPERATIONS = ("setup", "write", "toggle", "pwm")
+    PIN_MODES = ("input", "output", "input_pullup", "input_pulldown")
+    # Bank 1 covers BCM 0-31, readable/writable with a single pigpio command
+    BANK_SIZE = 32
+    # Default glitch filter for edge-driven input watching
+    DEFAULT_DEBOUNCE_MS = 10
+    MAX_DEBOUNCE_MS = 300
+    # PWM ramp playback period and progress broadcast period (seconds)
+    RAMP_INTERVAL = 0.01
+    RAMP_PROGRESS_INTERVAL = 0.25
+    # Edge capture limits
+    CAPTURE_MAX_DURATION = 10.0
+    CAPTURE_MAX_EDGES = 1 << 20
+    CAPTURE_TRIGGER_TIMEOUT = 10.0
+    CAPTURE_POLL_INTERVAL = 0.005
+
+    def __init__(
+        self,
+        socketio,
+        backend: Union[str, GPIOBackend] = None,
+        broadcast_window_ms: float = 0,
+        scheduler: PeriodicScheduler = None,
+    ):
+        """
+        Args:
+            socketio: SocketIO instance used for real-time updates
+            backend: backend instance or name ("auto", "pigpio", "rpi_gpio",
+                "simulator"); "auto" prefers pigpio, then RPi.GPIO, then
+                the simulator
+            broadcast_window_ms: window for coalescing state change
+                broadcasts; 0 sends every change immediately
+            scheduler: periodic scheduler that plays back PWM ramps
+                (default the process-wide scheduler)
+        """
         self.socketio = socketio
         self.logger = logging.getLogger(__name__)
-        self.pin_states = {}
+        self.broadcaster = StateBroadcaster(socketio, broadcast_window_ms)
+        self.pin_states = PinTable()
         self.pwm_instances = {}
-        self.gpio_initialized = False
-
-        self._initialize_gpio()
-
-    def _initialize_gpio(self):
-        """Initialize GPIO settings"""
-        if GPIO_AVAILABLE:
-            try:
-                GPIO.setmode(GPIO.BCM)
-                GPIO.setwarnings(False)
-                self.gpio_initialized = True
-                self.logger.info("GPIO initialized with BCM mode")
-            except Exception as e:
-                self.logger.error(f"Failed to initialize GPIO: {e}")
-                self.gpio_initialized = False
-
-        if PIGPIO_AVAILABLE:
-            try:
-                self.pi = pigpio.pi()
-                if not self.pi.connected:
-                    self.logger.warning(
-                        "pigpio daemon not running. Using simulation mode."
-                    )
-                    self.pi = None
-                else:
-                    self.logger.info("pigpio connected successfully")
-            except Exception as e:
-                self.pi = None
-                self.logger.warning(f"Failed to connect to pigpio daemon: {e}")
-
-    def _ensure_gpio_initialized(self):
-        """Ensure GPIO is properly initialized"""
-        if not GPIO_AVAILABLE:
-            return True
-
-        # If marked as initialized, verify it's actually working
-        if self.gpio_initialized:
-            try:
-                # Test if GPIO mode is still set by calling setmode again
-                # This will succeed silently if already set correctly
-                GPIO.setmode(GPIO.BCM)
-                return True
-            except RuntimeError as e:
-                # GPIO was cleaned up externally, need to reinitialize
-                self.logger.warning(f"GPIO state lost, reinitializing: {e}")
-                self.gpio_initialized = False
-
-        return self._initialize_gpio_with_retry()
-
-    def _initialize_gpio_with_retry(self, retry_with_cleanup=True):
-        """Initialize GPIO with optional cleanup retry"""
-        try:
-            GPIO.setmode(GPIO.BCM)
-            GPIO.setwarnings(False)
-            self.gpio_initialized = True
-            self.logger.info("GPIO initialized with BCM mode")
-            return True
-        except Exception as e:
-            if retry_with_cleanup:
-                self.logger.warning(f"GPIO init failed ({e}), retrying with cleanup...")
-                try:
-                    GPIO.cleanup()
-                    return self._initialize_gpio_with_retry(retry_with_cleanup=False)
-                except Exception as e2:
-                    self.logger.error(f"GPIO init failed after cleanup: {e2}")
-            else:
-                self.logger.error(f"GPIO initialization failed: {e}")
-
-            self.gpio_initialized = False
-            return False
-
-    def _emit_to_clients(self, event: str, data: dict):
-        """Safely emit data to clients (optional, mainly for real-time updates)"""
-        try:
-            # Only emit if socketio is available and we're in a request context
-            if self.socketio and hasattr(self.socketio, "emit"):
-                try:
-                    self.socketio.emit(event, data, broadcast=True)
-                except (RuntimeError, AttributeError, TypeError) as e:
-                    # Expected when called outside request context or with invalid socketio object
-                    # This is not an error - events will be sent via normal response flow
-                    pass
-            else:
-                # SocketIO not configured - not an error in test mode
-                pass
-        except Exception as e:
-            # Log but don't fail - emit is optional for real-time updates
-            # This catches any unexpected errors to prevent breaking the main functionality
-            self.logger.debug(f"Optional real-time emit skipped for {event}: {e}")
+        # name -> {"frequency", "channels": {pin: {"duty_cycle", "phase"}}, "info"}
+        self.pwm_groups = {}
+        self.watched_pins = {}
+        # pin -> latest requested {"duty_cycle", "frequency"} not yet applied
+        self._pending_pwm_updates = {}
+        self._pwm_update_lock = threading.Lock()
+        self._pwm_update_stats = {"requested": 0, "applied": 0}
+        # pin -> (ramp, start time, time of last progress broadcast)
+        self.pwm_ramps = {}
+        self.scheduler = scheduler or get_scheduler()
+        # Held around PWM backend calls and pwm_instances changes, so ramp
+        # ticks on the scheduler thread never interleave with the gpio lane
+        self._pwm_lock = threading.RLock()
+        self._ramp_task = None
+        # Running edge capture: (EdgeCapture, {pin: watch handle}) or None
+        self.edge_capture = None
+
+        self.backend = self._create_backend(backend)
+        self.logger.info(f"Using {self.backend.name} GPIO backend")
+
+    def _create_backend(self, backend: Union[str, GPIOBackend, None]) -> GPIOBackend:
+        """Select the hardware backend once at startup"""
+        if isinstance(backend, GPIOBackend):
+            return backend
+
+        if backend in (None, "auto"):
+            if PIGPIO_AVAILABLE:
+                # Shared with the demo devices instead of a private daemon socket
+                pi = pigpio_connection.acquire()
+                if pi is not None:
+                    return PigpioBackend(pigpio, pi)
+                self.logger.warning("pigpio daemon not running.")
+            if GPIO_AVAILABLE:
+                return RPiGPIOBackend(GPIO)
+            self.logger.warning("No GPIO library available. Using simulation mode.")
+            return SimulatorBackend()
+
+        if backend == "pigpio" and PIGPIO_AVAILABLE:
+            return PigpioBackend(pigpio)
+        if backend == "rpi_gpio" and GPIO_AVAILABLE:
+            return RPiGPIOBackend(GPIO)
+        if backend == "simulator":
+            return SimulatorBackend()
+        raise ValueError(f"GPIO backend not available: {backend}")
+
+    @property
+    def gpio_initialized(self) -> bool:
+        """Whether the hardware backend is initialized"""
+        return bool(self.backend.initialized)
+
+    @property
+    def pi(self):
+        """pigpio connection when the pigpio backend is active"""
+        return getattr(self.backend, "pi", None)
+
+    def _ensure_gpio_initialized(self) -> bool:
+        """Ensure the backend is usable (no library call on the hot path)"""
+        return self.backend.ensure_initialized()
 
     def setup_pin(
         self, pin: int, mode: str, pull_up_down: str = None
@@ -127,63 +147,7 @@ class GPIOController:
                     "error": "GPIO initialization failed",
                 }
 
-            if GPIO_AVAILABLE:
-                try:
-                    if mode == "input":
-                        if pull_up_down == "pullup":
-                            GPIO.setup(pin, GPIO.IN, pull_up_down=GPIO.PUD_UP)
-                        elif pull_up_down == "pulldown":
-                            GPIO.setup(pin, GPIO.IN, pull_up_down=GPIO.PUD_DOWN)
-                        else:
-                            GPIO.setup(pin, GPIO.IN)
-                    elif mode == "output":
-                        GPIO.setup(pin, GPIO.OUT)
-                except RuntimeError as e:
-                    # If GPIO mode was not set, try to reinitialize
-                    if "pin numbering mode" in str(e).lower():
-                        self.logger.warning(f"GPIO mode was reset, reinitializing: {e}")
-                        self.gpio_initialized = False
-                        if not self._initialize_gpio_with_retry():
-                            return {
-                                "success": False,
-                                "pin": pin,
-                                "error": f"Failed to reinitialize GPIO: {e}",
-                            }
-                        # Retry the setup after reinitialization
-                        if mode == "input":
-                            if pull_up_down == "pullup":
-                                GPIO.setup(pin, GPIO.IN, pull_up_down=GPIO.PUD_UP)
-                            elif pull_up_down == "pulldown":
-                                GPIO.setup(pin, GPIO.IN, pull_up_down=GPIO.PUD_DOWN)
-                            else:
-                                GPIO.setup(pin, GPIO.IN)
-                        elif mode == "output":
-                            GPIO.setup(pin, GPIO.OUT)
-                    else:
-                        raise
-
-            if self.pi and PIGPIO_AVAILABLE:
-                if mode == "input":
-                    self.pi.set_mode(pin, pigpio.INPUT)
-                    if pull_up_down == "pullup":
-                        self.pi.set_pull_up_down(pin, pigpio.PUD_UP)
-                    elif pull_up_down == "pulldown":
-                        self.pi.set_pull_up_down(pin, pigpio.PUD_DOWN)
-                    else:
-                        self.pi.set_pull_up_down(pin, pigpio.PUD_OFF)
-                elif mode == "output":
-                    self.pi.set_mode(pin, pigpio.OUTPUT)
-
-            # Read initial state
-            initial_state = 0
-            if mode == "input":
-                initial_state = self.read_pin_value(pin)
-
-            self.pin_states[pin] = {
-                "mode": mode,
-                "state": initial_state,
-                "pull": pull_up_down,
-            }
+            initial_state = self._setup_pin_hardware(pin, mode, pull_up_down)
             self.logger.info(
                 f"Pin {pin} setup as {mode}"
                 + (f" with {pull_up_down}" if pull_up_down else "")
@@ -201,16 +165,25 @@ class GPIOController:
             self.logger.error(f"Error setting up pin {pin}: {str(e)}")
             return {"success": False, "pin": pin, "error": str(e)}
 
+    def _setup_pin_hardware(self, pin: int, mode: str, pull_up_down: str = None) -> int:
+        """Configure the pin on the available GPIO libraries and return its initial state"""
+        if mode != "input" and pin in self.watched_pins:
+            self._unwatch_pin_hardware(pin)
+
+        self.backend.setup(pin, mode, pull_up_down)
+
+        # Read initial state
+        initial_state = 0
+        if mode == "input":
+            initial_state = self.read_pin_value(pin)
+
+        self.pin_states.configure(pin, mode, initial_state, pull_up_down)
+        return initial_state
+
     def read_pin_value(self, pin: int) -> int:
         """Read the actual hardware state of a pin"""
         try:
-            if GPIO_AVAILABLE:
-                return GPIO.input(pin)
-            elif self.pi and PIGPIO_AVAILABLE:
-                return self.pi.read(pin)
-            else:
-                # Simulation mode - return cached state or 0
-                return self.pin_states.get(pin, {}).get("state", 0)
+            return self.backend.read(pin)
         except Exception as e:
             self.logger.error(f"Error reading pin {pin} value: {e}")
             return 0
@@ -238,25 +211,24 @@ class GPIOController:
                     "error": "GPIO initialization failed",
                 }
 
+            group = self.pwm_instances.get(pin, {}).get("group")
+            if group is not None:
+                return {
+                    "success": False,
+                    "pin": pin,
+                    "error": f"Pin {pin} is part of PWM group {group}",
+                }
+
             # Ensure pin is set up as output
-            if pin not in self.pin_states or self.pin_states[pin]["mode"] != "output":
+            if not self.pin_states.is_output(pin):
                 result = self.setup_pin(pin, "output")
                 if not result["success"]:
                     return result
 
-            if GPIO_AVAILABLE:
-                GPIO.output(pin, value)
-
-            if self.pi and PIGPIO_AVAILABLE:
-                self.pi.write(pin, value)
-
-            self.pin_states[pin]["state"] = value
+            self._write_pin_hardware(pin, value)
             self.logger.info(f"Pin {pin} set to {value}")
 
-            # Optional: Emit state change for real-time updates (may fail outside request context)
-            self._emit_to_clients(
-                "pin_state_changed", {"pin": pin, "state": value, "mode": "output"}
-            )
+            self.broadcaster.publish({pin: {"state": value, "mode": "output"}})
 
             return {
                 "success": True,
@@ -269,6 +241,13 @@ class GPIOController:
             self.logger.error(f"Error writing to pin {pin}: {str(e)}")
             return {"success": False, "pin": pin, "error": str(e)}
 
+    def _write_pin_hardware(
+        self, pin: int, value: int, pipeline: CommandPipeline = None
+    ):
+        """Drive an output pin and record its new state"""
+        self.backend.write(pin, value, pipeline)
+        self.pin_states.set_level(pin, value)
+
     def toggle_pin(self, pin: int) -> Dict[str, Any]:
         """Toggle a GPIO pin output"""
         try:
@@ -278,7 +257,7 @@ class GPIOController:
                 if not result["success"]:
                     return result
 
-            current_state = self.pin_states[pin]["state"]
+            current_state = self.pin_states.level(pin)
             new_state = 1 - current_state
 
             return self.write_pin(pin, new_state)
@@ -296,14 +275,14 @@ class GPIOController:
                     return result
 
             state = self.read_pin_value(pin)
-            self.pin_states[pin]["state"] = state
+            self.pin_states.set_level(pin, state)
             self.logger.info(f"Pin {pin} read as {state}")
 
             return {
                 "success": True,
                 "pin": pin,
                 "state": state,
-                "mode": self.pin_states[pin]["mode"],
+                "mode": self.pin_states.mode(pin),
                 "message": f'Pin {pin} is {"HIGH" if state else "LOW"}',
             }
         except Exception as e:
@@ -317,20 +296,25 @@ class GPIOController:
             if not self._ensure_gpio_initialized():
                 return {"success": False, "error": "GPIO initialization failed"}
 
-            all_states = {}
-            for pin in self.pin_states:
-                state = self.read_pin_value(pin)
-                self.pin_states[pin]["state"] = state
-                all_states[pin] = {
-                    "state": state,
-                    "mode": self.pin_states[pin]["mode"],
-                    "pull": self.pin_states[pin].get("pull"),
-                }
+            before = self.pin_states.snapshot()
+            self.pin_states.set_levels_from_mask(
+                self._read_bank_levels(), self.BANK_SIZE
+            )
+            for pin in self.pin_states.pins():
+                if pin >= self.BANK_SIZE:
+                    self.pin_states.set_level(pin, self.read_pin_value(pin))
+            all_states = self.pin_states.snapshot().to_dict()
 
             self.logger.info(f"Read all pins: {len(all_states)} pins")
 
-            # Optional: Emit for real-time updates (may fail outside request context)
-            self._emit_to_clients("all_pins_state", all_states)
+            # Other clients only need the pins whose level actually changed
+            self.broadcaster.publish(
+                {
+                    pin: info
+                    for pin, info in all_states.items()
+                    if info["state"] != before.levels[pin]
+                }
+            )
 
             return {
                 "success": True,
@@ -341,35 +325,626 @@ class GPIOController:
             self.logger.error(f"Error reading all pins: {str(e)}")
             return {"success": False, "error": str(e)}
 
-    def start_pwm(self, pin: int, frequency: int, duty_cycle: int) -> Dict[str, Any]:
-        """Start PWM output on a pin"""
+    def _read_bank_levels(self) -> int:
+        """Read bank 1 levels as a bitmask (bit N = BCM pin N)
+
+        With pigpio this is a single ``read_bank_1`` command. Otherwise the
+        mask is assembled from per-pin reads of the configured pins only.
+        """
+        return self.backend.read_bank(
+            [pin for pin in self.pin_states.pins() if pin < self.BANK_SIZE]
+        )
+
+    def read_bank(self) -> Dict[str, Any]:
+        """Read the levels of all bank 1 pins (BCM 0-31) at once"""
         try:
-            # Validate PWM parameters
-            if not isinstance(frequency, (int, float)) or frequency <= 0:
+            # Ensure GPIO is initialized
+            if not self._ensure_gpio_initialized():
+                return {"success": False, "error": "GPIO initialization failed"}
+
+            levels = self._read_bank_levels()
+            self.pin_states.set_levels_from_mask(levels, self.BANK_SIZE)
+            states = {
+                pin: (levels >> pin) & 1
+                for pin in self.pin_states.pins()
+                if pin < self.BANK_SIZE
+            }
+
+            self.logger.info(f"Read bank 1: 0x{levels:08x}")
+
+            return {
+                "success": True,
+                "levels": levels,
+                "states": states,
+                "message": f"Bank 1 levels: 0x{levels:08x}",
+            }
+        except Exception as e:
+            self.logger.error(f"Error reading bank: {str(e)}")
+            return {"success": False, "error": str(e)}
+
+    def write_mask(self, set_mask: int = 0, clear_mask: int = 0) -> Dict[str, Any]:
+        """Drive many bank 1 outputs at once
+
+        Pins whose bit is set in ``set_mask`` go HIGH and pins in
+        ``clear_mask`` go LOW. With pigpio each mask is applied by one
+        ``set_bank_1``/``clear_bank_1`` command, so all pins in a mask
+        change simultaneously. Unconfigured pins are set up as outputs.
+        """
+        try:
+            for name, mask in (("set_mask", set_mask), ("clear_mask", clear_mask)):
+                if (
+                    not isinstance(mask, int)
+                    or isinstance(mask, bool)
+                    or mask < 0
+                    or mask >= 1 << self.BANK_SIZE
+                ):
+                    return {
+                        "success": False,
+                        "error": f"Invalid {name}: {mask}. Must be a 32-bit mask.",
+                    }
+
+            if set_mask & clear_mask:
                 return {
                     "success": False,
-                    "pin": pin,
-                    "error": f"Invalid frequency: {frequency}. Must be a positive number.",
+                    "error": f"Pins in both set and clear masks: 0x{set_mask & clear_mask:08x}",
                 }
 
-            if frequency > 50000:
+            if not set_mask and not clear_mask:
+                return {"success": False, "error": "No pins selected"}
+
+            for pin in range(self.BANK_SIZE):
+                if ((set_mask | clear_mask) >> pin) & 1:
+                    error = self._pwm_group_error(pin)
+                    if error:
+                        return {"success": False, "error": error}
+
+            # Ensure GPIO is initialized
+            if not self._ensure_gpio_initialized():
+                return {"success": False, "error": "GPIO initialization failed"}
+
+            values = {
+                pin: (set_mask >> pin) & 1
+                for pin in range(self.BANK_SIZE)
+                if ((set_mask | clear_mask) >> pin) & 1
+            }
+
+            # Ensure pins are set up as outputs
+            for pin in values:
+                if not self.pin_states.is_output(pin):
+                    self._setup_pin_hardware(pin, "output")
+
+            self.backend.write_bank(set_mask, clear_mask)
+
+            changed = {}
+            for pin, value in values.items():
+                self.pin_states.set_level(pin, value)
+                changed[pin] = {"state": value, "mode": "output"}
+
+            self.logger.info(
+                f"Bank 1 written: set 0x{set_mask:08x}, clear 0x{clear_mask:08x}"
+            )
+            self.broadcaster.publish(changed)
+
+            return {
+                "success": True,
+                "set_mask": set_mask,
+                "clear_mask": clear_mask,
+                "states": values,
+                "message": f"Wrote {len(values)} pins",
+            }
+        except Exception as e:
+            self.logger.error(f"Error writing bank mask: {str(e)}")
+            return {"success": False, "error": str(e)}
+
+    def watch_pin(self, pin: int, debounce_ms: int = None) -> Dict[str, Any]:
+        """Push pins_changed deltas on input edges instead of polling
+
+        Registers a pigpio edge callback (with glitch filter) or an RPi.GPIO
+        event detect (with bouncetime) for the pin. Events are only emitted
+        when the filtered level differs from the last known state.
+        """
+        try:
+            if debounce_ms is None:
+                debounce_ms = self.DEFAULT_DEBOUNCE_MS
+            if (
+                not isinstance(debounce_ms, int)
+                or isinstance(debounce_ms, bool)
+                or debounce_ms < 0
+                or debounce_ms > self.MAX_DEBOUNCE_MS
+            ):
                 return {
                     "success": False,
                     "pin": pin,
-                    "error": f"Frequency {frequency}Hz exceeds maximum safe limit (50kHz).",
+                    "error": f"Invalid debounce: {debounce_ms}. Must be 0-{self.MAX_DEBOUNCE_MS}ms.",
                 }
 
+            # Ensure pin is set up as input
+            if not self.pin_states.is_input(pin):
+                result = self.setup_pin(pin, "input")
+                if not result["success"]:
+                    return result
+
+            if pin in self.watched_pins:
+                self._unwatch_pin_hardware(pin)
+
+            handle = self.backend.watch(pin, debounce_ms, self._on_edge)
+            self.watched_pins[pin] = {"debounce_ms": debounce_ms, "handle": handle}
+            self.logger.info(f"Pin {pin} watched for edges (debounce {debounce_ms}ms)")
+
+            return {
+                "success": True,
+                "pin": pin,
+                "state": self.pin_states.level(pin),
+                "mode": "input",
+                "debounce_ms": debounce_ms,
+                "message": f"Pin {pin} watched for changes",
+            }
+        except Exception as e:
+            self.logger.error(f"Error watching pin {pin}: {str(e)}")
+            return {"success": False, "pin": pin, "error": str(e)}
+
+    def unwatch_pin(self, pin: int) -> Dict[str, Any]:
+        """Stop pushing edge events for a pin"""
+        try:
+            if pin not in self.watched_pins:
+                return {"success": False, "pin": pin, "error": "Pin is not watched"}
+
+            self._unwatch_pin_hardware(pin)
+            self.logger.info(f"Pin {pin} no longer watched")
+
+            return {"success": True, "pin": pin, "message": f"Pin {pin} unwatched"}
+        except Exception as e:
+            self.logger.error(f"Error unwatching pin {pin}: {str(e)}")
+            return {"success": False, "pin": pin, "error": str(e)}
+
+    def _unwatch_pin_hardware(self, pin: int):
+        """Internal method to remove the edge callback of a pin"""
+        watch = self.watched_pins.pop(pin, None)
+        if watch is None:
+            return
+        self.backend.unwatch(pin, watch["handle"])
+
+    def _on_edge(self, pin: int, level: int, tick: int = None):
+        """Record a filtered edge and push it to clients if the level changed"""
+        table = self.pin_states
+        if pin not in self.watched_pins or table.level(pin) == level:
+            return
+        table.set_level(pin, level)
+        self.broadcaster.publish({pin: {"state": level, "mode": table.mode(pin)}})
+
+    def start_capture(
+        self,
+        pins: List[int],
+        duration: float,
+        trigger: Dict[str, Any] = None,
+        max_edges: int = None,
+        timeout: float = None,
+    ) -> Dict[str, Any]:
+        """Start recording edges on several pins, logic-analyzer style
+
+        Unconfigured pins are set up as inputs; outputs (e.g. PWM) can be
+        captured too. Pins watched with watch_pin() cannot be captured. Only
+        one capture runs at a time; collect it with stop_capture().
+
+        Args:
+            pins: bank 1 pins to record
+            duration: seconds to record after the trigger (or right away)
+            trigger: optional ``{"pin", "edge"}``, edge "rising", "falling"
+                or "either"; edges before it are kept as pre-trigger data
+            max_edges: ring buffer size (default EdgeCapture.DEFAULT_MAX_EDGES)
+            timeout: seconds wait_for_capture() will wait for the trigger;
+                only validated here
+        """
+        try:
+            if self.edge_capture is not None:
+                return {"success": False, "error": "A capture is already running"}
+
+            error = self._validate_capture(
+                pins, duration, trigger, max_edges, timeout
+            )
+            if error:
+                return {"success": False, "error": error}
+
+            if not self._ensure_gpio_initialized():
+                return {"success": False, "error": "GPIO initialization failed"}
+
+            for pin in pins:
+                if pin not in self.pin_states:
+                    self._setup_pin_hardware(pin, "input")
+
+            bank = self.backend.read_bank(pins)
+            capture = EdgeCapture(
+                pins,
+                duration,
+                {pin: (bank >> pin) & 1 for pin in pins},
+                self.backend.tick(),
+                trigger,
+                max_edges,
+            )
+            handles = {}
+            try:
+                for pin in capture.pins:
+                    handles[pin] = self.backend.watch(pin, 0, capture.on_edge)
+            except Exception:
+                for pin, handle in handles.items():
+                    self.backend.unwatch(pin, handle)
+                raise
+            self.edge_capture = (capture, handles)
+
+            self.logger.info(f"Capturing edges on pins {capture.pins} for {duration}s")
+            return {
+                "success": True,
+                "pins": capture.pins,
+                "duration": capture.duration,
+                "trigger": trigger,
+                "message": f"Capturing pins {capture.pins}",
+            }
+        except Exception as e:
+            self.logger.error(f"Error starting capture: {str(e)}")
+            return {"success": False, "error": str(e)}
+
+    def wait_for_capture(self, timeout: float = None) -> bool:
+        """Block until the running capture's recording window has passed
+
+        Args:
+            timeout: seconds to wait for the trigger (default
+                CAPTURE_TRIGGER_TIMEOUT)
+
+        Returns:
+            False if no capture is running or the trigger never came
+        """
+        if self.edge_capture is None:
+            return False
+        capture = self.edge_capture[0]
+        if timeout is None:
+            timeout = self.CAPTURE_TRIGGER_TIMEOUT
+        give_up = time.monotonic() + timeout
+        while not capture.done():
+            if not capture.triggered and time.monotonic() >= give_up:
+                return False
+            time.sleep(self.CAPTURE_POLL_INTERVAL)
+        return True
+
+    def stop_capture(self) -> Dict[str, Any]:
+        """Stop the running capture and return its compressed edge list"""
+        try:
+            if self.edge_capture is None:
+                return {"success": False, "error": "No capture running"}
+
+            capture, handles = self.edge_capture
+            self.edge_capture = None
+            capture.stop()
+            for pin, handle in handles.items():
+                self.backend.unwatch(pin, handle)
+
+            result = capture.result()
+            self.logger.info(
+                f"Capture on pins {capture.pins}: {result['count']} edges, "
+                f"{result['dropped']} dropped"
+            )
+            return {
+                "success": True,
+                **result,
+                "message": f"Captured {result['count']} edges",
+            }
+        except Exception as e:
+            self.logger.error(f"Error stopping capture: {str(e)}")
+            return {"success": False, "error": str(e)}
+
+    def _validate_capture(
+        self, pins, duration, trigger, max_edges, timeout=None
+    ) -> Optional[str]:
+        """Return an error message for invalid capture parameters, or None"""
+        error = self._validate_pin_list(pins)
+        if error:
+            return error
+        if not pins:
+            return "pins must not be empty"
+        if len(set(pins)) != len(pins):
+            return "Duplicate pins"
+        if any(pin >= self.BANK_SIZE for pin in pins):
+            return f"Capture pins must be below {self.BANK_SIZE}"
+        if (
+            not isinstance(duration, (int, float))
+            or isinstance(duration, bool)
+            or not 0 < duration <= self.CAPTURE_MAX_DURATION
+        ):
+            return (
+                f"Invalid duration: {duration}. "
+                f"Must be 0-{self.CAPTURE_MAX_DURATION}s."
+            )
+        if max_edges is not None and (
+            not isinstance(max_edges, int)
+            or isinstance(max_edges, bool)
+            or not 0 < max_edges <= self.CAPTURE_MAX_EDGES
+        ):
+            return f"Invalid max_edges: {max_edges}"
+        if timeout is not None and (
+            not isinstance(timeout, (int, float))
+            or isinstance(timeout, bool)
+            or not 0 < timeout <= self.CAPTURE_TRIGGER_TIMEOUT
+        ):
+            return (
+                f"Invalid timeout: {timeout}. "
+                f"Must be 0-{self.CAPTURE_TRIGGER_TIMEOUT}s."
+            )
+        watched = [pin for pin in pins if pin in self.watched_pins]
+        if watched:
+            return f"Pins {watched} are watched; unwatch them before capturing"
+        return EdgeCapture.validate_trigger(trigger, pins)
+
+    def subscribe_pins(self, sid: str, pins: List[int]) -> Dict[str, Any]:
+        """Limit a client's state updates to the given pins"""
+        try:
+            error = self._validate_pin_list(pins)
+            if error:
+                return {"success": False, "error": error}
+
+            subscribed = self.broadcaster.subscribe(sid, pins)
+            return {
+                "success": True,
+                "pins": subscribed,
+                "message": f"Subscribed to {len(subscribed)} pins",
+            }
+        except Exception as e:
+            self.logger.error(f"Error subscribing to pins: {str(e)}")
+            return {"success": False, "error": str(e)}
+
+    def unsubscribe_pins(self, sid: str, pins: List[int] = None) -> Dict[str, Any]:
+        """Drop pins from a client's subscription; without pins receive all again"""
+        try:
+            if pins is not None:
+                error = self._validate_pin_list(pins)
+                if error:
+                    return {"success": False, "error": error}
+
+            remaining = self.broadcaster.unsubscribe(sid, pins)
+            return {
+                "success": True,
+                "pins": remaining,
+                "message": "Subscribed to all pins"
+                if remaining is None
+                else f"Subscribed to {len(remaining)} pins",
+            }
+        except Exception as e:
+            self.logger.error(f"Error unsubscribing from pins: {str(e)}")
+            return {"success": False, "error": str(e)}
+
+    def _validate_pin_list(self, pins) -> Optional[str]:
+        """Return an error message for an invalid list of pin numbers, or None"""
+        if not isinstance(pins, list):
+            return "pins must be a list"
+        for pin in pins:
             if (
-                not isinstance(duty_cycle, (int, float))
-                or duty_cycle < 0
-                or duty_cycle > 100
+                not isinstance(pin, int)
+                or isinstance(pin, bool)
+                or not 0 <= pin < PinTable.SIZE
             ):
+                return f"Invalid pin: {pin}"
+        return None
+
+    def apply_batch(self, operations: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Validate and apply an ordered list of pin operations in one pass
+
+        Each operation is a dict with an ``op`` key (setup/write/toggle/pwm)
+        plus the parameters of the matching single-pin call. Nothing is
+        applied if any operation fails validation. Instead of one log line
+        and one emit per pin, the batch logs once and emits a single
+        ``pins_changed`` event with the final state of every touched pin.
+        """
+        try:
+            if not isinstance(operations, list):
+                return {"success": False, "error": "Operations must be a list"}
+
+            errors = []
+            for index, operation in enumerate(operations):
+                error = self._validate_batch_operation(operation)
+                if error:
+                    errors.append({"index": index, "error": error})
+            if errors:
                 return {
                     "success": False,
-                    "pin": pin,
-                    "error": f"Invalid duty cycle: {duty_cycle}. Must be between 0 and 100.",
+                    "applied": 0,
+                    "failed": len(errors),
+                    "errors": errors,
+                    "error": "Batch validation failed, no operations applied",
                 }
 
+            # Ensure GPIO is initialized once for the whole batch
+            if not self._ensure_gpio_initialized():
+                return {"success": False, "error": "GPIO initialization failed"}
+
+            # pigpio writes are queued and sent back to back instead of
+            # waiting for one reply per command
+            pipeline = self.backend.pipeline()
+
+            touched = {}
+            # index -> (level, PWM record) before each applied operation, to
+            # undo it if the daemon rejects its commands at flush time
+            undo = {}
+            for index, operation in enumerate(operations):
+                pin = operation["pin"]
+                try:
+                    if pipeline is not None:
+                        if operation["op"] == "setup":
+                            # Setup reads back the pin level, so earlier
+                            # commands must have reached the daemon first
+                            errors.extend(
+                                self._flush_batch_pipeline(
+                                    pipeline, operations, undo, touched
+                                )
+                            )
+                        pipeline.tag = (index, pin)
+                        undo[index] = (
+                            self.pin_states.level(pin),
+                            self.pwm_instances.get(pin),
+                        )
+                    self._apply_batch_operation(operation, pipeline)
+                    touched[pin] = {
+                        "state": self.pin_states.level(pin),
+                        "mode": self.pin_states.mode(pin),
+                    }
+                except Exception as e:
+                    undo.pop(index, None)
+                    errors.append({"index": index, "pin": pin, "error": str(e)})
+
+            if pipeline is not None:
+                errors.extend(
+                    self._flush_batch_pipeline(pipeline, operations, undo, touched)
+                )
+                errors.sort(key=lambda error: error["index"])
+
+            applied = len(operations) - len(errors)
+            self.logger.info(
+                f"Batch applied: {applied}/{len(operations)} operations "
+                f"on {len(touched)} pins"
+            )
+
+            self.broadcaster.publish(touched)
+
+            return {
+                "success": not errors,
+                "applied": applied,
+                "failed": len(errors),
+                "states": {pin: info["state"] for pin, info in touched.items()},
+                "errors": errors,
+                "message": f"Applied {applied}/{len(operations)} operations",
+            }
+        except Exception as e:
+            self.logger.error(f"Error applying batch: {str(e)}")
+            return {"success": False, "error": str(e)}
+
+    def _validate_batch_operation(self, operation: Any) -> Optional[str]:
+        """Return an error message for an invalid batch operation, or None"""
+        if not isinstance(operation, dict):
+            return "Operation must be an object"
+
+        op = operation.get("op")
+        if op not in self.BATCH_OPERATIONS:
+            return f"Unknown operation: {op}"
+
+        pin = operation.get("pin")
+        if (
+            not isinstance(pin, int)
+            or isinstance(pin, bool)
+            or not 0 <= pin < PinTable.SIZE
+        ):
+            return f"Invalid pin: {pin}"
+
+        # Group pins are managed through the group only
+        error = self._pwm_group_error(pin)
+        if error:
+            return error
+
+        if op == "setup" and operation.get("mode") not in self.PIN_MODES:
+            return f"Invalid mode: {operation.get('mode')}"
+
+        if op == "write" and operation.get("value") not in (0, 1):
+            return f"Invalid value: {operation.get('value')}. Must be 0 or 1."
+
+        if op == "pwm":
+            return self._validate_pwm_params(
+                operation.get("frequency", 1000), operation.get("duty_cycle", 50)
+            )
+
+        return None
+
+    def _pwm_group_error(self, pin: int) -> Optional[str]:
+        """Error message if the pin belongs to a PWM group, or None"""
+        group = self.pwm_instances.get(pin, {}).get("group")
+        if group is not None:
+            return f"Pin {pin} is part of PWM group {group}"
+        return None
+
+    def _flush_batch_pipeline(
+        self,
+        pipeline: CommandPipeline,
+        operations: List[Dict[str, Any]],
+        undo: Dict[int, Tuple[int, Optional[Dict[str, Any]]]],
+        touched: Dict[int, Dict[str, Any]],
+    ) -> List[Dict[str, Any]]:
+        """Flush queued batch commands and map failures back to operations
+
+        The state of a failed operation was recorded before the daemon
+        answered, so it is undone: the pin gets its previous level back, a
+        PWM start is forgotten and its engine released, and the pin is not
+        reported as changed unless an earlier operation changed it.
+        """
+        errors = []
+        for result in pipeline.flush():
+            if result["error"]:
+                index, pin = result["tag"]
+                errors.append(
+                    {"index": index, "pin": pin, "error": f"{result['op']}: {result['error']}"}
+                )
+
+        failed = {error["index"] for error in errors}
+        # Newest first, so each pin ends up as it was before its first failure
+        for index in sorted(failed, reverse=True):
+            pin = operations[index]["pin"]
+            level, pwm_info = undo.pop(index)
+            later = range(index + 1, len(operations))
+            if any(operations[n]["pin"] == pin and n in undo for n in later):
+                # A later operation that went through decides the pin's state
+                continue
+
+            self.pin_states.set_level(pin, level)
+            if self.pwm_instances.get(pin) is not pwm_info:
+                self.pwm_instances.pop(pin, None)
+                self.backend.pwm_allocator.release(pin)
+                self.pin_states.set_pwm(pin, False)
+
+            earlier = range(index)
+            if any(
+                operations[n]["pin"] == pin and n in undo and n not in failed
+                for n in earlier
+            ):
+                touched[pin] = {"state": level, "mode": self.pin_states.mode(pin)}
+            else:
+                touched.pop(pin, None)
+        return errors
+
+    def _apply_batch_operation(
+        self, operation: Dict[str, Any], pipeline: CommandPipeline = None
+    ):
+        """Apply one validated batch operation without logging or emitting"""
+        op = operation["op"]
+        pin = operation["pin"]
+
+        if op == "setup":
+            mode = operation["mode"]
+            pull_up_down = None
+            if mode == "input_pullup":
+                mode, pull_up_down = "input", "pullup"
+            elif mode == "input_pulldown":
+                mode, pull_up_down = "input", "pulldown"
+            self._setup_pin_hardware(pin, mode, pull_up_down)
+            return
+
+        # write/toggle/pwm all require an output pin
+        if not self.pin_states.is_output(pin):
+            self._setup_pin_hardware(pin, "output")
+
+        if op == "write":
+            self._write_pin_hardware(pin, int(operation["value"]), pipeline)
+        elif op == "toggle":
+            self._write_pin_hardware(pin, 1 - self.pin_states.level(pin), pipeline)
+        elif op == "pwm":
+            self._start_pwm_hardware(
+                pin,
+                operation.get("frequency", 1000),
+                operation.get("duty_cycle", 50),
+                pipeline,
+            )
+
+    def start_pwm(self, pin: int, frequency: int, duty_cycle: int) -> Dict[str, Any]:
+        """Start PWM output on a pin"""
+        try:
+            # Validate PWM parameters
+            error = self._validate_pwm_params(frequency, duty_cycle)
+            if error:
+                return {"success": False, "pin": pin, "error": error}
+
             # Ensure GPIO is initialized
             if not self._ensure_gpio_initialized():
                 return {
@@ -378,50 +953,519 @@ class GPIOController:
                     "error": "GPIO initialization failed",
                 }
 
+            group = self.pwm_instances.get(pin, {}).get("group")
+            if group is not None:
+                return {
+                    "success": False,
+                    "pin": pin,
+                    "error": f"Pin {pin} is part of PWM group {group}",
+                }
+
             # Ensure pin is set up as output
-            if pin not in self.pin_states or self.pin_states[pin]["mode"] != "output":
+            if not self.pin_states.is_output(pin):
                 result = self.setup_pin(pin, "output")
                 if not result["success"]:
                     return result
 
-            # Stop existing PWM if running
-            if pin in self.pwm_instances:
-                self.stop_pwm_pin(pin)
-
-            if self.pi and PIGPIO_AVAILABLE:
-                # Use hardware PWM for better performance
-                self.pi.hardware_PWM(
-                    pin, frequency, duty_cycle * 10000
-                )  # duty_cycle in microseconds
-                self.pwm_instances[pin] = {
-                    "type": "pigpio",
-                    "frequency": frequency,
-                    "duty_cycle": duty_cycle,
-                }
-            elif GPIO_AVAILABLE:
-                # Use software PWM
-                pwm = GPIO.PWM(pin, frequency)
-                pwm.start(duty_cycle)
-                self.pwm_instances[pin] = {
-                    "type": "rpi_gpio",
-                    "instance": pwm,
-                    "frequency": frequency,
-                    "duty_cycle": duty_cycle,
-                }
-
-            self.logger.info(f"Pin {pin} PWM started: {frequency}Hz, {duty_cycle}%")
+            self._start_pwm_hardware(pin, frequency, duty_cycle)
+            engine = self.pwm_instances[pin].get("engine")
+            # DMA PWM rounds to the nearest frequency the daemon can produce
+            frequency = self.pwm_instances[pin]["frequency"]
+            self.logger.info(
+                f"Pin {pin} PWM started: {frequency}Hz, {duty_cycle}% ({engine})"
+            )
 
             return {
                 "success": True,
                 "pin": pin,
                 "frequency": frequency,
                 "duty_cycle": duty_cycle,
+                "engine": engine,
                 "message": f"Pin {pin} PWM started: {frequency}Hz, {duty_cycle}%",
             }
         except Exception as e:
             self.logger.error(f"Error starting PWM on pin {pin}: {str(e)}")
             return {"success": False, "pin": pin, "error": str(e)}
 
+    def update_pwm(
+        self, pin: int, duty_cycle: float = None, frequency: int = None
+    ) -> Dict[str, Any]:
+        """Change duty cycle and/or frequency of running PWM in place
+
+        Unlike calling start_pwm again, the PWM is not stopped and rebuilt,
+        so there is no glitch on the output and no new PWM object per change.
+        """
+        try:
+            with self._pwm_lock:
+                # A direct update takes over from a running ramp; stop it
+                # before reading the duty cycle it was writing
+                self._cancel_pwm_ramp(pin)
+                info = self.pwm_instances.get(pin)
+                if info is None:
+                    return {
+                        "success": False,
+                        "pin": pin,
+                        "error": "PWM not running on this pin",
+                    }
+
+                group = info.get("group")
+                if group is not None:
+                    return {
+                        "success": False,
+                        "pin": pin,
+                        "error": f"Pin {pin} is part of PWM group {group}",
+                    }
+
+                frequency = info["frequency"] if frequency is None else frequency
+                duty_cycle = info["duty_cycle"] if duty_cycle is None else duty_cycle
+                error = self._validate_pwm_params(frequency, duty_cycle)
+                if error:
+                    return {"success": False, "pin": pin, "error": error}
+
+                if (frequency, duty_cycle) != (info["frequency"], info["duty_cycle"]):
+                    self.pwm_instances[pin] = self.backend.update_pwm(
+                        pin, info, frequency, duty_cycle
+                    )
+                    frequency = self.pwm_instances[pin]["frequency"]
+                    self.logger.debug(
+                        f"Pin {pin} PWM updated: {frequency}Hz, {duty_cycle}%"
+                    )
+
+            return {
+                "success": True,
+                "pin": pin,
+                "frequency": frequency,
+                "duty_cycle": duty_cycle,
+                "message": f"Pin {pin} PWM updated: {frequency}Hz, {duty_cycle}%",
+            }
+        except Exception as e:
+            self.logger.error(f"Error updating PWM on pin {pin}: {str(e)}")
+            return {"success": False, "pin": pin, "error": str(e)}
+
+    def start_pwm_ramp(
+        self,
+        pin: int,
+        end_duty: float,
+        duration: float,
+        start_duty: float = None,
+        easing: str = "linear",
+        repeat: int = 0,
+        alternate: bool = False,
+        frequency: int = None,
+    ) -> Dict[str, Any]:
+        """Fade a pin's duty cycle server-side
+
+        Starts PWM if the pin is not running it yet. The ramp is played back
+        on the periodic scheduler every RAMP_INTERVAL, updating the PWM in
+        place, and its progress is broadcast with the pin state every
+        RAMP_PROGRESS_INTERVAL. Starting, updating or stopping PWM on the
+        pin ends the ramp.
+
+        Args:
+            pin: BCM pin
+            end_duty: duty cycle % at the end of each cycle
+            duration: length of one cycle in seconds
+            start_duty: duty cycle % to start from (default the current one,
+                or 0 when PWM is not running)
+            easing: curve name, see pwm_ramp.EASINGS
+            repeat: extra cycles; -1 repeats until stopped
+            alternate: run every other cycle backwards
+            frequency: PWM frequency (default the current one, or 1000Hz)
+        """
+        try:
+            info = self.pwm_instances.get(pin)
+            group = (info or {}).get("group")
+            if group is not None:
+                return {
+                    "success": False,
+                    "pin": pin,
+                    "error": f"Pin {pin} is part of PWM group {group}",
+                }
+
+            if start_duty is None:
+                start_duty = info["duty_cycle"] if info else 0
+            if frequency is None:
+                frequency = info["frequency"] if info else 1000
+            try:
+                ramp = PwmRamp(
+                    start_duty, end_duty, duration, easing, repeat, alternate
+                )
+            except ValueError as e:
+                return {"success": False, "pin": pin, "error": str(e)}
+
+            if info is None:
+                result = self.start_pwm(pin, frequency, start_duty)
+            else:
+                result = self.update_pwm(pin, start_duty, frequency)
+            if not result["success"]:
+                return result
+
+            with self._pwm_lock:
+                self.pwm_ramps[pin] = (ramp, self.scheduler.clock(), None)
+                if self._ramp_task is None:
+                    self._ramp_task = self.scheduler.schedule(
+                        self.RAMP_INTERVAL, self._pwm_ramp_tick, name="pwm-ramp"
+                    )
+
+            self.logger.info(
+                f"Pin {pin} PWM ramp: {start_duty}% -> {end_duty}% "
+                f"in {duration}s ({easing})"
+            )
+            return {
+                "success": True,
+                "pin": pin,
+                "frequency": frequency,
+                "ramp": ramp.to_dict(),
+                "message": f"Pin {pin} PWM ramp started",
+            }
+        except Exception as e:
+            self.logger.error(f"Error starting PWM ramp on pin {pin}: {str(e)}")
+            return {"success": False, "pin": pin, "error": str(e)}
+
+    def stop_pwm_ramp(self, pin: int) -> Dict[str, Any]:
+        """Stop a ramp; the PWM keeps its current duty cycle"""
+        if not self._cancel_pwm_ramp(pin):
+            return {"success": False, "pin": pin, "error": "No PWM ramp on this pin"}
+        duty_cycle = self.pwm_instances.get(pin, {}).get("duty_cycle")
+        self._publish_ramp_progress(pin, None)
+        return {
+            "success": True,
+            "pin": pin,
+            "duty_cycle": duty_cycle,
+            "message": f"Pin {pin} PWM ramp stopped at {duty_cycle}%",
+        }
+
+    def _cancel_pwm_ramp(self, pin: int) -> bool:
+        """Forget the pin's ramp; returns whether there was one"""
+        with self._pwm_lock:
+            return self.pwm_ramps.pop(pin, None) is not None
+
+    def _pwm_ramp_tick(self) -> bool:
+        """Scheduler task: move every ramping pin to its next duty cycle
+
+        Returns:
+            False once no ramps are left, which ends the task
+        """
+        with self._pwm_lock:
+            now = self.scheduler.clock()
+            for pin, (ramp, started, reported) in list(self.pwm_ramps.items()):
+                info = self.pwm_instances.get(pin)
+                if info is None:
+                    del self.pwm_ramps[pin]
+                    continue
+
+                duty_cycle, done = ramp.duty_at(now - started)
+                # Below the DMA PWM resolution (0.01%) nothing would change
+                duty_cycle = round(duty_cycle, 2)
+                if duty_cycle != info["duty_cycle"]:
+                    try:
+                        self.pwm_instances[pin] = self.backend.update_pwm(
+                            pin, info, info["frequency"], duty_cycle
+                        )
+                    except Exception as e:
+                        self.logger.error(f"PWM ramp on pin {pin} failed: {e}")
+                        done = True
+
+                if done:
+                    del self.pwm_ramps[pin]
+                    self._publish_ramp_progress(pin, None)
+                elif (
+                    reported is None or now - reported >= self.RAMP_PROGRESS_INTERVAL
+                ):
+                    self.pwm_ramps[pin] = (ramp, started, now)
+                    self._publish_ramp_progress(pin, ramp.progress(now - started))
+
+            if not self.pwm_ramps:
+                self._ramp_task = None
+                return False
+            return True
+
+    def _publish_ramp_progress(self, pin: int, progress: Optional[Dict[str, Any]]):
+        """Broadcast the pin's duty cycle and ramp progress (None: finished)"""
+        info = self.pwm_instances.get(pin)
+        if info is None:
+            return
+        self.broadcaster.publish(
+            {
+                pin: {
+                    "state": self.pin_states.level(pin),
+                    "mode": "output",
+                    "duty_cycle": info["duty_cycle"],
+                    "ramp": progress,
+                }
+            }
+        )
+
+    def request_pwm_update(
+        self, pin: int, duty_cycle: float = None, frequency: int = None
+    ):
+        """Record a PWM update to be applied by apply_pwm_update()
+
+        Only stores the values, so it is safe to call from the event loop
+        before queueing apply_pwm_update() on the hardware lane. Requests
+        for the same pin that arrive before the update is applied are
+        merged, the latest values winning.
+        """
+        with self._pwm_update_lock:
+            pending = self._pending_pwm_updates.setdefault(pin, {})
+            if duty_cycle is not None:
+                pending["duty_cycle"] = duty_cycle
+            if frequency is not None:
+                pending["frequency"] = frequency
+            self._pwm_update_stats["requested"] += 1
+
+    def apply_pwm_update(self, pin: int) -> Optional[Dict[str, Any]]:
+        """Apply the latest requested PWM update for a pin
+
+        Returns None when an earlier call already applied the pending
+        values, i.e. this request was coalesced into it.
+        """
+        with self._pwm_update_lock:
+            pending = self._pending_pwm_updates.pop(pin, None)
+            if pending is None:
+                return None
+            self._pwm_update_stats["applied"] += 1
+        return self.update_pwm(pin, **pending)
+
+    def start_pwm_group(
+        self, name: str, frequency: int, channels: List[Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        """Start PWM on several pins at once with a common frequency
+
+        Each channel is ``{"pin", "duty_cycle", "phase"}`` where ``phase``
+        (degrees, default 0) delays the channel's rising edge within the
+        period. On pigpio the whole group is one repeating waveform, so the
+        pins stay phase-locked; other backends start them back to back.
+        Starting an existing group name replaces it.
+        """
+        try:
+            error = self._validate_pwm_group(name, frequency, channels)
+            if error:
+                return {"success": False, "group": name, "error": error}
+
+            if not self._ensure_gpio_initialized():
+                return {
+                    "success": False,
+                    "group": name,
+                    "error": "GPIO initialization failed",
+                }
+
+            for channel in channels:
+                other = self.pwm_instances.get(channel["pin"], {}).get("group")
+                if other not in (None, name):
+                    return {
+                        "success": False,
+                        "group": name,
+                        "error": f"Pin {channel['pin']} is part of PWM group {other}",
+                    }
+
+            previous = self.pwm_groups.get(name, {}).get("info")
+            error = self.backend.pwm_group_error(previous)
+            if error:
+                return {"success": False, "group": name, "error": error}
+
+            if name in self.pwm_groups:
+                self._stop_pwm_group_hardware(name)
+
+            settings = {}
+            for channel in channels:
+                pin = channel["pin"]
+                # Single-pin PWM on a group pin is replaced by the group
+                if pin in self.pwm_instances:
+                    self.stop_pwm_pin(pin)
+                if not self.pin_states.is_output(pin):
+                    self._setup_pin_hardware(pin, "output")
+                settings[pin] = {
+                    "duty_cycle": channel["duty_cycle"],
+                    "phase": channel.get("phase", 0),
+                }
+
+            self._start_pwm_group_hardware(name, frequency, settings)
+            self.logger.info(
+                f"PWM group {name} started: {frequency}Hz on pins {sorted(settings)}"
+            )
+            return self._pwm_group_result(name, f"PWM group {name} started")
+        except Exception as e:
+            self.logger.error(f"Error starting PWM group {name}: {str(e)}")
+            return {"success": False, "group": name, "error": str(e)}
+
+    def update_pwm_group(
+        self,
+        name: str,
+        frequency: int = None,
+        channels: List[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        """Change the frequency and/or channel duty/phase of a running group
+
+        Only the given values change. On pigpio the new waveform takes over
+        at the end of the current period, so all pins switch together.
+        """
+        try:
+            group = self.pwm_groups.get(name)
+            if group is None:
+                return {"success": False, "group": name, "error": "No such PWM group"}
+
+            settings = {
+                pin: dict(channel) for pin, channel in group["channels"].items()
+            }
+            for channel in channels or []:
+                pin = channel.get("pin") if isinstance(channel, dict) else None
+                if pin not in settings:
+                    return {
+                        "success": False,
+                        "group": name,
+                        "error": f"Pin {pin} is not in PWM group {name}",
+                    }
+                for key in ("duty_cycle", "phase"):
+                    if key in channel:
+                        settings[pin][key] = channel[key]
+
+            frequency = group["frequency"] if frequency is None else frequency
+            merged = [{"pin": pin, **channel} for pin, channel in settings.items()]
+            error = self._validate_pwm_group(name, frequency, merged)
+            if error:
+                return {"success": False, "group": name, "error": error}
+
+            self._start_pwm_group_hardware(name, frequency, settings, group["info"])
+            return self._pwm_group_result(name, f"PWM group {name} updated")
+        except Exception as e:
+            self.logger.error(f"Error updating PWM group {name}: {str(e)}")
+            return {"success": False, "group": name, "error": str(e)}
+
+    def stop_pwm_group(self, name: str) -> Dict[str, Any]:
+        """Stop every pin of a PWM group together"""
+        try:
+            if name not in self.pwm_groups:
+                return {"success": False, "group": name, "error": "No such PWM group"}
+
+            self._stop_pwm_group_hardware(name)
+            self.logger.info(f"PWM group {name} stopped")
+            return {
+                "success": True,
+                "group": name,
+                "message": f"PWM group {name} stopped",
+            }
+        except Exception as e:
+            self.logger.error(f"Error stopping PWM group {name}: {str(e)}")
+            return {"success": False, "group": name, "error": str(e)}
+
+    def _validate_pwm_group(self, name, frequency, channels) -> Optional[str]:
+        """Return an error message for an invalid PWM group, or None"""
+        if not isinstance(name, str) or not name:
+            return "Group name must be a non-empty string"
+        if not isinstance(channels, list) or not channels:
+            return "channels must be a non-empty list"
+
+        pins = []
+        for channel in channels:
+            if not isinstance(channel, dict):
+                return "Each channel must be an object"
+            pins.append(channel.get("pin"))
+            error = self._validate_pwm_params(frequency, channel.get("duty_cycle"))
+            if error:
+                return error
+            phase = channel.get("phase", 0)
+            if not isinstance(phase, (int, float)) or not 0 <= phase < 360:
+                return f"Invalid phase: {phase}. Must be between 0 and 360 degrees."
+
+        error = self._validate_pin_list(pins)
+        if error:
+            return error
+        if len(set(pins)) != len(pins):
+            return "Duplicate pins in PWM group"
+        if max(pins) >= self.BANK_SIZE:
+            return f"PWM group pins must be below {self.BANK_SIZE}"
+        return None
+
+    def _start_pwm_group_hardware(
+        self,
+        name: str,
+        frequency: int,
+        settings: Dict[int, Dict[str, Any]],
+        previous: Dict[str, Any] = None,
+    ):
+        """Start or replace a group on the backend and record its pins"""
+        with self._pwm_lock:
+            info = self.backend.start_pwm_group(
+                frequency,
+                {
+                    pin: (channel["duty_cycle"], channel["phase"] / 360)
+                    for pin, channel in settings.items()
+                },
+                previous,
+            )
+            self.pwm_groups[name] = {
+                "frequency": frequency,
+                "channels": settings,
+                "info": info,
+            }
+            for pin, channel in settings.items():
+                self.pwm_instances[pin] = {
+                    "type": info["type"],
+                    "engine": info["channels"][pin].get("engine"),
+                    "group": name,
+                    "frequency": frequency,
+                    "duty_cycle": channel["duty_cycle"],
+                    "phase": channel["phase"],
+                }
+                self.pin_states.set_pwm(pin, True)
+
+    def _stop_pwm_group_hardware(self, name: str):
+        with self._pwm_lock:
+            group = self.pwm_groups.pop(name)
+            self.backend.stop_pwm_group(group["info"])
+            for pin in group["channels"]:
+                self.pwm_instances.pop(pin, None)
+                self.pin_states.set_pwm(pin, False)
+
+    def _pwm_group_result(self, name: str, message: str) -> Dict[str, Any]:
+        group = self.pwm_groups[name]
+        return {
+            "success": True,
+            "group": name,
+            "frequency": group["frequency"],
+            "channels": [
+                {"pin": pin, **channel} for pin, channel in group["channels"].items()
+            ],
+            "engine": group["info"]["type"],
+            "message": message,
+        }
+
+    def _validate_pwm_params(self, frequency, duty_cycle) -> Optional[str]:
+        """Return an error message for invalid PWM parameters, or None"""
+        if not isinstance(frequency, (int, float)) or frequency <= 0:
+            return f"Invalid frequency: {frequency}. Must be a positive number."
+
+        if frequency > 50000:
+            return f"Frequency {frequency}Hz exceeds maximum safe limit (50kHz)."
+
+        if (
+            not isinstance(duty_cycle, (int, float))
+            or duty_cycle < 0
+            or duty_cycle > 100
+        ):
+            return f"Invalid duty cycle: {duty_cycle}. Must be between 0 and 100."
+
+        return None
+
+    def _start_pwm_hardware(
+        self,
+        pin: int,
+        frequency: int,
+        duty_cycle: int,
+        pipeline: CommandPipeline = None,
+    ):
+        """(Re)start PWM on an output pin and record the instance"""
+        with self._pwm_lock:
+            # Stop existing PWM if running
+            if pin in self.pwm_instances:
+                self.stop_pwm_pin(pin)
+
+            self.pwm_instances[pin] = self.backend.start_pwm(
+                pin, frequency, duty_cycle, pipeline
+            )
+            self.pin_states.set_pwm(pin, True)
+
     def stop_pwm(self, pin: int) -> Dict[str, Any]:
         """Stop PWM output on a pin"""
         try:
@@ -432,6 +1476,14 @@ class GPIOController:
                     "error": "PWM not running on this pin",
                 }
 
+            group = self.pwm_instances[pin].get("group")
+            if group is not None:
+                return {
+                    "success": False,
+                    "pin": pin,
+                    "error": f"Pin {pin} is part of PWM group {group}",
+                }
+
             self.stop_pwm_pin(pin)
             self.logger.info(f"Pin {pin} PWM stopped")
 
@@ -441,14 +1493,19 @@ class GPIOController:
             return {"success": False, "pin": pin, "error": str(e)}
 
     def stop_pwm_pin(self, pin: int):
-        """Internal method to stop PWM on a specific pin"""
-        if pin in self.pwm_instances:
-            pwm_info = self.pwm_instances[pin]
-            if pwm_info["type"] == "pigpio" and self.pi and PIGPIO_AVAILABLE:
-                self.pi.hardware_PWM(pin, 0, 0)  # Stop hardware PWM
-            elif pwm_info["type"] == "rpi_gpio" and "instance" in pwm_info:
-                pwm_info["instance"].stop()
-            del self.pwm_instances[pin]
+        """Internal method to stop PWM on a specific pin
+
+        A pin that belongs to a PWM group stops the whole group.
+        """
+        with self._pwm_lock:
+            group = self.pwm_instances.get(pin, {}).get("group")
+            if group is not None:
+                self._stop_pwm_group_hardware(group)
+            elif pin in self.pwm_instances:
+                self._cancel_pwm_ramp(pin)
+                self.backend.stop_pwm(pin, self.pwm_instances[pin])
+                del self.pwm_instances[pin]
+                self.pin_states.set_pwm(pin, False)
 
     def reset_all_pins(self) -> Dict[str, Any]:
         """Reset all GPIO pins to their default state"""
@@ -457,19 +1514,16 @@ class GPIOController:
             for pin in list(self.pwm_instances.keys()):
                 self.stop_pwm_pin(pin)
 
+            # Remove edge callbacks
+            for pin in list(self.watched_pins.keys()):
+                self._unwatch_pin_hardware(pin)
+            if self.edge_capture is not None:
+                self.stop_capture()
+
             # Reset all pin states
+            self.backend.reset(list(self.pin_states.pins()))
             self.pin_states.clear()
 
-            if GPIO_AVAILABLE:
-                try:
-                    GPIO.cleanup()
-                    self.logger.info("GPIO cleanup completed")
-                except Exception as e:
-                    self.logger.warning(f"GPIO cleanup warning: {e}")
-                finally:
-                    # Mark as uninitialized so it will be re-initialized on next use
-                    self.gpio_initialized = False
-
             self.logger.info("All GPIO pins reset")
 
             return {"success": True, "message": "All GPIO pins reset"}
@@ -484,23 +1538,13 @@ class GPIOController:
             for pin in list(self.pwm_instances.keys()):
                 self.stop_pwm_pin(pin)
 
-            if GPIO_AVAILABLE:
-                try:
-                    GPIO.cleanup()
-                    self.logger.info("GPIO cleanup completed")
-                except Exception as e:
-                    self.logger.warning(f"GPIO cleanup warning: {e}")
-                finally:
-                    self.gpio_initialized = False
+            # Remove edge callbacks
+            for pin in list(self.watched_pins.keys()):
+                self._unwatch_pin_hardware(pin)
+            if self.edge_capture is not None:
+                self.stop_capture()
 
-            if self.pi and PIGPIO_AVAILABLE:
-                try:
-                    self.pi.stop()
-                    self.pi = None  # Reset pi object after stopping
-                    self.logger.info("pigpio cleanup completed")
-                except Exception as e:
-                    self.logger.warning(f"pigpio cleanup warning: {e}")
-                    self.pi = None  # Ensure pi is None even if stop() fails
+            self.backend.close()
 
         except Exception as e:
             self.logger.error(f"Error during cleanup: {str(e)}")
@@ -508,57 +1552,51 @@ class GPIOController:
     def get_pin_info(self, pin: int) -> Dict[str, Any]:
         """Get detailed information about a pin"""
         if pin in self.pin_states:
-            pin_info = self.pin_states[pin].copy()
+            pin_info = self.pin_states[pin]
             pin_info["pin"] = pin
-            pin_info["pwm_active"] = pin in self.pwm_instances
+            pin_info["pwm_active"] = self.pin_states.pwm_active(pin)
             if pin_info["pwm_active"]:
-                pin_info["pwm_info"] = self.pwm_instances[pin]
+                pwm_info = self.pwm_instances[pin]
+                # The RPi.GPIO PWM object is not serializable
+                pin_info["pwm_info"] = {
+                    key: value for key, value in pwm_info.items() if key != "instance"
+                }
+                pin_info["pwm_engine"] = pwm_info.get("engine")
+                ramp = self.pwm_ramps.get(pin)
+                if ramp is not None:
+                    pin_info["pwm_ramp"] = {
+                        **ramp[0].to_dict(),
+                        **ramp[0].progress(self.scheduler.clock() - ramp[1]),
+                    }
+            pin_info["watched"] = pin in self.watched_pins
             return pin_info
         else:
             return {"pin": pin, "configured": False, "message": "Pin not configured"}
 
     def get_system_status(self) -> Dict[str, Any]:
         """Get system status for debugging"""
-        # Convert pin_states to JSON-serializable format
-        serializable_pin_states = {}
-        for pin, state in self.pin_states.items():
-            serializable_pin_states[str(pin)] = {
-                "mode": str(state.get("mode", "")),
-                "state": (
-                    int(state.get("state", 0))
-                    if isinstance(state.get("state"), (int, bool))
-                    else 0
-                ),
-                "pull_up_down": (
-                    str(state.get("pull_up_down", ""))
-                    if state.get("pull_up_down")
-                    else None
-                ),
-            }
-
-        # Check pigpio connection safely - return boolean only
-        pigpio_connected = False
-        if self.pi is not None:
-            try:
-                # Check if connected attribute exists and is True
-                if hasattr(self.pi, "connected"):
-                    connected_val = self.pi.connected
-                    # Convert to bool (in case it's a Mock)
-                    pigpio_connected = (
-                        bool(connected_val) if not callable(connected_val) else True
-                    )
-                else:
-                    # If no connected attribute, assume connected if pi object exists
-                    pigpio_connected = True
-            except Exception:
-                pigpio_connected = False
+        # Explicit health probe (the hot path skips it)
+        backend_healthy = self.backend.initialized and self.backend.check_health()
+        pigpio_connected = self.backend.name == "pigpio" and backend_healthy
 
         return {
             "gpio_available": bool(GPIO_AVAILABLE),
             "pigpio_available": bool(PIGPIO_AVAILABLE),
             "gpio_initialized": bool(self.gpio_initialized),
             "pigpio_connected": bool(pigpio_connected),
+            "backend": self.backend.get_status(),
+            "broadcast": self.broadcaster.get_status(),
             "configured_pins": int(len(self.pin_states)),
             "active_pwm": int(len(self.pwm_instances)),
-            "pin_states": serializable_pin_states,
+            "pwm_updates": dict(self._pwm_update_stats),
+            "pwm_ramps": sorted(self.pwm_ramps),
+            "capturing": (
+                self.edge_capture[0].pins if self.edge_capture is not None else None
+            ),
+            "pwm_groups": {
+                name: sorted(group["channels"])
+                for name, group in self.pwm_groups.items()
+            },
+            # Serialized once from a constant-size snapshot of the pin table
+            "pin_states": self.pin_states.snapshot().to_debug_dict(),
         }
@@ -0,0 +1,86 @@
+"""
+Run blocking hardware calls off the eventlet hub
+
+Socket.IO runs on eventlet, but pigpio and RPi.GPIO calls block on C code
+or a socket, and servo moves sleep between steps. Called directly from a
+handler, any of these stalls every connected client. HardwareExecutor runs
+such calls in eventlet's native thread pool (tpool): the calling handler
+waits cooperatively while the hub keeps serving other sockets.
+
+Calls are serialized per lane, so GPIO operations never interleave with
+each other while a long servo move on its own lane does not hold up pin
+writes.
+"""
+
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict
+
+try:
+    from eventlet import tpool
+    from eventlet.patcher import original
+
+    EVENTLET_AVAILABLE = True
+    # Lanes are locked from native pool threads, so use real locks even if
+    # the threading module gets monkey-patched later
+    _Lock = original("threading").Lock
+except ImportError:
+    EVENTLET_AVAILABLE = False
+    tpool = None
+    _Lock = threading.Lock
+
+
+class HardwareExecutor:
+    """Dispatch blocking hardware calls to worker threads, one at a time per lane"""
+
+    MODES = ("auto", "tpool", "inline")
+
+    def __init__(self, mode: str = "auto"):
+        """
+        Args:
+            mode: "tpool" runs calls in eventlet's thread pool, "inline" runs
+                them in the caller (tests, non-eventlet servers); "auto"
+                picks tpool when eventlet is installed
+        """
+        if mode not in self.MODES:
+            raise ValueError(f"Invalid executor mode: {mode}")
+        if mode == "auto":
+            mode = "tpool" if EVENTLET_AVAILABLE else "inline"
+        elif mode == "tpool" and not EVENTLET_AVAILABLE:
+            raise ValueError("tpool executor requires eventlet")
+
+        self.mode = mode
+        self.logger = logging.getLogger(__name__)
+        self._lanes_lock = _Lock()
+        self._lanes: Dict[str, Any] = {}
+        self._stats = {"calls": 0, "max_wait_ms": 0.0}
+
+    def call(self, lane: str, fn: Callable, *args, **kwargs) -> Any:
+        """Run ``fn(*args, **kwargs)`` on the lane and return its result
+
+        Exceptions raised by ``fn`` propagate to the caller unchanged.
+        """
+        if self.mode == "tpool":
+            return tpool.execute(self._run, lane, fn, args, kwargs)
+        return self._run(lane, fn, args, kwargs)
+
+    def get_status(self) -> Dict[str, Any]:
+        """Executor statistics for debugging"""
+        return {"mode": self.mode, "lanes": sorted(self._lanes), **self._stats}
+
+    def _run(self, lane: str, fn: Callable, args, kwargs) -> Any:
+        lock = self._lane_lock(lane)
+        queued = time.monotonic()
+        with lock:
+            wait_ms = (time.monotonic() - queued) * 1000
+            self._stats["calls"] += 1
+            self._stats["max_wait_ms"] = max(self._stats["max_wait_ms"], wait_ms)
+            return fn(*args, **kwargs)
+
+    def _lane_lock(self, lane: str):
+        with self._lanes_lock:
+            lock = self._lanes.get(lane)
+            if lock is None:
+                lock = self._lanes[lane] = _Lock()
+            return lock
@@ -0,0 +1,192 @@
+"""
+Process-wide shared pigpio daemon connection
+
+Every pigpio.pi() opens its own socket to pigpiod, so each device class
+used to add another connection. Consumers now call acquire() and receive a
+lightweight handle that forwards to one shared connection. The connection
+is health-checked periodically and transparently re-established if the
+daemon was restarted.
+
+The daemon also has a single wave transmitter: a new waveform replaces the
+one playing and wave_tx_stop() stops whatever is playing. Users of waves
+(PWM groups, servo waveform moves) claim it through the manager first.
+"""
+
+import logging
+import threading
+import time
+from typing import Optional, Dict, Any
+
+try:
+    import pigpio
+
+    PIGPIO_AVAILABLE = True
+except ImportError:
+    PIGPIO_AVAILABLE = False
+    pigpio = None
+
+
+class PigpioHandle:
+    """A consumer's reference to the shared pigpio connection
+
+    Attribute access is forwarded to the manager's current connection, so
+    existing ``self.pi.write(...)`` style code keeps working across
+    reconnects. ``stop()`` releases this handle instead of closing the
+    shared socket.
+    """
+
+    def __init__(self, manager: "PigpioConnectionManager"):
+        self._manager = manager
+        self._released = False
+
+    def __getattr__(self, name):
+        if self._released:
+            raise RuntimeError("pigpio handle already released")
+        return getattr(self._manager.connection(), name)
+
+    def stop(self):
+        """Release this handle; the connection closes when the last one is released"""
+        if not self._released:
+            self._released = True
+            self._manager.release()
+
+
+class PigpioConnectionManager:
+    """Hands out handles to a single, health-checked pigpio connection"""
+
+    # Seconds between liveness probes of the shared connection
+    HEALTH_CHECK_INTERVAL = 5.0
+
+    def __init__(self, health_check_interval: float = None):
+        self.health_check_interval = (
+            self.HEALTH_CHECK_INTERVAL
+            if health_check_interval is None
+            else health_check_interval
+        )
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        self._pi = None
+        self._users = 0
+        self._reconnects = 0
+        self._next_check = 0.0
+        self._wave_owner: Optional[str] = None
+
+    def acquire(self) -> Optional[PigpioHandle]:
+        """Get a handle to the shared connection, or None if pigpiod is unreachable"""
+        if not PIGPIO_AVAILABLE:
+            return None
+
+        with self._lock:
+            if self._pi is None and not self._connect():
+                return None
+            self._users += 1
+        return PigpioHandle(self)
+
+    def release(self):
+        """Drop one user; close the connection when nobody uses it any more"""
+        with self._lock:
+            self._users = max(0, self._users - 1)
+            if self._users == 0 and self._pi is not None:
+                try:
+                    self._pi.stop()
+                    self.logger.info("pigpio connection closed")
+                except Exception as e:
+                    self.logger.warning(f"pigpio stop warning: {e}")
+                finally:
+                    self._pi = None
+
+    def connection(self):
+        """Return the live connection, reconnecting if the health check fails"""
+        pi = self._pi
+        if pi is not None and time.monotonic() < self._next_check:
+            return pi
+
+        with self._lock:
+            if self._pi is None or not self._is_healthy(self._pi):
+                self.logger.warning("pigpio connection lost, reconnecting...")
+                self._close_quietly()
+                if self._connect():
+                    self._reconnects += 1
+            if self._pi is None:
+                raise ConnectionError("pigpio daemon not reachable")
+            self._next_check = time.monotonic() + self.health_check_interval
+            return self._pi
+
+    def claim_wave(self, owner: str) -> bool:
+        """Reserve the wave transmitter for ``owner``
+
+        Returns False while another owner holds it; claiming again as the
+        current owner succeeds.
+        """
+        with self._lock:
+            if self._wave_owner not in (None, owner):
+                return False
+            self._wave_owner = owner
+            return True
+
+    def release_wave(self, owner: str):
+        """Give the wave transmitter back (no-op unless ``owner`` holds it)"""
+        with self._lock:
+            if self._wave_owner == owner:
+                self._wave_owner = None
+
+    def wave_owner(self) -> Optional[str]:
+        """Current holder of the wave transmitter, or None"""
+        return self._wave_owner
+
+    def get_status(self) -> Dict[str, Any]:
+        """Connection state for debugging"""
+        return {
+            "connected": self._pi is not None,
+            "users": self._users,
+            "reconnects": self._reconnects,
+            "wave_owner": self._wave_owner,
+        }
+
+    def _connect(self) -> bool:
+        """Open the daemon connection (caller holds the lock)"""
+        try:
+            pi = pigpio.pi()
+            if not pi.connected:
+                self.logger.warning("pigpio daemon not running")
+                return False
+        except Exception as e:
+            self.logger.warning(f"Failed to connect to pigpio daemon: {e}")
+            return False
+
+        self._pi = pi
+        self._next_check = time.monotonic() + self.health_check_interval
+        self.logger.info("pigpio connected successfully")
+        return True
+
+    def _close_quietly(self):
+        """Drop a broken connection (caller holds the lock)"""
+        if self._pi is not None:
+            try:
+                self._pi.stop()
+            except Exception:
+                pass
+            self._pi = None
+
+    @staticmethod
+    def _is_healthy(pi) -> bool:
+        """Cheap liveness probe: one command round trip"""
+        try:
+            pi.get_current_tick()
+            return bool(pi.connected)
+        except Exception:
+            return False
+
+
+# Shared by GPIOController, SG90Servo and any other device module
+_manager = PigpioConnectionManager()
+
+
+def acquire() -> Optional[PigpioHandle]:
+    """Get a handle to the process-wide pigpio connection"""
+    return _manager.acquire()
+
+
+def get_manager() -> PigpioConnectionManager:
+    """Return the process-wide connection manager"""
+    return _manager
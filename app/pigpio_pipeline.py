@@ -0,0 +1,202 @@
+"""
+Pipelined pigpio command execution
+
+pigpio's Python API sends each command and waits for its reply before the
+next one, so a burst of N writes costs N socket round trips. A
+CommandPipeline queues commands, sends them to the daemon back to back in
+one write and reads all replies afterwards. Replies arrive in command
+order, so each result is mapped back to the operation that queued it.
+
+When the raw command socket is not available (simulation, mocks) the
+queued commands are replayed through the normal pigpio methods, so callers
+never need a separate code path.
+"""
+
+import logging
+import socket
+import struct
+from typing import Any, Dict, List, Optional
+
+try:
+    import pigpio
+
+    PIGPIO_AVAILABLE = True
+except ImportError:
+    PIGPIO_AVAILABLE = False
+    pigpio = None
+
+# pigpio socket command codes (see pigpio.py / pigpiod command reference)
+_CMD_MODES = 0
+_CMD_PUD = 2
+_CMD_WRITE = 4
+_CMD_PWM = 5
+_CMD_PRS = 6
+_CMD_PFS = 7
+_CMD_SERVO = 8
+_CMD_BC1 = 12
+_CMD_BS1 = 14
+_CMD_HP = 86
+
+# Every command reply is four 32-bit words, the last one being the result
+_REPLY_LEN = 16
+
+
+class CommandPipeline:
+    """Queue pigpio commands and execute them with one round trip per flush"""
+
+    # Commands sent per socket write; bounds the unread replies so neither
+    # side's socket buffer can fill up and stall the daemon
+    MAX_DEPTH = 256
+
+    def __init__(self, pi):
+        """
+        Args:
+            pi: pigpio.pi instance or shared connection handle
+        """
+        self.pi = pi
+        self.logger = logging.getLogger(__name__)
+        # Default tag for queued commands that don't pass one explicitly
+        self.tag = None
+        self._queue = []
+
+    def __len__(self) -> int:
+        return len(self._queue)
+
+    def __enter__(self) -> "CommandPipeline":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.flush()
+        else:
+            self._queue.clear()
+
+    # ---- queueing, same signatures as pigpio.pi plus an optional tag ----
+
+    def set_mode(self, gpio: int, mode: int, tag: Any = None):
+        self._add("set_mode", (gpio, mode), _CMD_MODES, gpio, mode, tag=tag)
+
+    def set_pull_up_down(self, gpio: int, pud: int, tag: Any = None):
+        self._add("set_pull_up_down", (gpio, pud), _CMD_PUD, gpio, pud, tag=tag)
+
+    def write(self, gpio: int, level: int, tag: Any = None):
+        self._add("write", (gpio, level), _CMD_WRITE, gpio, level, tag=tag)
+
+    def set_PWM_dutycycle(self, gpio: int, dutycycle: int, tag: Any = None):
+        self._add(
+            "set_PWM_dutycycle", (gpio, dutycycle), _CMD_PWM, gpio, int(dutycycle), tag=tag
+        )
+
+    def set_PWM_range(self, gpio: int, range_: int, tag: Any = None):
+        self._add("set_PWM_range", (gpio, range_), _CMD_PRS, gpio, range_, tag=tag)
+
+    def set_PWM_frequency(self, gpio: int, frequency: int, tag: Any = None):
+        self._add(
+            "set_PWM_frequency", (gpio, frequency), _CMD_PFS, gpio, frequency, tag=tag
+        )
+
+    def set_servo_pulsewidth(self, gpio: int, pulsewidth: int, tag: Any = None):
+        self._add(
+            "set_servo_pulsewidth",
+            (gpio, pulsewidth),
+            _CMD_SERVO,
+            gpio,
+            int(pulsewidth),
+            tag=tag,
+        )
+
+    def set_bank_1(self, bits: int, tag: Any = None):
+        self._add("set_bank_1", (bits,), _CMD_BS1, bits, 0, tag=tag)
+
+    def clear_bank_1(self, bits: int, tag: Any = None):
+        self._add("clear_bank_1", (bits,), _CMD_BC1, bits, 0, tag=tag)
+
+    def hardware_PWM(self, gpio: int, frequency: int, duty: int, tag: Any = None):
+        self._add(
+            "hardware_PWM",
+            (gpio, frequency, duty),
+            _CMD_HP,
+            gpio,
+            int(frequency),
+            ext=struct.pack("I", int(duty)),
+            tag=tag,
+        )
+
+    # ---- execution ----
+
+    def flush(self) -> List[Dict[str, Any]]:
+        """Send all queued commands and return one result per command
+
+        Each result is ``{"op", "args", "tag", "result", "error"}`` where
+        ``error`` is the pigpio error text for a failed command, else None.
+        """
+        queue, self._queue = self._queue, []
+        if not queue:
+            return []
+
+        sock_lock = self._raw_socket()
+        if sock_lock is None:
+            return [self._run_direct(command) for command in queue]
+
+        results = []
+        for start in range(0, len(queue), self.MAX_DEPTH):
+            chunk = queue[start : start + self.MAX_DEPTH]
+            replies = self._run_pipelined(sock_lock, chunk)
+            for command, value in zip(chunk, replies):
+                results.append(self._result(command, value))
+        return results
+
+    def _add(self, op, args, cmd, p1, p2, ext: bytes = b"", tag: Any = None):
+        packet = struct.pack("IIII", cmd, p1, p2, len(ext)) + ext
+        if tag is None:
+            tag = self.tag
+        self._queue.append({"op": op, "args": args, "tag": tag, "packet": packet})
+
+    def _raw_socket(self) -> Optional[Any]:
+        """Return pigpio's command socket/lock pair, or None if not usable"""
+        try:
+            sock_lock = self.pi.sl
+        except Exception:
+            return None
+        if isinstance(getattr(sock_lock, "s", None), socket.socket):
+            return sock_lock
+        return None
+
+    def _run_pipelined(self, sock_lock, chunk: List[Dict[str, Any]]) -> List[int]:
+        """Write a chunk of commands at once, then read their replies in order"""
+        expected = _REPLY_LEN * len(chunk)
+        data = bytearray()
+        # Hold pigpio's own lock so no other thread interleaves commands
+        with sock_lock.l:
+            sock_lock.s.sendall(b"".join(command["packet"] for command in chunk))
+            while len(data) < expected:
+                received = sock_lock.s.recv(expected - len(data))
+                if not received:
+                    raise ConnectionError("pigpio daemon closed the connection")
+                data.extend(received)
+
+        return [
+            struct.unpack_from("i", data, offset + 12)[0]
+            for offset in range(0, expected, _REPLY_LEN)
+        ]
+
+    def _run_direct(self, command: Dict[str, Any]) -> Dict[str, Any]:
+        """Fallback: execute one queued command through the pigpio API"""
+        try:
+            value = getattr(self.pi, command["op"])(*command["args"])
+            if not isinstance(value, int):
+                value = 0
+        except Exception as e:
+            return self._result(command, None, str(e))
+        return self._result(command, value)
+
+    def _result(self, command, value, error: str = None) -> Dict[str, Any]:
+        if error is None and value is not None and value < 0:
+            error = pigpio.error_text(value) if PIGPIO_AVAILABLE else str(value)
+        return {
+            "op": command["op"],
+            "args": command["args"],
+            "tag": command["tag"],
+            "result": value,
+            "error": error,
+        }
@@ -0,0 +1,179 @@
+"""
+Compact array-backed GPIO pin state table
+
+Pin state used to be a dict of per-pin dicts rebuilt into more dicts for
+every status request. PinTable keeps one byte per pin and field in
+fixed-size bytearrays indexed by BCM number, plus a bitmask of configured
+pins. Snapshots are three small ``bytes`` copies, so they are cheap to take
+and safe to hand to a broadcaster while the controller keeps writing.
+
+PinTable still behaves like a read-mostly mapping of
+``pin -> {"mode", "state", "pull"}`` for callers that want dicts.
+"""
+
+from collections.abc import MutableMapping
+from typing import Any, Dict, Iterator, NamedTuple, Optional
+
+# Field encodings (index = stored byte)
+MODE_NAMES = (None, "input", "output")
+PULL_NAMES = (None, "pullup", "pulldown")
+
+MODE_UNSET = 0
+MODE_INPUT = 1
+MODE_OUTPUT = 2
+
+_MODE_CODES = {name: code for code, name in enumerate(MODE_NAMES)}
+_PULL_CODES = {name: code for code, name in enumerate(PULL_NAMES)}
+
+
+class PinTableSnapshot(NamedTuple):
+    """Immutable copy of a PinTable"""
+
+    configured: int
+    modes: bytes
+    levels: bytes
+    pulls: bytes
+    pwm: bytes
+
+    def pins(self) -> Iterator[int]:
+        return _iter_bits(self.configured)
+
+    def to_dict(self) -> Dict[int, Dict[str, Any]]:
+        """Serialize to ``{pin: {"state", "mode", "pull"}}``"""
+        return {
+            pin: {
+                "state": self.levels[pin],
+                "mode": MODE_NAMES[self.modes[pin]],
+                "pull": PULL_NAMES[self.pulls[pin]],
+            }
+            for pin in self.pins()
+        }
+
+    def to_debug_dict(self) -> Dict[str, Dict[str, Any]]:
+        """Serialize for /debug: ``{"pin": {"mode", "state", "pull_up_down"}}``"""
+        return {
+            str(pin): {
+                "mode": MODE_NAMES[self.modes[pin]],
+                "state": self.levels[pin],
+                "pull_up_down": PULL_NAMES[self.pulls[pin]],
+            }
+            for pin in self.pins()
+        }
+
+
+class PinTable(MutableMapping):
+    """Fixed-size pin state table indexed by BCM number"""
+
+    # BCM 0-53 (bank 1 and bank 2)
+    SIZE = 54
+
+    def __init__(self):
+        self._configured = 0
+        self._count = 0
+        self._modes = bytearray(self.SIZE)
+        self._levels = bytearray(self.SIZE)
+        self._pulls = bytearray(self.SIZE)
+        self._pwm = bytearray(self.SIZE)
+
+    # ---- fast accessors used by GPIOController ----
+
+    def configure(self, pin: int, mode: str, state: int = 0, pull: Optional[str] = None):
+        """Record a pin's mode, level and pull setting"""
+        self._check(pin)
+        if not (self._configured >> pin) & 1:
+            self._configured |= 1 << pin
+            self._count += 1
+        self._modes[pin] = _MODE_CODES[mode]
+        self._levels[pin] = 1 if state else 0
+        self._pulls[pin] = _PULL_CODES[pull]
+
+    def is_configured(self, pin: int) -> bool:
+        return 0 <= pin < self.SIZE and bool((self._configured >> pin) & 1)
+
+    def is_output(self, pin: int) -> bool:
+        return self.is_configured(pin) and self._modes[pin] == MODE_OUTPUT
+
+    def is_input(self, pin: int) -> bool:
+        return self.is_configured(pin) and self._modes[pin] == MODE_INPUT
+
+    def mode(self, pin: int) -> Optional[str]:
+        return MODE_NAMES[self._modes[pin]] if self.is_configured(pin) else None
+
+    def level(self, pin: int) -> int:
+        return self._levels[pin]
+
+    def set_level(self, pin: int, level: int):
+        self._levels[pin] = 1 if level else 0
+
+    def set_levels_from_mask(self, levels: int, limit: int = 32):
+        """Update configured pins below ``limit`` from a bank bitmask"""
+        for pin in _iter_bits(self._configured & ((1 << limit) - 1)):
+            self._levels[pin] = (levels >> pin) & 1
+
+    def set_pwm(self, pin: int, active: bool):
+        self._pwm[pin] = 1 if active else 0
+
+    def pwm_active(self, pin: int) -> bool:
+        return bool(self._pwm[pin])
+
+    def pins(self) -> Iterator[int]:
+        """Configured pins in ascending order"""
+        return _iter_bits(self._configured)
+
+    def snapshot(self) -> PinTableSnapshot:
+        """Constant-size copy of the whole table"""
+        return PinTableSnapshot(
+            self._configured,
+            bytes(self._modes),
+            bytes(self._levels),
+            bytes(self._pulls),
+            bytes(self._pwm),
+        )
+
+    # ---- mapping interface ----
+
+    def __getitem__(self, pin: int) -> Dict[str, Any]:
+        if not self.is_configured(pin):
+            raise KeyError(pin)
+        return {
+            "mode": MODE_NAMES[self._modes[pin]],
+            "state": self._levels[pin],
+            "pull": PULL_NAMES[self._pulls[pin]],
+        }
+
+    def __setitem__(self, pin: int, info: Dict[str, Any]):
+        self.configure(pin, info["mode"], info.get("state", 0), info.get("pull"))
+
+    def __delitem__(self, pin: int):
+        if not self.is_configured(pin):
+            raise KeyError(pin)
+        self._configured &= ~(1 << pin)
+        self._count -= 1
+        self._modes[pin] = self._levels[pin] = self._pulls[pin] = self._pwm[pin] = 0
+
+    def __contains__(self, pin: object) -> bool:
+        return isinstance(pin, int) and self.is_configured(pin)
+
+    def __iter__(self) -> Iterator[int]:
+        return self.pins()
+
+    def __len__(self) -> int:
+        return self._count
+
+    def clear(self):
+        self._configured = 0
+        self._count = 0
+        for field in (self._modes, self._levels, self._pulls, self._pwm):
+            field[:] = bytes(self.SIZE)
+
+    def _check(self, pin: int):
+        if not isinstance(pin, int) or not 0 <= pin < self.SIZE:
+            raise ValueError(f"Invalid pin: {pin}. Must be BCM 0-{self.SIZE - 1}.")
+
+
+def _iter_bits(mask: int) -> Iterator[int]:
+    """Yield the indexes of set bits in ascending order"""
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
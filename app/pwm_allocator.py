@@ -0,0 +1,91 @@
+"""
+PWM engine allocation
+
+The Pi can generate PWM three ways, from cheapest to most expensive:
+
+- hardware: the PWM peripheral. Only GPIO 12/18 (channel 0) and 13/19
+  (channel 1) in bank 1 are wired to it, and both pins of a channel output
+  the same signal, so a channel serves one pin at a time.
+- dma:      pigpio's DMA-timed PWM (set_PWM_dutycycle). Works on any bank 1
+  GPIO without CPU load; frequencies are rounded to the daemon's sample
+  rate steps (8kHz maximum at the default 5us).
+- software: RPi.GPIO's PWM, one busy thread per pin. Only used when
+  nothing better is available.
+
+Starting PWM used to call hardware_PWM on every pin, which fails on all
+but four of them. PWMAllocator hands out the hardware channels and picks
+the best engine the backend supports for each pin.
+"""
+
+from typing import Any, Dict, Iterable, Optional
+
+ENGINE_HARDWARE = "hardware"
+ENGINE_DMA = "dma"
+ENGINE_SOFTWARE = "software"
+
+# Engines in order of preference
+ENGINES = (ENGINE_HARDWARE, ENGINE_DMA, ENGINE_SOFTWARE)
+
+# BCM pin -> hardware PWM channel (bank 1 only)
+HARDWARE_PWM_CHANNELS = {12: 0, 18: 0, 13: 1, 19: 1}
+
+
+class PWMAllocator:
+    """Choose a PWM engine per pin and track hardware channel ownership"""
+
+    def __init__(self, engines: Iterable[str]):
+        """
+        Args:
+            engines: engines the backend can drive, any of ENGINES
+        """
+        unknown = set(engines) - set(ENGINES)
+        if unknown:
+            raise ValueError(f"Unknown PWM engines: {sorted(unknown)}")
+        self.engines = tuple(engine for engine in ENGINES if engine in engines)
+        # hardware channel -> pin currently using it
+        self._channels: Dict[int, int] = {}
+        # pin -> engine
+        self._pins: Dict[int, str] = {}
+
+    def allocate(self, pin: int) -> str:
+        """Return the engine for ``pin``, claiming a hardware channel if free
+
+        A pin that already holds an allocation keeps its engine.
+        """
+        if pin in self._pins:
+            return self._pins[pin]
+
+        channel = HARDWARE_PWM_CHANNELS.get(pin)
+        if (
+            ENGINE_HARDWARE in self.engines
+            and channel is not None
+            and channel not in self._channels
+        ):
+            self._channels[channel] = pin
+            engine = ENGINE_HARDWARE
+        elif ENGINE_DMA in self.engines:
+            engine = ENGINE_DMA
+        elif ENGINE_SOFTWARE in self.engines:
+            engine = ENGINE_SOFTWARE
+        else:
+            raise RuntimeError(f"No PWM engine available for pin {pin}")
+
+        self._pins[pin] = engine
+        return engine
+
+    def release(self, pin: int):
+        """Free the pin's allocation (and its hardware channel)"""
+        if self._pins.pop(pin, None) == ENGINE_HARDWARE:
+            del self._channels[HARDWARE_PWM_CHANNELS[pin]]
+
+    def engine(self, pin: int) -> Optional[str]:
+        """Engine currently allocated to ``pin``, or None"""
+        return self._pins.get(pin)
+
+    def get_status(self) -> Dict[str, Any]:
+        """Allocation state for debugging"""
+        return {
+            "engines": list(self.engines),
+            "hardware_channels": dict(self._channels),
+            "pins": dict(self._pins),
+        }
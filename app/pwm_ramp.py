@@ -0,0 +1,114 @@
+"""
+Server-side PWM ramps
+
+Fading an LED or ramping a motor used to mean the browser streaming
+pwm_start events, so the smoothness of the fade depended on network
+latency. A PwmRamp describes the whole fade (start and end duty, duration,
+easing curve, repeats) and GPIOController plays it back on the periodic
+scheduler, next to the hardware.
+"""
+
+import math
+from typing import Any, Callable, Dict, Optional, Tuple
+
+# Easing curves: fraction of time elapsed (0..1) -> fraction of the change
+EASINGS: Dict[str, Callable[[float], float]] = {
+    "linear": lambda t: t,
+    "ease_in": lambda t: t * t,
+    "ease_out": lambda t: t * (2 - t),
+    "ease_in_out": lambda t: (1 - math.cos(math.pi * t)) / 2,
+    # Roughly perceptually even LED brightness steps
+    "gamma": lambda t: t**2.2,
+}
+
+# repeat value for a ramp that runs until stopped
+REPEAT_FOREVER = -1
+
+
+class PwmRamp:
+    """Duty cycle as a function of time for one fade"""
+
+    def __init__(
+        self,
+        start: float,
+        end: float,
+        duration: float,
+        easing: str = "linear",
+        repeat: int = 0,
+        alternate: bool = False,
+    ):
+        """
+        Args:
+            start: duty cycle % at the beginning of each cycle
+            end: duty cycle % at the end of each cycle
+            duration: length of one cycle in seconds
+            easing: name of the curve in EASINGS
+            repeat: extra cycles after the first; REPEAT_FOREVER (-1) runs
+                until stopped
+            alternate: run every other cycle backwards (end -> start), e.g.
+                for a breathing LED
+        """
+        for name, duty in (("start", start), ("end", end)):
+            if not _is_number(duty) or not 0 <= duty <= 100:
+                raise ValueError(
+                    f"Invalid {name} duty cycle: {duty}. Must be between 0 and 100."
+                )
+        if not _is_number(duration) or duration <= 0:
+            raise ValueError(f"Invalid duration: {duration}. Must be positive.")
+        if easing not in EASINGS:
+            raise ValueError(
+                f"Invalid easing: {easing}. Must be one of {sorted(EASINGS)}"
+            )
+        if not isinstance(repeat, int) or isinstance(repeat, bool) or repeat < -1:
+            raise ValueError(f"Invalid repeat: {repeat}. Must be -1 or more.")
+
+        self.start = start
+        self.end = end
+        self.duration = float(duration)
+        self.easing = easing
+        self.repeat = repeat
+        self.alternate = bool(alternate)
+        self._ease = EASINGS[easing]
+
+    @property
+    def cycles(self) -> Optional[int]:
+        """Number of cycles, or None when repeating forever"""
+        return None if self.repeat == REPEAT_FOREVER else self.repeat + 1
+
+    @property
+    def final_duty(self) -> float:
+        """Duty cycle the ramp ends on"""
+        if self.alternate and self.cycles is not None and self.cycles % 2 == 0:
+            return self.start
+        return self.end
+
+    def duty_at(self, elapsed: float) -> Tuple[float, bool]:
+        """Duty cycle ``elapsed`` seconds after the start, and whether it is done"""
+        cycle, offset = divmod(max(0.0, elapsed), self.duration)
+        if self.cycles is not None and cycle >= self.cycles:
+            return self.final_duty, True
+        position = offset / self.duration
+        if self.alternate and cycle % 2:
+            position = 1 - position
+        return self.start + (self.end - self.start) * self._ease(position), False
+
+    def progress(self, elapsed: float) -> Dict[str, Any]:
+        """Cycle number and fraction of the current cycle for status output"""
+        cycle, offset = divmod(max(0.0, elapsed), self.duration)
+        if self.cycles is not None and cycle >= self.cycles:
+            return {"cycle": self.cycles - 1, "progress": 1.0}
+        return {"cycle": int(cycle), "progress": round(offset / self.duration, 3)}
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "start_duty": self.start,
+            "end_duty": self.end,
+            "duration": self.duration,
+            "easing": self.easing,
+            "repeat": self.repeat,
+            "alternate": self.alternate,
+        }
+
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
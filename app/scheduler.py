@@ -0,0 +1,230 @@
+"""
+Drift-free periodic task scheduler
+
+Device loops used to run in their own thread as "do work, then
+time.sleep(delay)", so the real period was delay plus the work and I/O
+time and drifted further under load. PeriodicScheduler runs every periodic
+task on a single thread against absolute monotonic deadlines
+(start + n * interval): time spent in a task does not push later runs back.
+A task that overruns its period skips the missed deadlines instead of
+bursting to catch up. Each task reports its start-time jitter and overrun
+count.
+"""
+
+import heapq
+import itertools
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+
+class PeriodicTask:
+    """Handle for a task registered with PeriodicScheduler"""
+
+    def __init__(
+        self, scheduler: "PeriodicScheduler", fn: Callable, interval: float, name: str
+    ):
+        self.scheduler = scheduler
+        self.fn = fn
+        self.interval = interval
+        self.name = name
+        self.cancelled = False
+        self.runs = 0
+        self.overruns = 0
+        self.max_jitter = 0.0
+        self._jitter_total = 0.0
+        self._start = 0.0
+        self._period = 0  # index of the next deadline
+        self._done = threading.Event()
+        self._done.set()
+
+    @property
+    def next_deadline(self) -> float:
+        return self._start + self._period * self.interval
+
+    def cancel(self, wait: bool = True):
+        """Stop the task; optionally wait for a run in progress to finish"""
+        self.scheduler.cancel(self)
+        if wait and threading.current_thread() is not self.scheduler.thread:
+            self._done.wait(timeout=1.0)
+
+    def get_status(self) -> Dict[str, Any]:
+        """Timing statistics for debugging"""
+        return {
+            "name": self.name,
+            "interval_ms": self.interval * 1000,
+            "runs": self.runs,
+            "overruns": self.overruns,
+            "max_jitter_ms": round(self.max_jitter * 1000, 3),
+            "mean_jitter_ms": round(
+                self._jitter_total / self.runs * 1000 if self.runs else 0.0, 3
+            ),
+            "active": not self.cancelled,
+        }
+
+
+class PeriodicScheduler:
+    """Run periodic tasks on one thread against absolute deadlines"""
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic, autostart=True):
+        """
+        Args:
+            clock: monotonic time source in seconds
+            autostart: start the worker thread on the first schedule();
+                without it, tasks only run through run_pending()
+        """
+        self.clock = clock
+        self.autostart = autostart
+        self.logger = logging.getLogger(__name__)
+        self.thread: Optional[threading.Thread] = None
+        self._cond = threading.Condition()
+        self._heap: List = []
+        self._order = itertools.count()
+        self._tasks: List[PeriodicTask] = []
+
+    def schedule(
+        self,
+        interval: float,
+        fn: Callable[[], Optional[bool]],
+        name: str = None,
+        delay: float = None,
+    ) -> PeriodicTask:
+        """
+        Run ``fn()`` every ``interval`` seconds until it returns False or
+        the task is cancelled
+
+        Args:
+            interval: period in seconds
+            fn: task body; return False to stop repeating
+            name: label for status output
+            delay: time until the first run (defaults to one interval)
+        """
+        if interval <= 0:
+            raise ValueError(f"Invalid interval: {interval}. Must be positive.")
+
+        name = name or getattr(fn, "__name__", "task")
+        task = PeriodicTask(self, fn, interval, name)
+        first = interval if delay is None else delay
+        with self._cond:
+            # Deadline n is _start + n * interval; the first one is n = 1
+            task._start = self.clock() + first - interval
+            task._period = 1
+            self._push(task)
+            self._tasks.append(task)
+            if self.autostart:
+                self._ensure_thread()
+            self._cond.notify()
+        return task
+
+    def cancel(self, task: PeriodicTask):
+        """Remove a task; the heap entry is dropped lazily"""
+        with self._cond:
+            task.cancelled = True
+            if task in self._tasks:
+                self._tasks.remove(task)
+            self._cond.notify()
+
+    def get_status(self) -> Dict[str, Any]:
+        """Status of all active tasks"""
+        with self._cond:
+            tasks = list(self._tasks)
+        return {
+            "running": self.thread is not None and self.thread.is_alive(),
+            "tasks": [task.get_status() for task in tasks],
+        }
+
+    def run_pending(self, now: float = None) -> int:
+        """Run every task whose deadline has passed; returns the number run
+
+        Used by the scheduler thread, and directly by tests with a fake clock.
+        """
+        ran = 0
+        while True:
+            with self._cond:
+                task = self._pop_due(self.clock() if now is None else now)
+                if task is None:
+                    return ran
+                task._done.clear()
+            try:
+                self._run(task, self.clock() if now is None else now)
+            finally:
+                task._done.set()
+            ran += 1
+
+    def _run(self, task: PeriodicTask, started: float):
+        jitter = max(0.0, started - task.next_deadline)
+        task.runs += 1
+        task._jitter_total += jitter
+        task.max_jitter = max(task.max_jitter, jitter)
+
+        try:
+            keep = task.fn() is not False
+        except Exception as e:
+            self.logger.error(f"Periodic task {task.name} failed: {e}")
+            keep = True
+
+        with self._cond:
+            if not keep:
+                task.cancelled = True
+                if task in self._tasks:
+                    self._tasks.remove(task)
+            if task.cancelled:
+                return
+            # Next absolute deadline; skip any that already passed
+            now = self.clock()
+            task._period += 1
+            if task.next_deadline <= now:
+                missed = int((now - task.next_deadline) / task.interval) + 1
+                task.overruns += missed
+                task._period += missed
+            self._push(task)
+
+    def _push(self, task: PeriodicTask):
+        heapq.heappush(self._heap, (task.next_deadline, next(self._order), task))
+
+    def _pop_due(self, now: float) -> Optional[PeriodicTask]:
+        """Pop the earliest due task (caller holds the lock)"""
+        while self._heap:
+            deadline, _, task = self._heap[0]
+            if task.cancelled or deadline != task.next_deadline:
+                heapq.heappop(self._heap)
+                continue
+            if deadline > now:
+                return None
+            heapq.heappop(self._heap)
+            return task
+        return None
+
+    def _ensure_thread(self):
+        if self.thread is None or not self.thread.is_alive():
+            self.thread = threading.Thread(
+                target=self._loop, name="periodic-scheduler", daemon=True
+            )
+            self.thread.start()
+
+    def _loop(self):
+        while True:
+            self.run_pending()
+            with self._cond:
+                while self._heap and (
+                    self._heap[0][2].cancelled
+                    or self._heap[0][0] != self._heap[0][2].next_deadline
+                ):
+                    heapq.heappop(self._heap)
+                if not self._heap:
+                    # Idle: park until a task is scheduled
+                    self._cond.wait()
+                    continue
+                timeout = self._heap[0][0] - self.clock()
+                if timeout > 0:
+                    self._cond.wait(timeout)
+
+
+# Shared by all device loops (servo motion, scan, ...)
+_scheduler = PeriodicScheduler()
+
+
+def get_scheduler() -> PeriodicScheduler:
+    """Return the process-wide periodic scheduler"""
+    return _scheduler
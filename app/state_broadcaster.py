@@ -0,0 +1,198 @@
+"""
+Coalesced broadcast of pin state changes
+
+Every write and edge used to broadcast its own ``pin_state_changed`` event,
+so rapid toggling produced one message per change for every connected
+browser. StateBroadcaster collects changes for a short window and then
+sends a single ``pins_changed`` delta with the latest state of each pin
+that changed. Intermediate states within a window are dropped, so socket
+traffic stays bounded by the window length rather than the write rate.
+While an emit is blocked on a slow client, new changes keep merging into
+the next delta instead of queueing up behind it.
+
+Clients receive updates through Socket.IO rooms. By default a client sits
+in ``pins:all`` and gets every delta. A client that subscribes to specific
+pins moves to a group room named after its pin set (``pins:4,17``), shared
+by every client watching the same set, and only receives the part of each
+delta that concerns those pins.
+"""
+
+import logging
+import threading
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional
+
+
+class StateBroadcaster:
+    """Merge pin state changes and emit one delta per window"""
+
+    EVENT = "pins_changed"
+    NAMESPACE = "/"
+    # Room of clients that receive changes for every pin
+    ALL_ROOM = "pins:all"
+    # Default coalescing window in milliseconds
+    DEFAULT_WINDOW_MS = 20
+
+    def __init__(self, socketio, window_ms: float = None):
+        """
+        Args:
+            socketio: Flask-SocketIO instance used to emit and schedule flushes
+            window_ms: Coalescing window; 0 emits every change immediately
+        """
+        self.socketio = socketio
+        self.window_ms = self.DEFAULT_WINDOW_MS if window_ms is None else window_ms
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        self._pending: Dict[int, Dict[str, Any]] = {}
+        self._running = False
+        # sid -> subscribed pin set (None = all pins)
+        self._clients: Dict[str, Optional[FrozenSet[int]]] = {}
+        # pin set -> number of clients in its group room
+        self._groups: Dict[FrozenSet[int], int] = {}
+        self._stats = {"published": 0, "emitted": 0, "messages": 0}
+
+    def publish(self, changes: Dict[int, Dict[str, Any]]):
+        """Queue ``{pin: {"state", "mode"}}`` changes for the next delta
+
+        Safe to call from any thread (hardware executor, edge callbacks):
+        it only merges into the pending delta. The flusher task running on
+        the server's event loop does the actual emit.
+        """
+        if not changes:
+            return
+
+        with self._lock:
+            self._pending.update(changes)
+            self._stats["published"] += len(changes)
+
+        if self.window_ms <= 0:
+            self.flush()
+        elif not self._running:
+            self.start()
+
+    def start(self):
+        """Start the background task that flushes once per window"""
+        if self.window_ms <= 0 or self._running:
+            return
+        self._running = True
+        try:
+            self.socketio.start_background_task(self._run)
+        except Exception as e:
+            self._running = False
+            self.logger.debug(f"Could not start broadcast task, sending now: {e}")
+            self.flush()
+
+    def stop(self):
+        """Stop the flusher task after its current window"""
+        self._running = False
+
+    def flush(self) -> Dict[int, Dict[str, Any]]:
+        """Emit all pending changes now and return the delta that was sent"""
+        with self._lock:
+            delta, self._pending = self._pending, {}
+            groups = list(self._groups)
+        if not delta:
+            return delta
+
+        self._send(self.ALL_ROOM, delta)
+        for pins in groups:
+            changed = {pin: delta[pin] for pin in pins if pin in delta}
+            if changed:
+                self._send(self.group_room(pins), changed)
+        return delta
+
+    # ---- subscriptions ----
+
+    @staticmethod
+    def group_room(pins: Iterable[int]) -> str:
+        """Room shared by all clients subscribed to exactly these pins"""
+        return "pins:" + ",".join(str(pin) for pin in sorted(pins))
+
+    def add_client(self, sid: str):
+        """Register a connected client; it starts out receiving all pins"""
+        self._move(sid, None)
+
+    def remove_client(self, sid: str):
+        """Forget a disconnected client (the server drops its rooms)"""
+        with self._lock:
+            self._leave_group(self._clients.pop(sid, None))
+
+    def subscribe(self, sid: str, pins: Iterable[int]) -> List[int]:
+        """Add pins to a client's subscription and return the full set"""
+        with self._lock:
+            current = self._clients.get(sid) or frozenset()
+        return self._move(sid, current | frozenset(pins))
+
+    def unsubscribe(self, sid: str, pins: Iterable[int] = None) -> Optional[List[int]]:
+        """Drop pins from a client's subscription
+
+        Without ``pins`` the client returns to receiving every pin. Returns
+        the remaining pins, or None when the client receives all pins.
+        """
+        if pins is None:
+            return self._move(sid, None)
+        with self._lock:
+            current = self._clients.get(sid)
+        if current is None:
+            return None
+        return self._move(sid, current - frozenset(pins))
+
+    def subscriptions(self, sid: str) -> Optional[List[int]]:
+        """Pins a client is subscribed to, or None for all pins"""
+        pins = self._clients.get(sid)
+        return None if pins is None else sorted(pins)
+
+    def _move(self, sid: str, pins: Optional[FrozenSet[int]]) -> Optional[List[int]]:
+        """Switch a client to the room for ``pins`` (None = all pins)"""
+        with self._lock:
+            previous = self._clients.get(sid, False)
+            self._clients[sid] = pins
+            if previous is not False:
+                self._leave_group(previous)
+            if pins is not None:
+                self._groups[pins] = self._groups.get(pins, 0) + 1
+
+        old_room = None if previous is False else self._room(previous)
+        new_room = self._room(pins)
+        if old_room != new_room:
+            server = self.socketio.server
+            if old_room is not None:
+                server.leave_room(sid, old_room, namespace=self.NAMESPACE)
+            server.enter_room(sid, new_room, namespace=self.NAMESPACE)
+        return None if pins is None else sorted(pins)
+
+    def _leave_group(self, pins: Optional[FrozenSet[int]]):
+        """Drop one member from a group (caller holds the lock)"""
+        if pins is None or pins not in self._groups:
+            return
+        self._groups[pins] -= 1
+        if self._groups[pins] <= 0:
+            del self._groups[pins]
+
+    def _room(self, pins: Optional[FrozenSet[int]]) -> str:
+        return self.ALL_ROOM if pins is None else self.group_room(pins)
+
+    def _send(self, room: str, delta: Dict[int, Dict[str, Any]]):
+        self._stats["emitted"] += len(delta)
+        self._stats["messages"] += 1
+        try:
+            self.socketio.emit(self.EVENT, delta, to=room)
+        except Exception as e:
+            # Real-time updates are optional; clients still get responses
+            self.logger.debug(f"Optional real-time emit skipped for {self.EVENT}: {e}")
+
+    def get_status(self) -> Dict[str, Any]:
+        """Coalescing statistics for debugging"""
+        with self._lock:
+            return {
+                "window_ms": self.window_ms,
+                "pending": len(self._pending),
+                "clients": len(self._clients),
+                "groups": len(self._groups),
+                **self._stats,
+            }
+
+    def _run(self):
+        """Background task: send at most one delta per window"""
+        while self._running:
+            self.socketio.sleep(self.window_ms / 1000.0)
+            self.flush()
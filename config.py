@@ -2,10 +2,22 @@
 Configuration management for Raspberry Pi GPIO Control Application
 """
 
+import json
 import os
 from typing import Dict, Any
 
 
+def parse_servo_pins(value: str) -> Dict[str, int]:
+    """Parse "name:pin,name:pin" into an ordered name -> BCM pin mapping"""
+    servos = {}
+    for entry in value.split(","):
+        if not entry.strip():
+            continue
+        name, _, pin = entry.partition(":")
+        servos[name.strip()] = int(pin)
+    return servos
+
+
 class Config:
     """Base configuration"""
 
@@ -27,6 +39,20 @@ class Config:
     # GPIO settings
     GPIO_MODE = "BCM"  # BCM or BOARD numbering
     GPIO_WARNINGS = False
+    # Hardware backend: auto (pigpio > RPi.GPIO > simulator), pigpio, rpi_gpio, simulator
+    GPIO_BACKEND = os.environ.get("GPIO_BACKEND", "auto")
+    # Pin state changes are coalesced into one pins_changed message per window
+    BROADCAST_WINDOW_MS = float(os.environ.get("BROADCAST_WINDOW_MS", 20))
+    # Blocking hardware calls: auto/tpool (eventlet thread pool) or inline
+    HARDWARE_EXECUTOR = os.environ.get("HARDWARE_EXECUTOR", "auto")
+
+    # Servos as "name:pin,..."; the first one is driven by the SG90 demo page
+    SERVO_PINS = parse_servo_pins(os.environ.get("SERVO_PINS", "main:18"))
+    # Per-servo calibration as JSON: {"name": [[angle, pulse_us], ...]};
+    # servos without an entry use the linear 0-180 -> 500-2500us mapping
+    SERVO_CALIBRATION = json.loads(os.environ.get("SERVO_CALIBRATION", "{}"))
+    # Servo status is pushed as deltas at most once per interval
+    SERVO_STATUS_INTERVAL_MS = float(os.environ.get("SERVO_STATUS_INTERVAL_MS", 100))
 
     # PWM limits (hardware safety)
     PWM_MAX_FREQUENCY = 50000  # 50kHz maximum
@@ -74,6 +100,10 @@ class TestingConfig(Config):
     TESTING = True
     DEBUG = True
     LOG_LEVEL = "DEBUG"
+    # Emit immediately and run handlers inline so tests see events synchronously
+    BROADCAST_WINDOW_MS = 0
+    SERVO_STATUS_INTERVAL_MS = 0
+    HARDWARE_EXECUTOR = "inline"
 
 
 # Configuration dictionary
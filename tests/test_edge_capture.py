@@ -0,0 +1,138 @@
+"""
+Test logic-analyzer style edge capture
+"""
+
+from unittest.mock import MagicMock
+
+import pytest
+
+from app.edge_capture import EdgeCapture
+from app.gpio_backends import SimulatorBackend, VirtualClock
+from app.gpio_controller import GPIOController
+
+
+class TestEdgeCapture:
+    """Test EdgeCapture"""
+
+    def test_delta_encoded_edges(self):
+        capture = EdgeCapture([17, 4], 1.0, {4: 0, 17: 1}, start_tick=1000)
+
+        capture.on_edge(17, 0, 1100)
+        capture.on_edge(4, 1, 1150)
+        capture.on_edge(17, 1, 1400)
+        result = capture.result()
+
+        assert result["pins"] == [4, 17]
+        assert result["edges"] == [[100, 17, 0], [50, 4, 1], [250, 17, 1]]
+        assert result["initial"] == {4: 0, 17: 1}
+        assert result["triggered"] is True
+
+    def test_trigger_keeps_pretrigger_edges(self):
+        trigger = {"pin": 4, "edge": "rising"}
+        capture = EdgeCapture([4, 17], 0.001, {}, start_tick=0, trigger=trigger)
+
+        capture.on_edge(17, 1, 100)
+        capture.on_edge(4, 0, 150)  # Falling, not the trigger
+        assert capture.done() is False
+        capture.on_edge(4, 1, 300)
+        capture.on_edge(17, 0, 900)
+        capture.on_edge(17, 1, 1400)  # After the 1ms window
+        result = capture.result()
+
+        assert capture.triggered
+        assert result["edges"] == [
+            [-200, 17, 1],
+            [50, 4, 0],
+            [150, 4, 1],
+            [600, 17, 0],
+        ]
+        assert capture.done() is True
+
+    def test_ring_buffer_overwrites_oldest(self):
+        capture = EdgeCapture([4], 1.0, {4: 0}, start_tick=0, max_edges=3)
+
+        for n in range(5):
+            capture.on_edge(4, (n + 1) % 2, 10 * (n + 1))
+        result = capture.result()
+
+        assert result["count"] == 3
+        assert result["dropped"] == 2
+        assert result["edges"] == [[30, 4, 1], [10, 4, 0], [10, 4, 1]]
+        # Level before the first edge that was kept
+        assert result["initial"] == {4: 0}
+
+    def test_tick_wraparound(self):
+        capture = EdgeCapture([4], 1.0, {4: 0}, start_tick=0xFFFFFF00)
+
+        capture.on_edge(4, 1, 0xFFFFFFF0)
+        capture.on_edge(4, 0, 0x10)
+
+        assert capture.result()["edges"] == [[240, 4, 1], [32, 4, 0]]
+
+    @pytest.mark.parametrize(
+        "trigger", ["rising", {"pin": 5, "edge": "rising"}, {"pin": 4, "edge": "up"}]
+    )
+    def test_invalid_trigger(self, trigger):
+        assert EdgeCapture.validate_trigger(trigger, [4]) is not None
+
+
+class TestControllerCapture:
+    """Test captures through GPIOController on the simulator"""
+
+    @pytest.fixture
+    def clock(self):
+        return VirtualClock()
+
+    @pytest.fixture
+    def backend(self, clock):
+        return SimulatorBackend(clock)
+
+    @pytest.fixture
+    def controller(self, backend):
+        return GPIOController(MagicMock(), backend=backend)
+
+    def test_capture_pulse_train(self, controller, backend, clock):
+        result = controller.start_capture([4, 17], 0.5)
+        assert result["success"] is True
+        assert controller.start_capture([5], 0.5)["success"] is False
+
+        for level in (1, 0, 1):
+            clock.advance(0.000125)
+            backend.set_input(4, level)
+        clock.advance(0.001)
+        backend.set_input(17, 1)
+
+        result = controller.stop_capture()
+
+        assert result["success"] is True
+        assert result["edges"] == [
+            [125, 4, 1],
+            [125, 4, 0],
+            [125, 4, 1],
+            [1000, 17, 1],
+        ]
+        assert controller.edge_capture is None
+        # Callbacks are removed with the capture
+        backend.set_input(4, 0)
+        assert controller.stop_capture()["success"] is False
+
+    def test_wait_gives_up_without_trigger(self, controller):
+        controller.start_capture([4], 0.01, trigger={"pin": 4, "edge": "rising"})
+
+        assert controller.wait_for_capture(timeout=0.02) is False
+        result = controller.stop_capture()
+        assert result["triggered"] is False
+        assert result["edges"] == []
+
+    def test_invalid_capture(self, controller):
+        controller.watch_pin(22)
+
+        assert controller.start_capture([], 1.0)["success"] is False
+        assert controller.start_capture([4, 4], 1.0)["success"] is False
+        assert controller.start_capture([40], 1.0)["success"] is False
+        assert controller.start_capture([4], 60)["success"] is False
+        assert controller.start_capture([22], 1.0)["success"] is False
+        assert controller.start_capture([4], 1.0, timeout="x")["success"] is False
+        assert controller.start_capture([4], 1.0, timeout=0)["success"] is False
+        assert controller.start_capture([4], 1.0, timeout=60)["success"] is False
+        assert controller.edge_capture is None
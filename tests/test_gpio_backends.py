@@ -0,0 +1,155 @@
+"""
+Test GPIO hardware backends
+"""
+
+import pytest
+from unittest.mock import MagicMock
+
+from app.gpio_backends import (
+    RPiGPIOBackend,
+    SimulatorBackend,
+    VirtualClock,
+    pwm_wave_edges,
+)
+
+
+class TestRPiGPIOBackend:
+    """Test RPiGPIOBackend class"""
+
+    @pytest.fixture
+    def gpio(self):
+        """A mocked RPi.GPIO module"""
+        gpio = MagicMock()
+        gpio.BCM = 11
+        gpio.getmode.return_value = 11
+        return gpio
+
+    def test_write_skips_setmode_probe(self, gpio):
+        """Test that the write path makes no extra GPIO library calls"""
+        backend = RPiGPIOBackend(gpio)
+        gpio.setmode.reset_mock()
+
+        assert backend.ensure_initialized() is True
+        backend.write(23, 1)
+        backend.write(23, 0)
+
+        gpio.setmode.assert_not_called()
+        gpio.getmode.assert_not_called()
+        assert gpio.output.call_count == 2
+
+    def test_update_pwm_reuses_instance(self, gpio):
+        """Test that PWM updates change the running object in place"""
+        backend = RPiGPIOBackend(gpio)
+        info = backend.start_pwm(18, 1000, 50)
+
+        info = backend.update_pwm(18, info, 1000, 20)
+        info = backend.update_pwm(18, info, 500, 20)
+
+        gpio.PWM.assert_called_once_with(18, 1000)
+        pwm = gpio.PWM.return_value
+        pwm.ChangeDutyCycle.assert_called_once_with(20)
+        pwm.ChangeFrequency.assert_called_once_with(500)
+        pwm.stop.assert_not_called()
+        assert (info["frequency"], info["duty_cycle"]) == (500, 20)
+
+    def test_health_check_recovers_external_cleanup(self, gpio):
+        """Test that an external GPIO.cleanup() is detected and recovered"""
+        backend = RPiGPIOBackend(gpio)
+        gpio.setmode.reset_mock()
+        gpio.getmode.return_value = None  # Mode lost after cleanup
+        backend._next_health_check = 0.0
+
+        assert backend.ensure_initialized() is True
+        gpio.setmode.assert_called_once_with(11)
+        assert backend.initialized is True
+
+    def test_write_recovers_from_runtime_error(self, gpio):
+        """Test recovery when GPIO is reset between health checks"""
+        backend = RPiGPIOBackend(gpio)
+        gpio.setmode.reset_mock()
+        gpio.output.side_effect = [RuntimeError("Please set pin numbering mode"), None]
+
+        backend.write(23, 1)
+
+        gpio.setmode.assert_called_once()
+        assert gpio.output.call_count == 2
+
+    def test_close_marks_uninitialized(self, gpio):
+        """Test that our own cleanup path clears the initialized flag"""
+        backend = RPiGPIOBackend(gpio)
+
+        backend.close()
+
+        gpio.cleanup.assert_called_once()
+        assert backend.initialized is False
+
+
+class TestSimulatorBackend:
+    """Test SimulatorBackend class"""
+
+    def test_pull_resistors_set_input_level(self):
+        """Test that pull-up inputs read HIGH and pull-down inputs read LOW"""
+        backend = SimulatorBackend()
+
+        backend.setup(4, "input", "pullup")
+        backend.setup(5, "input", "pulldown")
+
+        assert backend.read(4) == 1
+        assert backend.read(5) == 0
+
+    def test_pwm_level_follows_virtual_clock(self):
+        """Test that PWM output levels depend on the virtual clock"""
+        clock = VirtualClock()
+        backend = SimulatorBackend(clock)
+        backend.setup(18, "output")
+        backend.start_pwm(18, 1000, 25)  # 1ms period, HIGH for 250us
+
+        assert backend.read(18) == 1
+        clock.advance(0.0005)
+        assert backend.read(18) == 0
+
+    def test_pwm_group_phase_offset(self):
+        """Test that PWM group channels are shifted by their phase"""
+        clock = VirtualClock()
+        backend = SimulatorBackend(clock)
+        backend.start_pwm_group(1000, {17: (50, 0.0), 18: (50, 0.5)})
+
+        assert (backend.read(17), backend.read(18)) == (1, 0)
+        clock.advance(0.0006)
+        assert (backend.read(17), backend.read(18)) == (0, 1)
+
+    def test_edge_callbacks_respect_debounce(self):
+        """Test that edges inside the debounce window are suppressed"""
+        clock = VirtualClock()
+        backend = SimulatorBackend(clock)
+        backend.setup(4, "input")
+        edges = []
+        backend.watch(4, 5, lambda pin, level, tick: edges.append((level, tick)))
+
+        backend.set_input(4, 1)
+        clock.advance(0.001)
+        backend.set_input(4, 0)  # bounce, suppressed
+        clock.advance(0.010)
+        backend.set_input(4, 1)
+
+        assert edges == [(1, 0), (1, 11000)]
+
+
+class TestPwmWaveEdges:
+    """Test the PWM group waveform layout"""
+
+    def test_period_split_at_each_edge(self):
+        edges = pwm_wave_edges(1000, {17: (50, 0.0), 18: (50, 0.5), 27: (25, 0.9)})
+
+        assert edges == [
+            (1 << 17, 1 << 18, 150),
+            (0, 1 << 27, 350),
+            (1 << 18, 1 << 17, 400),
+            (1 << 27, 0, 100),
+        ]
+        assert sum(delay for _, _, delay in edges) == 1000
+
+    def test_constant_levels(self):
+        edges = pwm_wave_edges(500, {4: (0, 0.3), 5: (100, 0.3)})
+
+        assert edges == [(1 << 5, 1 << 4, 2000)]
@@ -11,7 +11,11 @@ sys.modules["RPi"] = MagicMock()
 sys.modules["RPi.GPIO"] = MagicMock()
 sys.modules["pigpio"] = MagicMock()
 
+from app import pigpio_connection
 from app.gpio_controller import GPIOController
+from app.gpio_backends import PigpioBackend, SimulatorBackend
+from app.pin_table import PinTable
+from tests.test_pigpio_pipeline import FakeDaemon
 
 
 class TestGPIOController:
@@ -29,12 +33,22 @@ class TestGPIOController:
                 controller = GPIOController(socketio)
                 yield controller
 
+    @pytest.fixture
+    def pi(self):
+        """A mocked pigpio connection"""
+        return MagicMock()
+
+    @pytest.fixture
+    def pigpio_controller(self, pi):
+        """Create a controller on the pigpio backend with a mocked connection"""
+        return GPIOController(MagicMock(), backend=PigpioBackend(MagicMock(), pi))
+
     def test_initialization(self, controller):
         """Test controller initialization"""
         assert controller is not None
         assert hasattr(controller, "pin_states")
         assert hasattr(controller, "pwm_instances")
-        assert isinstance(controller.pin_states, dict)
+        assert isinstance(controller.pin_states, PinTable)
         assert isinstance(controller.pwm_instances, dict)
 
     def test_setup_pin_output(self, controller):
@@ -175,3 +189,370 @@ class TestGPIOController:
         assert "gpio_initialized" in status
         assert "configured_pins" in status
         assert "active_pwm" in status
+
+    def test_apply_batch(self, controller):
+        """Test applying several pin operations in one batch"""
+        result = controller.apply_batch(
+            [
+                {"op": "setup", "pin": 17, "mode": "output"},
+                {"op": "write", "pin": 17, "value": 1},
+                {"op": "write", "pin": 27, "value": 1},
+                {"op": "toggle", "pin": 27},
+            ]
+        )
+
+        assert result["success"] is True
+        assert result["applied"] == 4
+        assert result["states"] == {17: 1, 27: 0}
+        assert controller.pin_states[27]["mode"] == "output"
+
+    def test_apply_batch_validates_before_applying(self, controller):
+        """Test that an invalid operation rejects the whole batch"""
+        result = controller.apply_batch(
+            [
+                {"op": "write", "pin": 17, "value": 1},
+                {"op": "pwm", "pin": 18, "frequency": 1000, "duty_cycle": 150},
+            ]
+        )
+
+        assert result["success"] is False
+        assert result["errors"][0]["index"] == 1
+        assert 17 not in controller.pin_states
+
+    def test_read_bank(self, pigpio_controller, pi):
+        """Test reading all bank 1 levels with one command"""
+        pi.read_bank_1.return_value = (1 << 17) | (1 << 22)
+        pigpio_controller.pin_states[17] = {"mode": "input", "state": 0, "pull": None}
+        pigpio_controller.pin_states[27] = {"mode": "input", "state": 1, "pull": None}
+
+        result = pigpio_controller.read_bank()
+
+        assert result["success"] is True
+        assert result["states"] == {17: 1, 27: 0}
+        pi.read_bank_1.assert_called_once()
+        pi.read.assert_not_called()
+
+    def test_write_mask(self, pigpio_controller, pi):
+        """Test driving several outputs with set/clear masks"""
+        result = pigpio_controller.write_mask(
+            set_mask=(1 << 5) | (1 << 6), clear_mask=1 << 13
+        )
+
+        assert result["success"] is True
+        assert result["states"] == {5: 1, 6: 1, 13: 0}
+        pi.set_bank_1.assert_called_once_with((1 << 5) | (1 << 6))
+        pi.clear_bank_1.assert_called_once_with(1 << 13)
+        pi.write.assert_not_called()
+
+    def test_write_mask_overlapping_bits(self, controller):
+        """Test that a pin cannot be both set and cleared"""
+        result = controller.write_mask(set_mask=0b11, clear_mask=0b10)
+
+        assert result["success"] is False
+        assert "error" in result
+
+    def test_watch_pin_emits_only_on_change(self, pigpio_controller, pi):
+        """Test that edge callbacks push events only when the level changes"""
+        pigpio_controller.pin_states[5] = {"mode": "input", "state": 0, "pull": "pullup"}
+
+        result = pigpio_controller.watch_pin(5, debounce_ms=20)
+
+        assert result["success"] is True
+        pi.set_glitch_filter.assert_called_once_with(5, 20000)
+        assert pi.callback.call_count == 1
+
+        on_edge = pi.callback.call_args[0][2]
+        pigpio_controller.socketio.emit.reset_mock()
+        on_edge(5, 1, 1000)
+        on_edge(5, 1, 2000)
+        on_edge(5, 2, 3000)  # watchdog timeout
+
+        assert pigpio_controller.socketio.emit.call_count == 1
+        assert pigpio_controller.pin_states[5]["state"] == 1
+
+    def test_unwatch_pin(self, pigpio_controller, pi):
+        """Test removing an edge callback"""
+        pigpio_controller.watch_pin(6)
+        handle = pigpio_controller.watched_pins[6]["handle"]
+
+        result = pigpio_controller.unwatch_pin(6)
+
+        assert result["success"] is True
+        handle.cancel.assert_called_once()
+        assert 6 not in pigpio_controller.watched_pins
+
+    def test_watch_pin_invalid_debounce(self, controller):
+        """Test watching with an out-of-range debounce"""
+        result = controller.watch_pin(5, debounce_ms=1000)
+
+        assert result["success"] is False
+
+    def test_apply_batch_maps_pigpio_errors(self, pigpio_controller, pi):
+        """Test that a failed pipelined command is reported for its operation"""
+        pi.write.side_effect = [0, Exception("bad level")]
+
+        result = pigpio_controller.apply_batch(
+            [
+                {"op": "write", "pin": 17, "value": 1},
+                {"op": "write", "pin": 27, "value": 1},
+            ]
+        )
+
+        assert result["success"] is False
+        assert result["applied"] == 1
+        assert result["errors"][0]["index"] == 1
+        assert result["errors"][0]["pin"] == 27
+        # The rejected write is undone and not reported
+        assert result["states"] == {17: 1}
+        assert pigpio_controller.pin_states.level(27) == 0
+
+    def test_apply_batch_undoes_failed_pwm(self, pigpio_controller, pi):
+        """Test that a PWM start rejected at flush time is forgotten"""
+        pi.hardware_PWM.side_effect = Exception("bad frequency")
+
+        result = pigpio_controller.apply_batch(
+            [
+                {"op": "write", "pin": 18, "value": 1},
+                {"op": "pwm", "pin": 18, "frequency": 1000, "duty_cycle": 50},
+            ]
+        )
+
+        assert result["applied"] == 1
+        assert result["errors"][0]["index"] == 1
+        # The earlier write went through, so pin 18 is still reported
+        assert result["states"] == {18: 1}
+        assert 18 not in pigpio_controller.pwm_instances
+        assert pigpio_controller.backend.pwm_allocator.engine(18) is None
+        assert pigpio_controller.pin_states.pwm_active(18) is False
+
+    def test_apply_batch_pipelines_writes(self):
+        """Test that batch writes reach the daemon in one pipelined burst"""
+        daemon = FakeDaemon([0] * 5)
+        pi = daemon.pi()
+        controller = GPIOController(MagicMock(), backend=PigpioBackend(MagicMock(), pi))
+
+        result = controller.apply_batch(
+            [{"op": "write", "pin": pin, "value": 1} for pin in range(20, 25)]
+        )
+        daemon.thread.join(timeout=1)
+
+        assert result["success"] is True
+        pi.write.assert_not_called()
+        assert [command[:3] for command in daemon.commands] == [
+            (4, pin, 1) for pin in range(20, 25)
+        ]
+
+    def test_pwm_group_on_pigpio_is_one_waveform(self, pigpio_controller, pi):
+        """Test that a PWM group starts all pins from a single waveform"""
+        pi.wave_create.side_effect = [3, 4]
+        pi.wave_tx_at.return_value = 4
+        channels = [
+            {"pin": 17, "duty_cycle": 50},
+            {"pin": 18, "duty_cycle": 50, "phase": 180},
+        ]
+
+        result = pigpio_controller.start_pwm_group("leds", 1000, channels)
+
+        assert result["success"] is True
+        assert result["engine"] == "pigpio_wave"
+        pi.wave_send_using_mode.assert_called_once()
+        assert pi.wave_send_using_mode.call_args[0][0] == 3
+        pi.hardware_PWM.assert_not_called()
+        assert pigpio_controller.get_pin_info(18)["pwm_info"]["group"] == "leds"
+
+        result = pigpio_controller.update_pwm_group(
+            "leds", channels=[{"pin": 18, "duty_cycle": 20}]
+        )
+
+        assert result["success"] is True
+        assert pi.wave_send_using_mode.call_args[0][0] == 4
+        pi.wave_delete.assert_called_once_with(3)
+        assert pigpio_controller.pwm_groups["leds"]["channels"][18] == {
+            "duty_cycle": 20,
+            "phase": 180,
+        }
+
+        assert pigpio_controller.stop_pwm_group("leds")["success"] is True
+        pi.wave_tx_stop.assert_called_once()
+        pi.clear_bank_1.assert_called_with((1 << 17) | (1 << 18))
+        assert pigpio_controller.pwm_instances == {}
+
+    def test_update_pwm_in_place(self, pigpio_controller, pi):
+        """Test that update_pwm reprograms hardware PWM without stopping it"""
+        pigpio_controller.start_pwm(18, 1000, 50)
+        pi.hardware_PWM.reset_mock()
+
+        result = pigpio_controller.update_pwm(18, duty_cycle=25)
+
+        assert result["success"] is True
+        assert result["frequency"] == 1000
+        pi.hardware_PWM.assert_called_once_with(18, 1000, 250000)
+        assert pigpio_controller.pwm_instances[18]["duty_cycle"] == 25
+
+        # Unchanged values make no hardware call
+        pigpio_controller.update_pwm(18, duty_cycle=25)
+        assert pi.hardware_PWM.call_count == 1
+
+        assert pigpio_controller.update_pwm(18, duty_cycle=150)["success"] is False
+        assert pigpio_controller.update_pwm(4, duty_cycle=10)["success"] is False
+
+    def test_pwm_engine_per_pin(self, pigpio_controller, pi):
+        """Test hardware PWM on PWM pins and DMA PWM everywhere else"""
+        pi.set_PWM_frequency.side_effect = lambda pin, frequency: frequency
+        assert pigpio_controller.start_pwm(18, 1000, 50)["engine"] == "hardware"
+        assert pigpio_controller.start_pwm(12, 1000, 50)["engine"] == "dma"
+        assert pigpio_controller.start_pwm(17, 800, 25)["engine"] == "dma"
+
+        pi.hardware_PWM.assert_called_once_with(18, 1000, 500000)
+        pi.set_PWM_frequency.assert_any_call(17, 800)
+        pi.set_PWM_dutycycle.assert_any_call(17, 2500)
+        assert pigpio_controller.get_pin_info(18)["pwm_engine"] == "hardware"
+        assert pigpio_controller.get_pin_info(17)["pwm_engine"] == "dma"
+
+        pigpio_controller.update_pwm(17, duty_cycle=75)
+        pi.set_PWM_dutycycle.assert_called_with(17, 7500)
+
+        pigpio_controller.stop_pwm(17)
+        pi.set_PWM_dutycycle.assert_called_with(17, 0)
+
+        # Releasing channel 0 lets GPIO 12 use hardware PWM
+        pigpio_controller.stop_pwm(18)
+        pigpio_controller.stop_pwm(12)
+        assert pigpio_controller.start_pwm(12, 1000, 50)["engine"] == "hardware"
+
+    def test_dma_pwm_reports_actual_frequency(self, pigpio_controller, pi):
+        """Test that DMA PWM records the frequency the daemon rounded to"""
+        pi.set_PWM_frequency.return_value = 8000
+
+        result = pigpio_controller.start_pwm(17, 7000, 50)
+        assert result["frequency"] == 8000
+        assert pigpio_controller.pwm_instances[17]["frequency"] == 8000
+
+        pi.set_PWM_frequency.return_value = 4000
+        result = pigpio_controller.update_pwm(17, frequency=3500)
+        assert result["frequency"] == 4000
+        assert pigpio_controller.pwm_instances[17]["frequency"] == 4000
+
+    def test_failed_pwm_start_releases_engine(self, pigpio_controller, pi):
+        """Test that a failed start gives the hardware channel back"""
+        pi.hardware_PWM.side_effect = [RuntimeError("bad frequency"), None]
+
+        assert pigpio_controller.start_pwm(18, 1000, 50)["success"] is False
+        assert pigpio_controller.backend.pwm_allocator.engine(18) is None
+        assert pigpio_controller.start_pwm(12, 1000, 50)["engine"] == "hardware"
+
+    def test_pwm_updates_coalesce(self, pigpio_controller, pi):
+        """Test that queued slider updates collapse to the latest values"""
+        pigpio_controller.start_pwm(18, 1000, 50)
+        pi.hardware_PWM.reset_mock()
+
+        for duty_cycle in (10, 20, 30):
+            pigpio_controller.request_pwm_update(18, duty_cycle=duty_cycle)
+        pigpio_controller.request_pwm_update(18, frequency=2000)
+
+        result = pigpio_controller.apply_pwm_update(18)
+        assert (result["frequency"], result["duty_cycle"]) == (2000, 30)
+        # Later queued calls find nothing left to apply
+        assert pigpio_controller.apply_pwm_update(18) is None
+        pi.hardware_PWM.assert_called_once_with(18, 2000, 300000)
+
+    def test_pwm_groups_share_one_wave_transmitter(self, pigpio_controller, pi):
+        """Test that a second waveform group or a busy transmitter is refused"""
+        pi.wave_create.return_value = 3
+        manager = pigpio_connection.get_manager()
+
+        assert pigpio_controller.start_pwm_group(
+            "a", 1000, [{"pin": 17, "duty_cycle": 50}]
+        )["success"] is True
+        result = pigpio_controller.start_pwm_group(
+            "b", 1000, [{"pin": 22, "duty_cycle": 50}]
+        )
+        assert result["success"] is False
+        assert pi.wave_send_using_mode.call_count == 1
+        assert list(pigpio_controller.pwm_groups) == ["a"]
+        # Restarting the same group is still allowed
+        assert pigpio_controller.start_pwm_group(
+            "a", 500, [{"pin": 17, "duty_cycle": 20}]
+        )["success"] is True
+
+        pigpio_controller.stop_pwm_group("a")
+        assert manager.wave_owner() is None
+
+        # A servo waveform holds the transmitter
+        assert manager.claim_wave("servo-18") is True
+        try:
+            result = pigpio_controller.start_pwm_group(
+                "b", 1000, [{"pin": 22, "duty_cycle": 50}]
+            )
+            assert result["success"] is False
+            assert "servo-18" in result["error"]
+        finally:
+            manager.release_wave("servo-18")
+
+    def test_pwm_group_validation(self):
+        """Test invalid PWM groups are rejected before touching pins"""
+        controller = GPIOController(MagicMock(), backend=SimulatorBackend())
+
+        bad_phase = [{"pin": 17, "duty_cycle": 50, "phase": 400}]
+        duplicate = [{"pin": 17, "duty_cycle": 50}, {"pin": 17, "duty_cycle": 20}]
+        assert controller.start_pwm_group("a", 1000, bad_phase)["success"] is False
+        assert controller.start_pwm_group("a", 1000, duplicate)["success"] is False
+        assert controller.start_pwm_group("", 1000, duplicate[:1])["success"] is False
+        assert controller.pwm_groups == {}
+
+        controller.start_pwm_group("a", 1000, [{"pin": 17, "duty_cycle": 50}])
+        # Group pins are managed through the group only
+        assert controller.stop_pwm(17)["success"] is False
+        assert controller.start_pwm(17, 500, 10)["success"] is False
+        other = controller.start_pwm_group("b", 1000, [{"pin": 17, "duty_cycle": 5}])
+        assert other["success"] is False
+        result = controller.update_pwm_group("a", channels=[{"pin": 4}])
+        assert result["success"] is False
+
+        # Batch and bank writes must not touch group pins either
+        batch = controller.apply_batch([{"op": "pwm", "pin": 17, "duty_cycle": 10}])
+        assert batch["success"] is False
+        batch = controller.apply_batch([{"op": "write", "pin": 17, "value": 1}])
+        assert batch["success"] is False
+        assert controller.write_mask(set_mask=1 << 17)["success"] is False
+        assert controller.pwm_groups["a"]["channels"][17]["duty_cycle"] == 50
+
+        controller.reset_all_pins()
+        assert controller.pwm_groups == {}
+
+    def test_read_all_pins_broadcasts_only_changes(self):
+        """Test that reading all pins pushes a delta of changed levels"""
+        backend = SimulatorBackend()
+        controller = GPIOController(MagicMock(), backend=backend)
+        controller.setup_pin(4, "input", "pulldown")
+        controller.setup_pin(5, "input", "pulldown")
+        controller.socketio.emit.reset_mock()
+
+        controller.read_all_pins()
+        controller.socketio.emit.assert_not_called()
+
+        backend.set_input(5, 1)
+        controller.read_all_pins()
+        controller.socketio.emit.assert_called_once_with(
+            "pins_changed",
+            {5: {"state": 1, "mode": "input", "pull": "pulldown"}},
+            to="pins:all",
+        )
+
+    def test_simulator_backend_end_to_end(self):
+        """Test the full controller flow on the in-memory simulator"""
+        backend = SimulatorBackend()
+        controller = GPIOController(MagicMock(), backend=backend)
+
+        controller.setup_pin(4, "input", "pullup")
+        controller.watch_pin(4, debounce_ms=0)
+        controller.socketio.emit.reset_mock()
+        backend.set_input(4, 0)
+        controller.write_pin(17, 1)
+
+        assert controller.read_pin(4)["state"] == 0
+        assert backend.levels[17] == 1
+        assert controller.read_all_pins()["states"][17]["state"] == 1
+        # One edge event for pin 4 and one write event for pin 17
+        assert controller.socketio.emit.call_count >= 2
+        assert controller.get_system_status()["backend"]["backend"] == "simulator"
@@ -0,0 +1,66 @@
+"""
+Test the hardware call executor
+"""
+
+import threading
+import time
+
+import pytest
+
+from app.hardware_executor import HardwareExecutor
+
+
+class TestHardwareExecutor:
+    """Test HardwareExecutor"""
+
+    def test_inline_call_returns_result(self):
+        executor = HardwareExecutor("inline")
+
+        assert executor.call("gpio", lambda a, b=0: a + b, 1, b=2) == 3
+        assert executor.get_status()["calls"] == 1
+        assert executor.get_status()["lanes"] == ["gpio"]
+
+    def test_exceptions_propagate(self):
+        executor = HardwareExecutor("inline")
+
+        def fail():
+            raise RuntimeError("bus error")
+
+        with pytest.raises(RuntimeError, match="bus error"):
+            executor.call("gpio", fail)
+
+    def test_tpool_runs_in_native_thread(self):
+        pytest.importorskip("eventlet")
+        executor = HardwareExecutor("tpool")
+
+        worker = executor.call("servo", threading.get_ident)
+
+        assert worker != threading.get_ident()
+
+    def test_calls_on_one_lane_do_not_overlap(self):
+        executor = HardwareExecutor("inline")
+        active = []
+        overlaps = []
+
+        def work():
+            active.append(1)
+            if len(active) > 1:
+                overlaps.append(len(active))
+            time.sleep(0.01)
+            active.pop()
+
+        threads = [
+            threading.Thread(target=executor.call, args=("gpio", work))
+            for _ in range(4)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert overlaps == []
+        assert executor.get_status()["calls"] == 4
+
+    def test_invalid_mode(self):
+        with pytest.raises(ValueError):
+            HardwareExecutor("threads")
@@ -0,0 +1,80 @@
+"""
+Test shared pigpio connection manager
+"""
+
+import pytest
+from unittest.mock import MagicMock, patch
+
+from app.pigpio_connection import PigpioConnectionManager
+
+
+class TestPigpioConnectionManager:
+    """Test PigpioConnectionManager class"""
+
+    @pytest.fixture
+    def pigpio_mock(self):
+        """Patch pigpio so every pi() call returns a new connected mock"""
+        with patch("app.pigpio_connection.PIGPIO_AVAILABLE", True):
+            with patch("app.pigpio_connection.pigpio") as mock:
+                mock.pi.side_effect = lambda: MagicMock(connected=True)
+                yield mock
+
+    def test_handles_share_one_connection(self, pigpio_mock):
+        """Test that several consumers share a single daemon connection"""
+        manager = PigpioConnectionManager()
+
+        first = manager.acquire()
+        second = manager.acquire()
+        first.write(17, 1)
+        second.write(18, 0)
+
+        assert pigpio_mock.pi.call_count == 1
+        assert manager.get_status()["users"] == 2
+        assert manager.connection().write.call_count == 2
+
+    def test_last_release_closes_connection(self, pigpio_mock):
+        """Test that stop() on a handle only closes after the last user"""
+        manager = PigpioConnectionManager()
+        first = manager.acquire()
+        second = manager.acquire()
+        pi = manager.connection()
+
+        first.stop()
+        first.stop()  # Releasing twice is a no-op
+        pi.stop.assert_not_called()
+
+        second.stop()
+        pi.stop.assert_called_once()
+        assert manager.get_status()["connected"] is False
+
+    def test_reconnects_after_failed_health_check(self, pigpio_mock):
+        """Test automatic reconnect when the daemon stops responding"""
+        manager = PigpioConnectionManager(health_check_interval=0)
+        handle = manager.acquire()
+        broken = manager.connection()
+        broken.get_current_tick.side_effect = ConnectionError("socket closed")
+
+        handle.write(17, 1)
+
+        assert manager.connection() is not broken
+        assert manager.get_status()["reconnects"] == 1
+
+    def test_daemon_not_running(self, pigpio_mock):
+        """Test that acquire returns None without a daemon"""
+        pigpio_mock.pi.side_effect = lambda: MagicMock(connected=False)
+        manager = PigpioConnectionManager()
+
+        assert manager.acquire() is None
+
+    def test_wave_transmitter_has_one_owner(self):
+        """Test that the wave transmitter is claimed by one user at a time"""
+        manager = PigpioConnectionManager()
+
+        assert manager.claim_wave("pwm_group") is True
+        assert manager.claim_wave("pwm_group") is True
+        assert manager.claim_wave("servo-18") is False
+        manager.release_wave("servo-18")  # Not the owner: no effect
+        assert manager.wave_owner() == "pwm_group"
+
+        manager.release_wave("pwm_group")
+        assert manager.claim_wave("servo-18") is True
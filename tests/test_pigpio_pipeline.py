@@ -0,0 +1,91 @@
+"""
+Test pipelined pigpio command execution
+"""
+
+import socket
+import struct
+import threading
+
+import pytest
+from unittest.mock import MagicMock, patch
+
+from app.pigpio_pipeline import CommandPipeline
+
+
+class FakeDaemon:
+    """Minimal pigpiod stand-in answering commands over a socket pair"""
+
+    def __init__(self, results):
+        self.results = list(results)
+        self.commands = []
+        self.client, self.server = socket.socketpair()
+        self.thread = threading.Thread(target=self._serve, daemon=True)
+        self.thread.start()
+
+    def _serve(self):
+        for result in self.results:
+            header = b""
+            while len(header) < 16:
+                header += self.server.recv(16 - len(header))
+            cmd, p1, p2, p3 = struct.unpack("IIII", header)
+            ext = self.server.recv(p3) if p3 else b""
+            self.commands.append((cmd, p1, p2, ext))
+            self.server.sendall(struct.pack("IIIi", cmd, p1, p2, result))
+
+    def pi(self):
+        pi = MagicMock()
+        pi.sl.s = self.client
+        pi.sl.l = threading.Lock()
+        return pi
+
+
+class TestCommandPipeline:
+    """Test CommandPipeline class"""
+
+    def test_pipelined_commands_map_results(self):
+        """Test that replies are mapped back to queued commands in order"""
+        daemon = FakeDaemon([0, 0, -41])
+        pipeline = CommandPipeline(daemon.pi())
+
+        pipeline.write(17, 1, tag="a")
+        pipeline.set_servo_pulsewidth(18, 1500, tag="b")
+        pipeline.hardware_PWM(19, 1000, 500000, tag="c")
+        with patch("app.pigpio_pipeline.pigpio") as pigpio_mock:
+            pigpio_mock.error_text.return_value = "bad PWM duty"
+            results = pipeline.flush()
+        daemon.thread.join(timeout=1)
+
+        assert [r["tag"] for r in results] == ["a", "b", "c"]
+        assert results[0]["error"] is None
+        assert results[2]["error"] == "bad PWM duty"
+        assert daemon.commands[0][:3] == (4, 17, 1)
+        assert daemon.commands[1][:3] == (8, 18, 1500)
+        assert daemon.commands[2] == (86, 19, 1000, struct.pack("I", 500000))
+        assert len(pipeline) == 0
+
+    def test_fallback_without_raw_socket(self):
+        """Test that commands are replayed through the pigpio API on mocks"""
+        pi = MagicMock()
+        pi.write.side_effect = [0, RuntimeError("GPIO not output")]
+        pipeline = CommandPipeline(pi)
+        pipeline.tag = 7
+
+        pipeline.write(17, 1)
+        pipeline.write(18, 1)
+        results = pipeline.flush()
+
+        assert pi.write.call_count == 2
+        assert results[0]["error"] is None
+        assert results[1]["error"] == "GPIO not output"
+        assert results[1]["tag"] == 7
+
+    def test_context_manager_flushes(self):
+        """Test that leaving the with-block flushes queued commands"""
+        pi = MagicMock()
+
+        with CommandPipeline(pi) as pipeline:
+            pipeline.set_bank_1(0b110)
+            pipeline.clear_bank_1(0b001)
+
+        pi.set_bank_1.assert_called_once_with(0b110)
+        pi.clear_bank_1.assert_called_once_with(0b001)
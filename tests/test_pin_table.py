@@ -0,0 +1,70 @@
+"""
+Test the array-backed pin state table
+"""
+
+import pytest
+
+from app.pin_table import PinTable
+
+
+class TestPinTable:
+    """Test PinTable"""
+
+    def test_configure_and_mapping_view(self):
+        table = PinTable()
+        table.configure(17, "output", 1)
+        table[4] = {"mode": "input", "state": 0, "pull": "pullup"}
+
+        assert len(table) == 2
+        assert list(table) == [4, 17]
+        assert 17 in table and 5 not in table
+        assert table[17] == {"mode": "output", "state": 1, "pull": None}
+        assert table[4]["pull"] == "pullup"
+        assert table.is_output(17) and table.is_input(4)
+        assert not table.is_output(5)
+        with pytest.raises(KeyError):
+            table[5]
+
+    def test_returned_dicts_are_copies(self):
+        table = PinTable()
+        table.configure(17, "output", 0)
+        table[17]["state"] = 1
+        assert table.level(17) == 0
+        table.set_level(17, 1)
+        assert table[17]["state"] == 1
+
+    def test_levels_from_mask_only_touch_configured_pins(self):
+        table = PinTable()
+        table.configure(3, "input")
+        table.configure(40, "input")
+        table.set_levels_from_mask((1 << 3) | (1 << 5) | (1 << 40), limit=32)
+        assert table.level(3) == 1
+        assert table.level(5) == 0
+        assert table.level(40) == 0
+        assert 5 not in table
+
+    def test_snapshot_is_immutable_copy(self):
+        table = PinTable()
+        table.configure(22, "output", 1)
+        table.set_pwm(22, True)
+        snapshot = table.snapshot()
+        table.set_level(22, 0)
+        del table[22]
+
+        assert snapshot.to_dict() == {22: {"state": 1, "mode": "output", "pull": None}}
+        assert snapshot.to_debug_dict() == {
+            "22": {"mode": "output", "state": 1, "pull_up_down": None}
+        }
+        assert snapshot.pwm[22] == 1
+        assert 22 not in table and not table.pwm_active(22)
+
+    def test_clear_and_bounds(self):
+        table = PinTable()
+        table.configure(0, "output")
+        table.configure(PinTable.SIZE - 1, "input")
+        assert list(table.pins()) == [0, PinTable.SIZE - 1]
+        table.clear()
+        assert len(table) == 0 and table.snapshot().configured == 0
+        with pytest.raises(ValueError):
+            table.configure(PinTable.SIZE, "output")
+        assert not table.is_configured(-1)
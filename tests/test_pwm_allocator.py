@@ -0,0 +1,54 @@
+"""
+Test PWM engine allocation
+"""
+
+import pytest
+
+from app.pwm_allocator import (
+    ENGINE_DMA,
+    ENGINE_HARDWARE,
+    ENGINE_SOFTWARE,
+    PWMAllocator,
+)
+
+
+class TestPWMAllocator:
+    """Test PWMAllocator class"""
+
+    def test_hardware_only_on_pwm_pins(self):
+        """Test that hardware PWM is limited to GPIO 12/13/18/19"""
+        allocator = PWMAllocator((ENGINE_HARDWARE, ENGINE_DMA))
+
+        assert allocator.allocate(18) == ENGINE_HARDWARE
+        assert allocator.allocate(13) == ENGINE_HARDWARE
+        assert allocator.allocate(17) == ENGINE_DMA
+
+    def test_channel_serves_one_pin(self):
+        """Test that the second pin of a channel falls back to DMA"""
+        allocator = PWMAllocator((ENGINE_HARDWARE, ENGINE_DMA))
+
+        assert allocator.allocate(18) == ENGINE_HARDWARE
+        assert allocator.allocate(12) == ENGINE_DMA
+        # Re-allocating keeps the pin's engine
+        assert allocator.allocate(18) == ENGINE_HARDWARE
+
+        allocator.release(18)
+        allocator.release(12)
+        assert allocator.allocate(12) == ENGINE_HARDWARE
+        assert allocator.get_status()["hardware_channels"] == {0: 12}
+
+    def test_software_is_last_resort(self):
+        """Test the fallback when only software PWM is available"""
+        allocator = PWMAllocator((ENGINE_SOFTWARE,))
+
+        assert allocator.allocate(18) == ENGINE_SOFTWARE
+        assert allocator.engine(18) == ENGINE_SOFTWARE
+        allocator.release(18)
+        assert allocator.engine(18) is None
+
+    def test_no_engine(self):
+        """Test errors for unknown or missing engines"""
+        with pytest.raises(ValueError):
+            PWMAllocator(("laser",))
+        with pytest.raises(RuntimeError):
+            PWMAllocator(()).allocate(18)
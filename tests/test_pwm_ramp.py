@@ -0,0 +1,159 @@
+"""
+Test server-side PWM ramps
+"""
+
+import threading
+from unittest.mock import MagicMock
+
+import pytest
+
+from app.gpio_backends import SimulatorBackend
+from app.gpio_controller import GPIOController
+from app.pwm_ramp import PwmRamp
+from app.scheduler import PeriodicScheduler
+
+
+class FakeClock:
+    """Manually advanced monotonic clock"""
+
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestPwmRamp:
+    """Test PwmRamp"""
+
+    def test_linear_fade(self):
+        ramp = PwmRamp(0, 100, 2.0)
+
+        assert ramp.duty_at(0) == (0, False)
+        assert ramp.duty_at(0.5) == (25, False)
+        assert ramp.duty_at(2.0) == (100, True)
+        assert ramp.progress(1.0) == {"cycle": 0, "progress": 0.5}
+
+    def test_easing(self):
+        ramp = PwmRamp(0, 100, 1.0, easing="ease_in")
+
+        assert ramp.duty_at(0.5)[0] == pytest.approx(25)
+        assert PwmRamp(0, 100, 1.0, "ease_in_out").duty_at(0.5)[0] == pytest.approx(50)
+
+    def test_alternate_repeat(self):
+        ramp = PwmRamp(10, 90, 1.0, repeat=1, alternate=True)
+
+        assert ramp.duty_at(0.25)[0] == pytest.approx(30)
+        # Second cycle runs backwards and ends where the first started
+        assert ramp.duty_at(1.25)[0] == pytest.approx(70)
+        assert ramp.duty_at(2.0) == (10, True)
+
+    def test_repeat_forever(self):
+        ramp = PwmRamp(0, 100, 1.0, repeat=-1)
+
+        assert ramp.cycles is None
+        assert ramp.duty_at(1000.5) == (50, False)
+
+    @pytest.mark.parametrize(
+        "args",
+        [
+            (0, 150, 1.0),
+            (0, 100, 0),
+            (0, 100, 1.0, "bounce"),
+            (0, 100, 1.0, "linear", -2),
+        ],
+    )
+    def test_invalid(self, args):
+        with pytest.raises(ValueError):
+            PwmRamp(*args)
+
+
+class TestControllerRamp:
+    """Test ramps played back by GPIOController"""
+
+    @pytest.fixture
+    def clock(self):
+        return FakeClock()
+
+    @pytest.fixture
+    def scheduler(self, clock):
+        return PeriodicScheduler(clock=clock, autostart=False)
+
+    @pytest.fixture
+    def backend(self):
+        return SimulatorBackend()
+
+    @pytest.fixture
+    def controller(self, backend, scheduler):
+        controller = GPIOController(MagicMock(), backend=backend, scheduler=scheduler)
+        controller.broadcaster = MagicMock()
+        return controller
+
+    def run_for(self, scheduler, clock, seconds):
+        end = clock.now + seconds
+        while clock.now < end - 1e-9:
+            clock.now += GPIOController.RAMP_INTERVAL
+            scheduler.run_pending()
+
+    def test_fade_runs_on_server(self, controller, backend, scheduler, clock):
+        result = controller.start_pwm_ramp(18, 80, 1.0, start_duty=0)
+
+        assert result["success"] is True
+        assert backend.pwm[18]["duty_cycle"] == 0
+
+        self.run_for(scheduler, clock, 0.5)
+        assert backend.pwm[18]["duty_cycle"] == pytest.approx(40)
+        assert controller.get_pin_info(18)["pwm_ramp"]["progress"] == 0.5
+
+        self.run_for(scheduler, clock, 0.6)
+        assert backend.pwm[18]["duty_cycle"] == 80
+        assert controller.pwm_ramps == {}
+        assert scheduler.get_status()["tasks"] == []
+
+        # Progress goes out at the low rate, not on every update
+        published = controller.broadcaster.publish.call_args_list
+        assert 4 <= len(published) <= 6
+        assert published[-1].args[0][18]["ramp"] is None
+
+    def test_direct_update_ends_ramp(self, controller, backend, scheduler, clock):
+        controller.start_pwm(18, 1000, 50)
+        controller.start_pwm_ramp(18, 0, 1.0, repeat=-1)
+        self.run_for(scheduler, clock, 0.2)
+
+        controller.update_pwm(18, duty_cycle=70)
+        self.run_for(scheduler, clock, 0.2)
+
+        assert backend.pwm[18]["duty_cycle"] == 70
+        assert controller.pwm_ramps == {}
+
+    def test_ramp_tick_waits_for_pwm_calls(self, controller, backend, scheduler, clock):
+        controller.start_pwm_ramp(18, 100, 1.0, start_duty=0)
+        clock.now += 0.5
+
+        # A PWM call on the gpio lane holds the lock; the tick must wait
+        with controller._pwm_lock:
+            tick = threading.Thread(target=scheduler.run_pending)
+            tick.start()
+            tick.join(timeout=0.1)
+            assert tick.is_alive()
+            assert backend.pwm[18]["duty_cycle"] == 0
+        tick.join(timeout=1)
+
+        assert backend.pwm[18]["duty_cycle"] == pytest.approx(50)
+
+    def test_stop_ramp_keeps_duty(self, controller, backend, scheduler, clock):
+        controller.start_pwm_ramp(18, 100, 1.0, start_duty=0)
+        self.run_for(scheduler, clock, 0.3)
+
+        result = controller.stop_pwm_ramp(18)
+
+        assert result["success"] is True
+        assert result["duty_cycle"] == pytest.approx(30)
+        assert 18 in controller.pwm_instances
+        assert controller.stop_pwm_ramp(18)["success"] is False
+
+    def test_invalid_ramp_does_not_start_pwm(self, controller):
+        result = controller.start_pwm_ramp(18, 100, -1)
+
+        assert result["success"] is False
+        assert controller.pwm_instances == {}
@@ -0,0 +1,97 @@
+"""
+Test the periodic deadline scheduler
+"""
+
+import threading
+import time
+
+import pytest
+
+from app.scheduler import PeriodicScheduler
+
+
+class FakeClock:
+    """Manually advanced monotonic clock"""
+
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestPeriodicScheduler:
+    """Test PeriodicScheduler"""
+
+    @pytest.fixture
+    def clock(self):
+        return FakeClock()
+
+    @pytest.fixture
+    def scheduler(self, clock):
+        return PeriodicScheduler(clock=clock, autostart=False)
+
+    def test_runs_on_absolute_deadlines(self, scheduler, clock):
+        runs = []
+
+        def work():
+            runs.append(clock.now)
+            # Slow task body must not push the next deadline back
+            clock.now += 0.004
+
+        scheduler.schedule(0.01, work)
+        for i in range(1, 6):
+            clock.now = 100.0 + 0.01 * i
+            scheduler.run_pending()
+
+        assert runs == pytest.approx([100.01, 100.02, 100.03, 100.04, 100.05])
+
+    def test_overrun_skips_missed_deadlines(self, scheduler, clock):
+        task = scheduler.schedule(0.01, lambda: None)
+
+        clock.now += 0.035  # deadlines at .01, .02, .03 have all passed
+        assert scheduler.run_pending() == 1
+        assert task.overruns == 2
+        assert task.next_deadline == pytest.approx(100.04)
+        assert task.max_jitter == pytest.approx(0.025)
+
+    def test_returning_false_stops_task(self, scheduler, clock):
+        calls = []
+        task = scheduler.schedule(0.01, lambda: calls.append(1) or len(calls) < 2)
+
+        for _ in range(4):
+            clock.now += 0.01
+            scheduler.run_pending()
+
+        assert len(calls) == 2
+        assert task.cancelled
+        assert scheduler.get_status()["tasks"] == []
+
+    def test_cancel_and_delay(self, scheduler, clock):
+        calls = []
+        task = scheduler.schedule(1.0, lambda: calls.append(1), delay=0)
+
+        assert scheduler.run_pending() == 1
+        task.cancel()
+        clock.now += 5
+        assert scheduler.run_pending() == 0
+        assert calls == [1]
+
+    def test_tasks_share_one_thread(self):
+        scheduler = PeriodicScheduler()
+        threads = set()
+
+        def work():
+            threads.add(threading.get_ident())
+
+        tasks = [scheduler.schedule(0.002, work, name=f"t{i}") for i in range(3)]
+        time.sleep(0.05)
+        for task in tasks:
+            task.cancel()
+
+        assert threads == {scheduler.thread.ident}
+        assert all(task.runs > 5 for task in tasks)
+
+    def test_invalid_interval(self, scheduler):
+        with pytest.raises(ValueError):
+            scheduler.schedule(0, lambda: None)
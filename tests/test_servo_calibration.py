@@ -0,0 +1,72 @@
+"""
+Test servo angle/pulse calibration tables
+"""
+
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from app.demos.servo_calibration import ServoCalibration
+from app.demos.sg90_servo import SG90Servo
+
+
+class TestServoCalibration:
+    """Test ServoCalibration"""
+
+    def test_default_is_linear(self):
+        calibration = ServoCalibration()
+
+        assert calibration.pulse_width(0) == 500
+        assert calibration.pulse_width(90) == 1500
+        assert calibration.pulse_width(180) == 2500
+        assert calibration.pulse_width(45.04) == 1000
+        assert calibration.angle(1500) == 90
+
+    def test_piecewise_points(self):
+        calibration = ServoCalibration([(0, 600), (90, 1400), (180, 2400)])
+
+        assert calibration.pulse_width(45) == 1000
+        assert calibration.pulse_width(135) == 1900
+        assert calibration.angle(1900) == 135
+        assert calibration.angle(1000) == 45
+
+    def test_clamps_out_of_range(self):
+        calibration = ServoCalibration([(10, 700), (170, 2300)])
+
+        assert calibration.pulse_width(-20) == calibration.pulse_width(0)
+        assert calibration.pulse_width(500) == calibration.pulse_width(180)
+        # Extrapolated past the outer points, within the pulse limits
+        assert calibration.pulse_width(0) == 600
+        assert calibration.pulse_width(180) == 2400
+
+    def test_reversed_servo(self):
+        calibration = ServoCalibration([(0, 2500), (180, 500)])
+
+        assert calibration.pulse_width(0) == 2500
+        assert calibration.pulse_width(45) == 2000
+        assert calibration.angle(2000) == 45
+
+    @pytest.mark.parametrize(
+        "points",
+        [
+            [(0, 500)],
+            [(90, 500), (0, 1500)],
+            [(0, 500), (90, 1500), (180, 1200)],
+            [(0, 100), (180, 2500)],
+        ],
+    )
+    def test_invalid_points(self, points):
+        with pytest.raises(ValueError):
+            ServoCalibration(points)
+
+    def test_servo_uses_calibration(self):
+        pi = MagicMock()
+        with patch("app.demos.sg90_servo.pigpio_connection.acquire", return_value=pi):
+            servo = SG90Servo(pin=18, calibration=[[0, 600], [180, 2400]])
+        servo.enabled = True
+
+        servo.set_angle(90)
+
+        pi.set_servo_pulsewidth.assert_called_with(18, 1500)
+        assert servo.get_status()["calibration"] == [[0, 600], [180, 2400]]
+        servo.cleanup()
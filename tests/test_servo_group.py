@@ -0,0 +1,124 @@
+"""
+Test synchronized multi-servo moves
+"""
+
+import time
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from app.demos.servo_group import ServoGroup
+from app.demos.servo_trajectory import MotionLimits
+from app.demos.sg90_servo import SG90Servo
+from config import parse_servo_pins
+
+
+def wait_until(condition, timeout=2.0):
+    """Poll until condition() is true or the timeout expires"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.005)
+    return condition()
+
+
+class TestServoGroup:
+    """Test ServoGroup"""
+
+    @pytest.fixture
+    def pi(self):
+        return MagicMock()
+
+    @pytest.fixture
+    def group(self, pi):
+        group = ServoGroup()
+        group.TICK_INTERVAL = 0.005
+        with patch("app.demos.sg90_servo.pigpio_connection.acquire", return_value=pi):
+            for name, pin in (("base", 17), ("shoulder", 18), ("elbow", 27)):
+                servo = group.add(name, SG90Servo(pin=pin))
+                servo.TICK_INTERVAL = 0.005
+                servo.enabled = True
+        group.get("base").limits = MotionLimits(2000.0, 40000.0)
+        group.get("shoulder").limits = MotionLimits(1000.0, 20000.0)
+        group.get("elbow").limits = MotionLimits(4000.0, 80000.0)
+        yield group
+        group.cleanup()
+
+    def pulses(self, pi, pin):
+        return [
+            call.args[1]
+            for call in pi.set_servo_pulsewidth.call_args_list
+            if call.args[0] == pin
+        ]
+
+    def test_register_rejects_duplicates(self, group, pi):
+        with patch("app.demos.sg90_servo.pigpio_connection.acquire", return_value=pi):
+            with pytest.raises(ValueError):
+                group.add("base", SG90Servo(pin=5))
+            with pytest.raises(ValueError):
+                group.add("wrist", SG90Servo(pin=17))
+
+        assert group.names() == ["base", "shoulder", "elbow"]
+
+    def test_pose_arrives_together(self, group, pi):
+        result = group.move_to_pose({"base": 0, "shoulder": 180, "elbow": 100})
+
+        assert result["success"] is True
+        assert result["moving"] is True
+        assert wait_until(lambda: not group.get_status()["moving"])
+        assert group.get_status()["pose"] == {"base": 0, "shoulder": 180, "elbow": 100}
+
+        # Stretched to the slowest servo: every servo is updated on the same
+        # number of ticks, so all of them reach the pose on the same tick
+        ticks = {
+            sum(servo.get_status()["pulse_writes"].values())
+            for servo in group.servos.values()
+        }
+        assert len(ticks) == 1
+        assert ticks.pop() > 2
+        assert self.pulses(pi, 17)[-1] == 500
+        assert self.pulses(pi, 18)[-1] == 2500
+
+    def test_pose_respects_requested_duration(self, group):
+        result = group.move_to_pose({"base": 100}, duration=0.1)
+
+        assert result["duration"] == pytest.approx(0.1)
+        assert group.get("base").get_status()["moving"] is True
+        assert group.get("shoulder").get_status()["moving"] is False
+
+    def test_pose_validation(self, group):
+        assert group.move_to_pose({})["success"] is False
+        assert group.move_to_pose({"wrist": 90})["success"] is False
+        assert group.move_to_pose({"base": "left"})["success"] is False
+        for duration in ("abc", float("inf"), -1, 0, True):
+            result = group.move_to_pose({"base": 90}, duration=duration)
+            assert "Invalid duration" in result["error"]
+
+        group.get("elbow").enabled = False
+        assert "elbow" in group.move_to_pose({"elbow": 10})["error"]
+
+    def test_single_command_overrides_group_move(self, group, pi):
+        group.get("base").limits = MotionLimits(100.0, 1000.0)
+        group.move_to_pose({"base": 180, "shoulder": 0})
+        group.get("base").set_angle(45)
+
+        assert wait_until(lambda: not group.get_status()["moving"])
+        assert group.get("base").current_angle == 45
+        assert group.get("shoulder").current_angle == 0
+
+    def test_stop_holds_position(self, group):
+        group.get("base").limits = MotionLimits(50.0, 500.0)
+        group.move_to_pose({"base": 180})
+        group.stop()
+        stopped_at = group.get("base").current_angle
+        time.sleep(0.03)
+
+        assert group.get_status()["moving"] is False
+        assert group.get("base").current_angle == stopped_at
+        assert group.get("base").target_angle == stopped_at
+
+
+def test_parse_servo_pins():
+    assert parse_servo_pins("base:17, shoulder:18,") == {"base": 17, "shoulder": 18}
+    assert parse_servo_pins("") == {}
@@ -0,0 +1,111 @@
+"""
+Test pushed servo status deltas
+"""
+
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from app.demos.servo_status import ServoStatusPublisher
+from app.demos.sg90_servo import SG90Servo
+
+
+def make_socketio():
+    """A socketio mock whose background tasks are collected, not started"""
+    socketio = MagicMock()
+    socketio.tasks = []
+    socketio.start_background_task.side_effect = socketio.tasks.append
+    return socketio
+
+
+class TestServoStatusPublisher:
+    """Test ServoStatusPublisher"""
+
+    @pytest.fixture
+    def servo(self):
+        with patch(
+            "app.demos.sg90_servo.pigpio_connection.acquire", return_value=MagicMock()
+        ):
+            servo = SG90Servo(pin=18)
+        servo.enabled = True
+        yield servo
+        servo.cleanup()
+
+    def sent(self, socketio):
+        return [call.args[1] for call in socketio.emit.call_args_list]
+
+    def test_first_push_is_full_then_deltas(self, servo):
+        socketio = make_socketio()
+        publisher = ServoStatusPublisher(socketio, interval_ms=0)
+        publisher.watch("main", servo)
+
+        publisher.notify("main")
+        servo.set_angle(60)
+
+        first, second = self.sent(socketio)
+        assert first["name"] == "main"
+        assert first["current_angle"] == 90
+        assert "enabled" in first and "pulse_writes" not in first
+        assert set(second) == {
+            "name",
+            "current_angle",
+            "target_angle",
+            "pulse_width",
+            "duty_cycle",
+            "version",
+            "timestamp",
+        }
+        assert second["version"] > first["version"]
+        socketio.emit.assert_called_with("servo_status", second, to="servo:status")
+
+    def test_no_push_without_change(self, servo):
+        socketio = make_socketio()
+        publisher = ServoStatusPublisher(socketio, interval_ms=0)
+        publisher.watch("main", servo)
+
+        servo.set_angle(90)
+        servo.set_angle(90)
+
+        assert len(self.sent(socketio)) == 1
+
+    def test_interval_coalesces_changes(self, servo):
+        socketio = make_socketio()
+        publisher = ServoStatusPublisher(socketio, interval_ms=100)
+        publisher.watch("main", servo)
+        # Run a single interval of the push loop
+        socketio.sleep.side_effect = lambda seconds: publisher.stop()
+
+        for angle in (10, 20, 30, 40):
+            servo.set_angle(angle)
+
+        assert len(socketio.tasks) == 1
+        socketio.emit.assert_not_called()
+
+        socketio.tasks[0]()
+
+        (status,) = self.sent(socketio)
+        assert status["current_angle"] == 40
+
+    def test_unchanged_version_is_not_rebuilt(self, servo):
+        socketio = make_socketio()
+        publisher = ServoStatusPublisher(socketio, interval_ms=0)
+        publisher.watch("main", servo)
+        publisher.notify("main")
+
+        with patch.object(servo, "get_status", wraps=servo.get_status) as get_status:
+            publisher.notify("main")
+
+        get_status.assert_not_called()
+        assert len(self.sent(socketio)) == 1
+
+    def test_scanning_servo_stays_dirty(self, servo):
+        socketio = make_socketio()
+        publisher = ServoStatusPublisher(socketio, interval_ms=100)
+        publisher.watch("main", servo)
+        servo.scanning = True
+
+        publisher.notify("main")
+        publisher.flush()
+
+        assert publisher.get_status()["pending"] == 1
+        servo.scanning = False
@@ -0,0 +1,80 @@
+"""
+Test servo trajectory planning
+"""
+
+import pytest
+
+from app.demos.servo_trajectory import MotionLimits, plan_move
+
+
+def max_speed_and_accel(trajectory, dt=0.001):
+    """Numerically estimate peak velocity and acceleration"""
+    steps = int(trajectory.duration / dt) + 2
+    points = [trajectory.position(i * dt) for i in range(steps)]
+    velocities = [(b - a) / dt for a, b in zip(points, points[1:])]
+    accels = [(b - a) / dt for a, b in zip(velocities, velocities[1:])]
+    return max(abs(v) for v in velocities), max(abs(a) for a in accels)
+
+
+class TestTrajectoryPlanner:
+    """Test plan_move"""
+
+    def test_trapezoid_timing(self):
+        trajectory = plan_move(0, 90, MotionLimits(100, 200))
+
+        # 0.5 s ramps covering 25° each plus 40° cruise at 100°/s
+        assert trajectory.duration == pytest.approx(1.4)
+        assert trajectory.position(0.5) == pytest.approx(25)
+        assert trajectory.position(0.7) == pytest.approx(45)
+        assert trajectory.position(2.0) == 90
+
+    def test_short_move_is_triangular(self):
+        trajectory = plan_move(100, 90, MotionLimits(100, 200))
+
+        assert trajectory.cruise_time == 0
+        assert trajectory.peak_velocity < 100
+        assert trajectory.position(trajectory.duration / 2) == pytest.approx(95)
+
+    @pytest.mark.parametrize("profile", ["trapezoid", "scurve"])
+    @pytest.mark.parametrize("distance", [5, 60, 180])
+    def test_respects_limits(self, profile, distance):
+        limits = MotionLimits(150, 600)
+        trajectory = plan_move(0, distance, limits, profile)
+
+        velocity, acceleration = max_speed_and_accel(trajectory)
+
+        assert velocity <= limits.max_velocity * 1.01
+        assert acceleration <= limits.max_acceleration * 1.05
+        assert trajectory.position(trajectory.duration) == distance
+
+    def test_scurve_is_slower_but_smooth(self):
+        limits = MotionLimits(150, 600)
+        trapezoid = plan_move(0, 90, limits, "trapezoid")
+        scurve = plan_move(0, 90, limits, "scurve")
+
+        assert scurve.duration > trapezoid.duration
+        # Zero velocity at both ends
+        assert scurve.position(0.001) == pytest.approx(0, abs=1e-3)
+
+    def test_sample_ends_on_target(self):
+        trajectory = plan_move(90, 0, MotionLimits(100, 500))
+        samples = trajectory.sample(0.02)
+
+        assert samples[-1] == 0
+        assert samples == sorted(samples, reverse=True)
+        assert len(samples) == pytest.approx(trajectory.duration / 0.02, abs=1)
+
+    def test_stretched_keeps_shape(self):
+        trajectory = plan_move(0, 40, MotionLimits(100, 400))
+        slow = trajectory.stretched(trajectory.duration * 2)
+
+        assert slow.duration == pytest.approx(trajectory.duration * 2)
+        assert slow.position(slow.duration / 2) == pytest.approx(20)
+        assert trajectory.stretched(0.01) is trajectory
+
+    def test_zero_distance_and_invalid_input(self):
+        assert plan_move(45, 45, MotionLimits(100, 400)).duration == 0
+        with pytest.raises(ValueError):
+            plan_move(0, 10, MotionLimits(100, 400), "cubic")
+        with pytest.raises(ValueError):
+            plan_move(0, 10, MotionLimits(0, 400))
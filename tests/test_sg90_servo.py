@@ -0,0 +1,243 @@
+"""
+Test SG90 servo motion
+"""
+
+import time
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from app import pigpio_connection
+from app.demos.servo_trajectory import MotionLimits
+from app.demos.sg90_servo import SG90Servo
+
+
+def wait_until(condition, timeout=2.0):
+    """Poll until condition() is true or the timeout expires"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.005)
+    return condition()
+
+
+class TestSG90Servo:
+    """Test SG90Servo"""
+
+    @pytest.fixture
+    def pi(self):
+        return MagicMock()
+
+    @pytest.fixture
+    def servo(self, pi):
+        with patch("app.demos.sg90_servo.pigpio_connection.acquire", return_value=pi):
+            servo = SG90Servo(pin=18)
+        servo.TICK_INTERVAL = 0.005
+        servo.limits = MotionLimits(2000.0, 100000.0)
+        servo.enabled = True
+        yield servo
+        servo.cleanup()
+
+    def test_direct_move_is_immediate(self, servo, pi):
+        result = servo.set_angle(0)
+
+        assert result["success"] is True
+        assert result["moving"] is False
+        assert servo.current_angle == 0
+        pi.set_servo_pulsewidth.assert_called_with(18, 500)
+
+    def test_smooth_move_returns_before_motion(self, servo, pi):
+        servo.limits = MotionLimits(100.0, 500.0)
+        result = servo.set_angle(180, smooth=True)
+
+        assert result["success"] is True
+        assert result["moving"] is True
+        assert result["target_angle"] == 180
+        assert servo.current_angle < 180
+        servo.emergency_stop()
+
+    def test_smooth_move_reaches_target(self, servo, pi):
+        servo.set_angle(180, smooth=True)
+
+        assert wait_until(lambda: not servo.get_status()["moving"])
+        assert servo.current_angle == 180
+        pi.set_servo_pulsewidth.assert_called_with(18, 2500)
+        # Several intermediate pulses rather than a single jump
+        assert pi.set_servo_pulsewidth.call_count > 2
+
+    def test_latest_target_wins(self, servo, pi):
+        servo.limits = MotionLimits(400.0, 20000.0)
+        # Queue the burst before the engine gets a chance to tick
+        with servo._motion_lock:
+            for angle in (150, 30, 170, 20):
+                servo.set_angle(angle, smooth=True)
+
+        assert servo.target_angle == 20
+        assert wait_until(lambda: not servo.get_status()["moving"])
+        assert servo.current_angle == 20
+        pulses = [call.args[1] for call in pi.set_servo_pulsewidth.call_args_list]
+        # Stale targets were never approached: the servo only moved down
+        assert pulses == sorted(pulses, reverse=True)
+
+    def test_step_move_accumulates_on_target(self, servo):
+        servo.set_angle(90)
+        servo.step_move(10)
+        servo.step_move(10)
+
+        assert servo.target_angle == 110
+
+    def test_disable_stops_motion(self, servo, pi):
+        servo.limits = MotionLimits(50.0, 500.0)
+        servo.set_angle(180, smooth=True)
+        servo.disable()
+        stopped_at = servo.current_angle
+        time.sleep(0.05)
+
+        assert servo.current_angle == stopped_at
+        assert servo.target_angle == stopped_at
+
+    def test_smooth_move_follows_trajectory(self, servo, pi):
+        servo.limits = MotionLimits(400.0, 2000.0)
+        servo.set_angle(0, smooth=True)
+
+        assert wait_until(lambda: not servo.get_status()["moving"])
+        assert servo.current_angle == 0
+        pulses = [call.args[1] for call in pi.set_servo_pulsewidth.call_args_list]
+        steps = [a - b for a, b in zip(pulses, pulses[1:])]
+        # Accelerates out of the start position and decelerates into the end
+        assert steps[0] < max(steps)
+        assert steps[-1] < max(steps)
+
+    def test_waveform_playback(self, pi):
+        pi.wave_create.return_value = 3
+        with patch("app.demos.sg90_servo.pigpio_connection.acquire", return_value=pi):
+            servo = SG90Servo(
+                pin=18, max_velocity=3000, max_acceleration=100000, use_waveform=True
+            )
+        servo.TICK_INTERVAL = 0.005
+        servo.enabled = True
+
+        result = servo.set_angle(150, smooth=True)
+
+        assert result["moving"] is True
+        pi.wave_send_once.assert_called_once_with(3)
+        pulses = pi.wave_add_generic.call_args[0][0]
+        assert len(pulses) == 2 * len(servo._samples)
+
+        assert wait_until(lambda: not servo.get_status()["moving"])
+        assert servo.current_angle == 150
+        pi.wave_delete.assert_called_once_with(3)
+        pi.set_servo_pulsewidth.assert_called_with(18, servo._angle_to_pulse_width(150))
+        servo.cleanup()
+
+    def test_scan_runs_on_scheduler(self, servo, pi):
+        result = servo.start_scan(0, 10, "fast")
+
+        assert result["success"] is True
+        assert wait_until(lambda: pi.set_servo_pulsewidth.call_count >= 8)
+        task = servo._scan_task
+        assert task.scheduler.thread.name == "periodic-scheduler"
+
+        servo.stop_scan()
+        calls = pi.set_servo_pulsewidth.call_count
+        time.sleep(0.03)
+
+        assert task.cancelled
+        assert pi.set_servo_pulsewidth.call_count == calls
+        pulses = [call.args[1] for call in pi.set_servo_pulsewidth.call_args_list]
+        # Sweeps 0 -> 10 -> 0 in 2 degree steps
+        assert pulses[:8] == [
+            servo._angle_to_pulse_width(angle) for angle in (0, 2, 4, 6, 8, 10, 8, 6)
+        ]
+
+    def test_waveform_scan(self, servo, pi):
+        pi.wave_create.return_value = 7
+        result = servo.start_scan(0, 20, "fast", use_waveform=True)
+
+        assert result["waveform"] is True
+        assert servo._scan_task is None
+        pi.wave_chain.assert_called_once_with([255, 0, 7, 255, 3])
+        frames = servo._scan_frames
+        # 4 degrees per 20 ms frame at "fast" (2 degrees per 10 ms), there and back
+        assert frames == [0, 4, 8, 12, 16, 20, 16, 12, 8, 4]
+        assert len(pi.wave_add_generic.call_args[0][0]) == 2 * len(frames)
+
+        time.sleep(0.05)
+        status = servo.get_status()
+        assert status["scan_waveform"] is True
+        assert status["current_angle"] in frames
+
+        servo.stop_scan()
+        pi.wave_tx_stop.assert_called_once()
+        pi.wave_delete.assert_called_once_with(7)
+        pi.set_servo_pulsewidth.assert_called_with(
+            18, servo._angle_to_pulse_width(servo.current_angle)
+        )
+
+    def test_failed_wave_chain_falls_back_to_timed_scan(self, servo, pi):
+        pi.wave_create.return_value = 7
+        pi.wave_chain.side_effect = RuntimeError("chain failed")
+
+        result = servo.start_scan(0, 20, "fast", use_waveform=True)
+
+        assert result["success"] is True
+        assert result["waveform"] is False
+        assert servo._scan_task is not None
+        pi.wave_delete.assert_called_once_with(7)
+        assert pigpio_connection.get_manager().wave_owner() is None
+        servo.stop_scan()
+        assert servo.start_scan(0, 20, "fast")["success"] is True
+        servo.stop_scan()
+
+    def test_scan_falls_back_while_wave_transmitter_busy(self, servo, pi):
+        manager = pigpio_connection.get_manager()
+        assert manager.claim_wave("pwm_group") is True
+        try:
+            result = servo.start_scan(0, 20, "fast", use_waveform=True)
+
+            assert result["waveform"] is False
+            pi.wave_create.assert_not_called()
+            pi.wave_tx_stop.assert_not_called()
+            servo.stop_scan()
+            assert manager.wave_owner() == "pwm_group"
+        finally:
+            manager.release_wave("pwm_group")
+
+    def test_repeated_pulse_is_not_rewritten(self, servo, pi):
+        servo.set_angle(45)
+        servo.set_angle(45)
+        servo.step_move(0.01)
+
+        assert pi.set_servo_pulsewidth.call_count == 1
+        writes = servo.get_status()["pulse_writes"]
+        assert writes == {"issued": 1, "suppressed": 2}
+
+    def test_slow_move_skips_unchanged_pulses(self, servo, pi):
+        servo.limits = MotionLimits(400.0, 4000.0)
+        servo.set_angle(96, smooth=True)
+
+        assert wait_until(lambda: not servo.get_status()["moving"])
+        pulses = [call.args[1] for call in pi.set_servo_pulsewidth.call_args_list]
+        assert all(a != b for a, b in zip(pulses, pulses[1:]))
+        assert servo.get_status()["pulse_writes"]["suppressed"] > 0
+
+    def test_disable_forgets_last_pulse(self, servo, pi):
+        servo.set_angle(45)
+        servo.disable()
+        servo.enabled = True
+        servo.set_angle(45)
+
+        assert pi.set_servo_pulsewidth.call_count == 2
+
+    def test_status_is_cached_until_state_changes(self, servo):
+        with patch.object(servo, "_build_status", wraps=servo._build_status) as build:
+            first = servo.get_status()
+            second = servo.get_status()
+            servo.set_angle(45)
+            third = servo.get_status()
+
+        assert build.call_count == 2
+        assert first["version"] == second["version"] < third["version"]
+        assert third["current_angle"] == 45
+        assert "timestamp" not in third
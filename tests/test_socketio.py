@@ -111,6 +111,87 @@ class TestSocketIOEvents:
         received = socketio_client.get_received()
         assert len(received) > 0
 
+    def test_gpio_batch(self, socketio_client, mock_gpio):
+        """Test applying a batch of pin operations"""
+        socketio_client.emit(
+            "gpio_batch",
+            {
+                "operations": [
+                    {"op": "write", "pin": 23, "value": 1},
+                    {"op": "write", "pin": 24, "value": 0},
+                ]
+            },
+        )
+
+        received = socketio_client.get_received()
+        response = None
+        for msg in received:
+            if msg["name"] == "gpio_response":
+                response = msg["args"][0]
+                break
+
+        assert response is not None
+        assert response["success"] is True
+        assert response["applied"] == 2
+
+    def test_gpio_batch_missing_operations(self, socketio_client):
+        """Test batch request without an operations list"""
+        socketio_client.emit("gpio_batch", {})
+
+        received = socketio_client.get_received()
+        response = None
+        for msg in received:
+            if msg["name"] == "gpio_response":
+                response = msg["args"][0]
+                break
+
+        assert response is not None
+        assert response["success"] is False
+
+    def test_gpio_watch(self, socketio_client, mock_gpio):
+        """Test subscribing to input edge events"""
+        socketio_client.emit("gpio_watch", {"pin": 17, "debounce_ms": 5})
+
+        received = socketio_client.get_received()
+        response = None
+        for msg in received:
+            if msg["name"] == "gpio_response":
+                response = msg["args"][0]
+                break
+
+        assert response is not None
+        assert response["success"] is True
+        assert response["debounce_ms"] == 5
+
+    def test_subscribe_pins_filters_updates(self, socketio_client, mock_gpio):
+        """Test that subscribed clients only receive their pins"""
+        socketio_client.emit("subscribe_pins", {"pins": [23]})
+        response = socketio_client.get_received()[-1]["args"][0]
+        assert response["success"] is True
+        assert response["pins"] == [23]
+
+        socketio_client.emit("gpio_write", {"pin": 24, "value": 1})
+        socketio_client.emit("gpio_write", {"pin": 23, "value": 1})
+
+        updates = [
+            msg["args"][0]
+            for msg in socketio_client.get_received()
+            if msg["name"] == "pins_changed"
+        ]
+        assert updates == [{"23": {"state": 1, "mode": "output"}}]
+
+        socketio_client.emit("unsubscribe_pins")
+        response = socketio_client.get_received()[-1]["args"][0]
+        assert response["success"] is True
+        assert response["pins"] is None
+
+    def test_subscribe_pins_invalid(self, socketio_client):
+        """Test subscribing with an invalid pin list"""
+        socketio_client.emit("subscribe_pins", {"pins": [99]})
+
+        response = socketio_client.get_received()[-1]["args"][0]
+        assert response["success"] is False
+
     def test_pwm_start(self, socketio_client, mock_gpio):
         """Test starting PWM"""
         socketio_client.emit(
@@ -167,6 +248,66 @@ class TestSocketIOEvents:
         received = socketio_client.get_received()
         assert len(received) > 0
 
+    def test_pwm_update(self, socketio_client, mock_gpio):
+        """Test changing duty cycle of running PWM"""
+        socketio_client.emit(
+            "pwm_start", {"pin": 18, "frequency": 1000, "duty_cycle": 50}
+        )
+        socketio_client.get_received()
+
+        socketio_client.emit("pwm_update", {"pin": 18, "duty_cycle": 30})
+
+        responses = [
+            msg["args"][0]
+            for msg in socketio_client.get_received()
+            if msg["name"] == "gpio_response"
+        ]
+        assert len(responses) == 1
+        assert responses[0]["success"] is True
+        assert responses[0]["duty_cycle"] == 30
+
+    def test_pwm_ramp_missing_params(self, socketio_client, mock_gpio):
+        """Test that a ramp needs an end duty and duration"""
+        socketio_client.emit("pwm_ramp_start", {"pin": 18, "end_duty": 50})
+
+        responses = [
+            msg["args"][0]
+            for msg in socketio_client.get_received()
+            if msg["name"] == "gpio_response"
+        ]
+        assert responses[0]["success"] is False
+
+    def test_gpio_capture(self, socketio_client, mock_gpio):
+        """Test that a capture answers with one edge list"""
+        socketio_client.emit("gpio_capture", {"pins": [4, 17], "duration": 0.01})
+
+        results = [
+            msg["args"][0]
+            for msg in socketio_client.get_received()
+            if msg["name"] == "capture_result"
+        ]
+        assert len(results) == 1
+        assert results[0]["success"] is True
+        assert results[0]["pins"] == [4, 17]
+        assert results[0]["edges"] == []
+
+    def test_gpio_capture_bad_timeout(self, socketio_client, mock_gpio):
+        """Test that a bad timeout is refused without leaving a capture behind"""
+        socketio_client.emit(
+            "gpio_capture", {"pins": [4], "duration": 0.01, "timeout": "x"}
+        )
+        socketio_client.emit("gpio_capture", {"pins": [4], "duration": 0.01})
+
+        results = [
+            msg["args"][0]
+            for msg in socketio_client.get_received()
+            if msg["name"] == "capture_result"
+        ]
+        assert len(results) == 2
+        assert results[0]["success"] is False
+        assert "timeout" in results[0]["error"]
+        assert results[1]["success"] is True
+
     def test_gpio_reset_all(self, socketio_client, mock_gpio):
         """Test resetting all GPIO pins"""
         socketio_client.emit("gpio_reset_all")
@@ -201,3 +342,55 @@ class TestSocketIOEvents:
 
         received = socketio_client.get_received()
         assert len(received) > 0
+
+    def test_servo_group_pose_missing_pose(self, socketio_client):
+        """Test group pose without a pose mapping"""
+        socketio_client.emit("servo_group_pose", {"duration": 1})
+
+        received = socketio_client.get_received()
+        responses = [
+            m["args"][0] for m in received if m["name"] == "servo_group_response"
+        ]
+        assert responses and responses[0]["success"] is False
+
+    def test_servo_group_pose_invalid_duration(self, socketio_client):
+        """Test group pose with a duration that is not a positive number"""
+        for duration in ("soon", -1, 0, "nan"):
+            socketio_client.emit(
+                "servo_group_pose", {"pose": {"base": 90}, "duration": duration}
+            )
+
+        received = socketio_client.get_received()
+        responses = [
+            m["args"][0] for m in received if m["name"] == "servo_group_response"
+        ]
+        assert len(responses) == 4
+        for response in responses:
+            assert response["success"] is False
+            assert "Invalid duration" in response["error"]
+
+    def test_servo_group_get_status(self, socketio_client):
+        """Test group status lists the configured servos"""
+        socketio_client.emit("servo_group_get_status")
+
+        received = socketio_client.get_received()
+        statuses = [m["args"][0] for m in received if m["name"] == "servo_group_status"]
+        assert statuses
+        assert "main" in statuses[0]["servos"]
+
+    def test_servo_response_includes_status(self, socketio_client):
+        """Test servo commands reply with one message carrying the status"""
+        socketio_client.emit("servo_get_status")
+        initial = [
+            m["args"][0]
+            for m in socketio_client.get_received()
+            if m["name"] == "servo_status"
+        ]
+        assert initial and initial[0]["name"] == "main"
+
+        socketio_client.emit("servo_set_angle", {"angle": 45})
+
+        received = socketio_client.get_received()
+        responses = [m["args"][0] for m in received if m["name"] == "servo_response"]
+        assert len(responses) == 1
+        assert "status" in responses[0]
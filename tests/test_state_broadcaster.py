@@ -0,0 +1,135 @@
+"""
+Test coalesced pin state broadcasting
+"""
+
+from unittest.mock import MagicMock
+
+from app.state_broadcaster import StateBroadcaster
+
+
+def make_socketio():
+    """A socketio mock whose background tasks are collected, not started"""
+    socketio = MagicMock()
+    socketio.tasks = []
+    socketio.start_background_task.side_effect = socketio.tasks.append
+    return socketio
+
+
+class TestStateBroadcaster:
+    """Test StateBroadcaster"""
+
+    def test_zero_window_emits_immediately(self):
+        socketio = make_socketio()
+        broadcaster = StateBroadcaster(socketio, window_ms=0)
+
+        broadcaster.publish({17: {"state": 1, "mode": "output"}})
+
+        socketio.emit.assert_called_once_with(
+            "pins_changed", {17: {"state": 1, "mode": "output"}}, to="pins:all"
+        )
+        assert socketio.tasks == []
+
+    def test_window_coalesces_to_latest_state(self):
+        socketio = make_socketio()
+        broadcaster = StateBroadcaster(socketio, window_ms=20)
+        # Run a single window of the flusher loop
+        socketio.sleep.side_effect = lambda seconds: broadcaster.stop()
+
+        for i in range(100):
+            broadcaster.publish({17: {"state": i % 2, "mode": "output"}})
+        broadcaster.publish({4: {"state": 1, "mode": "input"}})
+
+        # One flusher task for the whole burst, nothing sent yet
+        assert len(socketio.tasks) == 1
+        socketio.emit.assert_not_called()
+
+        socketio.tasks[0]()
+
+        socketio.sleep.assert_called_once_with(0.02)
+        socketio.emit.assert_called_once_with(
+            "pins_changed",
+            {17: {"state": 1, "mode": "output"}, 4: {"state": 1, "mode": "input"}},
+            to="pins:all",
+        )
+        status = broadcaster.get_status()
+        assert status["published"] == 101
+        assert status["emitted"] == 2
+        assert status["messages"] == 1
+        assert status["pending"] == 0
+
+    def test_flusher_sends_once_per_window(self):
+        socketio = make_socketio()
+        broadcaster = StateBroadcaster(socketio, window_ms=10)
+        broadcaster.start()
+        windows = iter(
+            [
+                lambda: broadcaster.publish({17: {"state": 1, "mode": "output"}}),
+                lambda: None,
+                lambda: broadcaster.publish({17: {"state": 0, "mode": "output"}}),
+                broadcaster.stop,
+            ]
+        )
+        socketio.sleep.side_effect = lambda seconds: next(windows)()
+
+        socketio.tasks[0]()
+
+        # Started explicitly, so publishing never spawns another task
+        assert len(socketio.tasks) == 1
+        # The idle window sends nothing
+        assert socketio.sleep.call_count == 4
+        assert socketio.emit.call_count == 2
+
+    def test_empty_publish_is_ignored(self):
+        socketio = make_socketio()
+        broadcaster = StateBroadcaster(socketio, window_ms=10)
+
+        broadcaster.publish({})
+
+        assert socketio.tasks == []
+        assert broadcaster.flush() == {}
+        socketio.emit.assert_not_called()
+
+    def test_subscribed_group_receives_only_its_pins(self):
+        socketio = make_socketio()
+        broadcaster = StateBroadcaster(socketio, window_ms=0)
+        broadcaster.add_client("a")
+        broadcaster.add_client("b")
+        broadcaster.add_client("c")
+
+        assert broadcaster.subscribe("a", [17, 4]) == [4, 17]
+        broadcaster.subscribe("b", [4])
+        broadcaster.subscribe("b", [17])
+        socketio.server.enter_room.assert_any_call("a", "pins:4,17", namespace="/")
+        socketio.server.leave_room.assert_any_call("a", "pins:all", namespace="/")
+
+        broadcaster.publish(
+            {4: {"state": 1, "mode": "input"}, 22: {"state": 0, "mode": "output"}}
+        )
+
+        sent = {call.kwargs["to"]: call.args[1] for call in socketio.emit.call_args_list}
+        # a and b share one group room, so only two messages are sent
+        assert sent == {
+            "pins:all": {
+                4: {"state": 1, "mode": "input"},
+                22: {"state": 0, "mode": "output"},
+            },
+            "pins:4,17": {4: {"state": 1, "mode": "input"}},
+        }
+        assert broadcaster.get_status()["groups"] == 1
+
+    def test_unsubscribe_and_disconnect(self):
+        socketio = make_socketio()
+        broadcaster = StateBroadcaster(socketio, window_ms=0)
+        broadcaster.add_client("a")
+        broadcaster.subscribe("a", [4, 5])
+
+        assert broadcaster.unsubscribe("a", [5]) == [4]
+        assert broadcaster.subscriptions("a") == [4]
+        assert broadcaster.unsubscribe("a") is None
+        socketio.server.enter_room.assert_called_with("a", "pins:all", namespace="/")
+        assert broadcaster.get_status()["groups"] == 0
+
+        broadcaster.subscribe("a", [4])
+        broadcaster.remove_client("a")
+        status = broadcaster.get_status()
+        assert status["clients"] == 0 and status["groups"] == 0